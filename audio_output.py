@@ -0,0 +1,242 @@
+"""
+In-memory audio output with a gapless playback queue
+"""
+
+import io
+import queue
+import threading
+import time
+import wave
+from collections import deque
+
+from telemetry import tracer
+
+from lazy_imports import lazy_import
+
+# Only needed for playback; loaded on first use and None when not installed
+pygame = lazy_import('pygame')
+np = lazy_import('numpy')
+
+# Frame length of the echo reference levels
+REFERENCE_FRAME_SECONDS = 0.03
+
+
+def pcm_to_wav(pcm, sample_rate, channels=1, sample_width=2):
+    """Wrap raw PCM samples in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def frame_levels(samples, channels, frame_samples):
+    """RMS level of each frame of interleaved 16-bit samples"""
+    samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    usable = len(samples) // frame_samples * frame_samples
+    if usable == 0:
+        return np.zeros(1, dtype=np.float32)
+    frames = samples[:usable].reshape(-1, frame_samples)
+    return np.sqrt(np.mean(frames * frames, axis=1)).astype(np.float32)
+
+
+def sound_levels(sound, frame_seconds=REFERENCE_FRAME_SECONDS):
+    """Echo reference levels of a decoded pygame Sound (compressed clips); None if the mixer is not 16-bit"""
+    frequency, size, channels = pygame.mixer.get_init()
+    if np is None or abs(size) != 16:
+        return None
+    samples = np.frombuffer(sound.get_raw(), dtype=np.int16)
+    return frame_levels(samples, channels, max(1, int(frequency * frame_seconds)))
+
+
+class AudioClip:
+    """Encoded audio held in memory ('wav' or 'mp3')"""
+    def __init__(self, data, audio_format='wav'):
+        self.data = data
+        self.format = audio_format
+
+    @classmethod
+    def from_pcm(cls, pcm, sample_rate, channels=1, sample_width=2):
+        """Build a clip from raw signed PCM samples"""
+        return cls(pcm_to_wav(pcm, sample_rate, channels, sample_width), 'wav')
+
+    def duration(self):
+        """Length in seconds for WAV clips; None for compressed formats"""
+        if self.format != 'wav':
+            return None
+        with wave.open(io.BytesIO(self.data), 'rb') as wav_file:
+            return wav_file.getnframes() / wav_file.getframerate()
+
+    def levels(self, frame_seconds=0.03):
+        """RMS level of each frame of a WAV clip, used as the echo reference; None for other formats"""
+        if self.format != 'wav' or np is None:
+            return None
+        with wave.open(io.BytesIO(self.data), 'rb') as wav_file:
+            if wav_file.getsampwidth() != 2:
+                return None
+            channels = wav_file.getnchannels()
+            frame_samples = max(1, int(wav_file.getframerate() * frame_seconds))
+            samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype='<i2')
+        return frame_levels(samples, channels, frame_samples)
+
+    def to_sound(self):
+        """Decode into a pygame Sound in the mixer's format"""
+        return pygame.mixer.Sound(file=io.BytesIO(self.data))
+
+
+class PlaybackHandle:
+    """Completion signal for one queued clip"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.cancelled = False
+        self.started_at = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        """Block until the clip has finished playing or was cancelled"""
+        return self.done.wait(timeout)
+
+    def _finish(self, cancelled=False, error=None):
+        self.cancelled = cancelled
+        self.error = error
+        self.done.set()
+
+
+class AudioPlayer:
+    """Queue clips for back-to-back playback on a dedicated mixer channel"""
+    def __init__(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+
+        self.pending = queue.Queue()
+        self.scheduled = deque()  # (expected end_time, handle, sound) for playing and queued sounds
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.generation = 0
+        self.reference = deque(maxlen=8)  # (start, end, levels) of what was played, for echo removal
+
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def enqueue(self, clip):
+        """Queue a clip for playback and return its completion handle"""
+        handle = PlaybackHandle()
+        with self.lock:
+            self.pending.put((clip, handle, self.generation))
+        self.wakeup.set()
+        return handle
+
+    def reference_level(self, start_time, end_time):
+        """Loudest level played between two perf_counter times: 0.0 when silent, None when unknown"""
+        level = 0.0
+        with self.lock:
+            entries = list(self.reference)
+        for clip_start, clip_end, levels in entries:
+            if clip_end < start_time or clip_start > end_time:
+                continue
+            if levels is None:
+                return None
+            first = max(0, int((start_time - clip_start) / REFERENCE_FRAME_SECONDS))
+            last = max(first + 1, int((end_time - clip_start) / REFERENCE_FRAME_SECONDS) + 1)
+            window = levels[first:last]
+            if len(window):
+                level = max(level, float(window.max()))
+        return level
+
+    def stop(self):
+        """Stop playback immediately and cancel everything queued"""
+        with self.lock:
+            self.generation += 1
+            self._drain_pending()
+            self.channel.stop()
+            self.reference.clear()
+            while self.scheduled:
+                _, handle, _ = self.scheduled.popleft()
+                handle._finish(cancelled=True)
+        self.wakeup.set()
+
+    def _drain_pending(self):
+        """Cancel clips that were never handed to the mixer (lock held)"""
+        while True:
+            try:
+                _, handle, _ = self.pending.get_nowait()
+            except queue.Empty:
+                return
+            handle._finish(cancelled=True)
+
+    def _run(self):
+        """Decode queued clips ahead of time and hand them to the mixer gaplessly"""
+        while True:
+            self._retire_finished()
+            timeout = self._time_to_next_end()
+
+            # The channel holds one playing and one queued sound at most
+            if len(self.scheduled) >= 2:
+                self.wakeup.wait(timeout)
+                self.wakeup.clear()
+                continue
+
+            try:
+                clip, handle, generation = self.pending.get(timeout=timeout)
+            except queue.Empty:
+                continue
+
+            if generation != self.generation:
+                handle._finish(cancelled=True)
+                continue
+
+            try:
+                sound = clip.to_sound()
+            except Exception as e:
+                print(f"Audio decode error: {e}")
+                handle._finish(error=e)
+                continue
+            try:
+                levels = clip.levels(REFERENCE_FRAME_SECONDS)
+                if levels is None:
+                    levels = sound_levels(sound)
+            except (wave.Error, ValueError, pygame.error):
+                levels = None
+
+            with self.lock:
+                if generation != self.generation:
+                    handle._finish(cancelled=True)
+                    continue
+
+                now = time.perf_counter()
+                if self.scheduled and self.channel.get_busy():
+                    self.channel.queue(sound)
+                    start_time = max(now, self.scheduled[-1][0])
+                else:
+                    self.channel.play(sound)
+                    start_time = now
+
+                handle.started_at = start_time
+                self.scheduled.append((start_time + sound.get_length(), handle, sound))
+                self.reference.append((start_time, start_time + sound.get_length(), levels))
+
+    def _retire_finished(self):
+        """Signal completion for sounds the mixer has finished with"""
+        with self.lock:
+            now = time.perf_counter()
+            active = (self.channel.get_sound(), self.channel.get_queue()) if self.channel.get_busy() else ()
+            while self.scheduled and not any(self.scheduled[0][2] is sound for sound in active):
+                _, handle, _ = self.scheduled.popleft()
+                handle._finish()
+                tracer.record('playback', now - handle.started_at)
+
+    def _time_to_next_end(self):
+        """Seconds until the earliest scheduled sound should end, or None when idle
+
+        pygame only reports channel end events through the display's event
+        queue, so the worker sleeps until the expected end and then asks the
+        mixer; our clock can run a little ahead of it, hence the short floor.
+        """
+        with self.lock:
+            if not self.scheduled:
+                return None
+            return max(0.005, self.scheduled[0][0] - time.perf_counter())
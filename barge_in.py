@@ -0,0 +1,197 @@
+"""
+Barge-in: let the user interrupt the assistant mid-answer
+
+While a response is being generated and spoken, a monitor thread keeps the
+microphone open. Each frame's energy is compared with the level the assistant
+itself is playing (the echo reference from AudioPlayer): the expected echo,
+reference level times an adaptively tracked speaker-to-mic gain, is
+subtracted in the energy domain, and only what is left can count as the
+user's voice. Without a reference (engines that play audio themselves, such
+as pyttsx3 and windows) barge-in stays off. Sustained voice stops playback, cancels LLM generation and
+keeps recording, so the interrupting utterance is ready to transcribe as soon
+as the old turn has unwound.
+"""
+
+import collections
+import math
+import threading
+import time
+
+import speech_recognition as sr
+
+from telemetry import tracer
+from vad import SpeechEndpointer, create_endpointer
+
+
+class BargeInDetector:
+    """Frame-by-frame decision: user speech on top of our own playback, or just echo"""
+    def __init__(self, vad, margin=1.0, min_speech_ms=200, warmup_ms=300, initial_gain=0.5):
+        self.vad = vad
+        self.margin = margin
+        self.min_speech_frames = max(1, int(min_speech_ms / vad.frame_ms))
+        self.warmup_frames = int(warmup_ms / vad.frame_ms)
+        self.initial_gain = initial_gain
+        self.reset()
+
+    def reset(self):
+        self.echo_gain = self.initial_gain
+        self.echo_frames = 0
+        self.speech_run = 0
+
+    def feed(self, mic_levels, reference):
+        """Update with per-frame mic RMS levels and the level played over the same time.
+        Returns True once speech has lasted min_speech_ms"""
+        noise = self.vad.noise_floor or self.vad.energy_threshold / self.vad.threshold_ratio
+        triggered = False
+        for mic in mic_levels:
+            mic = float(mic)
+            echo = self.echo_gain * reference
+            residual = math.sqrt(max(mic * mic - echo * echo, 0.0))
+            # What is left must be louder than the echo we expected, so a slightly
+            # wrong gain estimate does not turn our own voice into "speech"
+            threshold = max(self.vad.energy_threshold, echo * self.margin)
+            playing = reference > noise
+            if playing:
+                self.echo_frames += 1
+            # The first frames of playback only teach us the echo level
+            learning = playing and self.echo_frames <= self.warmup_frames
+            is_speech = residual > threshold and not learning
+            # Learn the speaker-to-mic gain from frames that are echo only
+            if playing and not is_speech:
+                ratio = min(mic / reference, 4.0)
+                self.echo_gain += (ratio - self.echo_gain) * (0.3 if learning else 0.05)
+
+            self.speech_run = self.speech_run + 1 if is_speech else 0
+            if self.speech_run >= self.min_speech_frames:
+                triggered = True
+        return triggered
+
+
+class BargeInMonitor:
+    """Listen while the assistant responds and interrupt it when the user talks"""
+    def __init__(self, assistant, settings, speech_settings):
+        self.assistant = assistant
+        self.microphone = assistant.microphone
+        self.latency = settings.get('echo_latency_ms', 150) / 1000
+        self.phrase_time_limit = speech_settings.get('phrase_time_limit', 10)
+        self.endpointer = create_endpointer(speech_settings, self.microphone.SAMPLE_RATE)
+        self.detector = BargeInDetector(
+            self.endpointer.vad,
+            margin=settings.get('echo_margin', 1.0),
+            min_speech_ms=settings.get('min_speech_ms', 200),
+            warmup_ms=settings.get('warmup_ms', 300)
+        )
+        self.stop_event = threading.Event()
+        self.triggered = threading.Event()
+        self.thread = None
+        self.pending_audio = None
+        self.triggered_at = None
+        self.count = 0
+
+    def start(self):
+        """Begin watching for the user to talk over the response"""
+        if not self._has_reference():
+            return
+        self.stop_event.clear()
+        self.triggered.clear()
+        self.pending_audio = None
+        self.triggered_at = None
+        self.thread = threading.Thread(target=self._run, name="barge-in", daemon=True)
+        self.thread.start()
+
+    def finish(self):
+        """Stop watching; after a barge-in this waits for the interrupting utterance to end"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        # The thread must have left the microphone context before anyone reopens it
+        self.thread.join()
+        self.thread = None
+        self.triggered.clear()
+
+    def take_audio(self):
+        """The utterance that interrupted the last response, once"""
+        audio, self.pending_audio = self.pending_audio, None
+        return audio
+
+    def _run(self):
+        vad = self.endpointer.vad
+        main_vad = getattr(self.assistant.endpointer, 'vad', None)
+        if main_vad is not None and main_vad.noise_floor is not None:
+            vad._set_noise_floor(main_vad.noise_floor)
+        self.detector.reset()
+        preroll = collections.deque(maxlen=max(1, int(0.5 / (vad.frame_ms / 1000))))
+        pending = b''
+
+        try:
+            with self.microphone as source:
+                chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+                while not self.stop_event.is_set():
+                    chunk = source.stream.read(source.CHUNK)
+                    if not chunk:
+                        return
+                    now = time.perf_counter()
+                    pending += chunk
+                    usable = len(pending) // vad.frame_bytes * vad.frame_bytes
+                    data, pending = pending[:usable], pending[usable:]
+                    if not data:
+                        continue
+                    for start in range(0, len(data), vad.frame_bytes):
+                        preroll.append(data[start:start + vad.frame_bytes])
+
+                    # The speaker output reaches the mic after the output and input buffers
+                    reference = self.assistant.tts.player.reference_level(now - chunk_seconds - self.latency, now)
+                    if reference is None:
+                        # Without knowing what was played, our own voice looks like the user's
+                        self.detector.speech_run = 0
+                        continue
+                    mic_levels, _ = vad.frame_features(data)
+                    if self.detector.feed(mic_levels, reference):
+                        self._interrupt()
+                        audio = self._capture_rest(source, b''.join(preroll))
+                        if audio:
+                            self.pending_audio = sr.AudioData(audio, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                        return
+        except Exception as e:
+            print(f" Barge-in monitor error: {e}")
+
+    def _has_reference(self):
+        """Engines such as pyttsx3 and windows play audio themselves, so there is no echo reference"""
+        tts = self.assistant.tts
+        return tts is not None and tts.engine in tts.CLIP_ENGINES
+
+    def _interrupt(self):
+        """Silence the assistant and abandon the answer being generated"""
+        self.triggered_at = time.perf_counter()
+        self.triggered.set()
+        self.count += 1
+        if self.assistant.tts is not None:
+            self.assistant.tts.stop()
+        self.assistant.llama_client.cancel()
+        tracer.count('barge_in')
+        print("\n Barge-in: listening...")
+
+    def _capture_rest(self, source, preroll):
+        """Keep recording the interrupting utterance until the user stops"""
+        endpointer = self.endpointer
+        endpointer.reset()
+        started_at = time.perf_counter()
+        state = endpointer.feed(preroll)
+        while state != SpeechEndpointer.ENDED:
+            now = time.perf_counter()
+            if state == SpeechEndpointer.WAITING and now - started_at > 2.0:
+                return b''
+            if state == SpeechEndpointer.SPEECH and now - endpointer.speech_started_at > self.phrase_time_limit:
+                break
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                break
+            state = endpointer.feed(chunk)
+        return endpointer.audio()
+
+
+def create_barge_in_monitor(assistant, settings, speech_settings):
+    """Build the monitor from BARGE_IN_CONFIG, or None when it is off or cannot run"""
+    if not settings.get('enabled', True) or assistant.microphone is None:
+        return None
+    return BargeInMonitor(assistant, settings, speech_settings)
@@ -0,0 +1,503 @@
+"""
+Per-stage latency benchmarks for the voice assistant
+
+Replays WAV fixtures through the listen_command recognition path with a fake
+microphone, answers LLM requests from a local stand-in for the Ollama API with
+a configurable token rate, and times TTS synthesis, command routing and
+conversation memory. p50/p95/p99 per stage are printed and written to JSON so
+runs can be compared:
+
+    python benchmark.py --runs 20 --token-rate 40
+    python benchmark.py --compare data/benchmarks/previous.json
+"""
+
+import argparse
+import array
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from lazy_imports import missing_modules
+from tts_probe import load_probe
+
+try:
+    import speech_recognition as sr
+    AudioSource = sr.AudioSource
+except ImportError:
+    sr = None
+    AudioSource = object
+
+MOCK_RESPONSE = (
+    "Sure. The capital of France is Paris, which is also its largest city. "
+    "It sits on the Seine in the north of the country. "
+    "Is there anything else you would like to know?"
+)
+
+BENCHMARK_COMMANDS = [
+    "open youtube", "please launch chrome for me", "what is the weather like today",
+    "search google for python tutorials", "tell me a joke", "take a screenshot",
+    "how are you", "open spotify", "what can you do", "look up the population of canada"
+]
+
+TTS_PHRASES = [
+    "Hello! How can I help you today?",
+    "The capital of France is Paris, which is also its largest city.",
+    "Opening YouTube in your browser!"
+]
+
+
+def percentile(values, pct):
+    """Linearly interpolated percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class StageTimer:
+    """Collect per-stage durations and summarize them"""
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start_time = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+            print(f" {stage} error: {e}", file=sys.stderr)
+        else:
+            self.record(stage, time.perf_counter() - start_time)
+
+    def record(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def summary(self):
+        """Milliseconds statistics for every stage"""
+        stages = {}
+        for stage in sorted(set(self.samples) | set(self.errors)):
+            values = [value * 1000 for value in self.samples.get(stage, [])]
+            stats = {'count': len(values), 'errors': self.errors.get(stage, 0)}
+            if values:
+                stats.update({
+                    'mean_ms': sum(values) / len(values),
+                    'min_ms': min(values),
+                    'p50_ms': percentile(values, 50),
+                    'p95_ms': percentile(values, 95),
+                    'p99_ms': percentile(values, 99),
+                    'max_ms': max(values)
+                })
+            stages[stage] = stats
+        return stages
+
+
+class _FixtureStream:
+    """Serve PCM like a PyAudio input stream, followed by silence"""
+    def __init__(self, pcm, bytes_per_second, tail_bytes, realtime):
+        self.pcm = pcm
+        self.bytes_per_second = bytes_per_second
+        self.tail_bytes = tail_bytes
+        self.realtime = realtime
+        self.position = 0
+
+    def read(self, size, exception_on_overflow=False):
+        if self.realtime:
+            time.sleep(size / self.bytes_per_second)
+        if self.position < len(self.pcm):
+            chunk = self.pcm[self.position:self.position + size]
+            chunk += bytes(size - len(chunk))
+        elif self.position < len(self.pcm) + self.tail_bytes:
+            chunk = bytes(size)
+        else:
+            return b''
+        self.position += size
+        return chunk
+
+
+class FakeMicrophone(AudioSource):
+    """Microphone stand-in that replays a WAV fixture from the start on every open"""
+    def __init__(self, pcm, sample_rate, sample_width=2, chunk_size=1024, tail_seconds=1.0, realtime=False):
+        self.pcm = pcm
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = sample_width
+        self.CHUNK = chunk_size
+        self.tail_bytes = int(sample_rate * tail_seconds) * sample_width
+        self.realtime = realtime
+        self.stream = None
+
+    @classmethod
+    def from_wav(cls, path, **kwargs):
+        with wave.open(str(path), 'rb') as wav_file:
+            if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                raise ValueError(f"{path}: fixtures must be mono 16-bit PCM")
+            return cls(wav_file.readframes(wav_file.getnframes()), wav_file.getframerate(), **kwargs)
+
+    def __enter__(self):
+        self.stream = _FixtureStream(self.pcm, self.SAMPLE_RATE * self.SAMPLE_WIDTH,
+                                     self.tail_bytes, self.realtime)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+def synthetic_fixture(sample_rate=16000):
+    """A quiet lead-in, one second of voiced harmonics and trailing silence"""
+    rng = random.Random(0)
+    samples = array.array('h')
+    for i in range(int(sample_rate * 2.3)):
+        t = i / sample_rate
+        value = rng.gauss(0, 60)
+        if 0.5 <= t < 1.5:
+            envelope = math.sin(math.pi * (t - 0.5)) * (0.6 + 0.4 * math.sin(2 * math.pi * 4 * t))
+            value += envelope * sum(6000 / k * math.sin(2 * math.pi * 140 * k * t) for k in range(1, 6))
+        samples.append(max(-32768, min(32767, int(value))))
+    return samples.tobytes()
+
+
+class MockOllamaServer:
+    """Local stand-in for Ollama's /api/tags, /api/chat and preload /api/generate endpoints"""
+    def __init__(self, model_name, token_rate=40.0, first_token_delay=0.15, response=MOCK_RESPONSE, port=0):
+        self.model_name = model_name
+        self.token_rate = token_rate
+        self.first_token_delay = first_token_delay
+        self.tokens = [(" " if i else "") + word for i, word in enumerate(response.split())]
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip('/') != '/api/tags':
+                    self.send_error(404)
+                    return
+                self._send_json({'models': [{'name': mock.model_name, 'model': mock.model_name}]})
+
+            def do_POST(self):
+                path = self.path.rstrip('/')
+                if path not in ('/api/chat', '/api/generate'):
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+
+                # An empty generate is the keep-alive preload; the model is always "loaded"
+                if path == '/api/generate':
+                    self._send_json({'model': mock.model_name, 'response': '', 'done': True})
+                    return
+                limit = request.get('options', {}).get('num_predict') or len(mock.tokens)
+                tokens = mock.tokens[:limit]
+
+                if not request.get('stream', True):
+                    time.sleep(mock.first_token_delay + len(tokens) / mock.token_rate)
+                    self._send_json(mock._message("".join(tokens), done=True))
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                time.sleep(mock.first_token_delay)
+                try:
+                    for token in tokens:
+                        self._write_chunk(mock._message(token, done=False))
+                        time.sleep(1.0 / mock.token_rate)
+                    self._write_chunk(mock._message("", done=True))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The cancel and first-token stages close the stream early
+                    self.close_connection = True
+
+            def _write_chunk(self, payload):
+                line = (json.dumps(payload) + "\n").encode('utf-8')
+                self.wfile.write(f"{len(line):x}\r\n".encode('ascii') + line + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def _message(self, content, done):
+        message = {
+            'model': self.model_name,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'message': {'role': 'assistant', 'content': content},
+            'done': done
+        }
+        if done:
+            message['done_reason'] = 'stop'
+        return message
+
+
+def bench_stt(main, timer, fixtures, runs, realtime):
+    """Replay each fixture through capture, transcription and listen_command"""
+    # The fake microphone replaces PyAudio, and nothing is spoken, so only the recognizer is needed
+    required = ['speech_recognition']
+    if main.config.SPEECH_CONFIG.get('stt_backend', 'auto') == 'vosk':
+        required.append('vosk')
+    missing = missing_modules(*required)
+    if missing:
+        print(f" Skipping STT: {', '.join(missing)} not installed", file=sys.stderr)
+        return
+
+    for name, microphone in fixtures:
+        microphone.realtime = realtime
+        assistant = main.VoiceAssistant(headless=True)
+        assistant._init_audio_input(microphone)
+        for _ in range(runs):
+            if not assistant.stt.streaming:
+                audio = None
+                with timer.measure('stt.capture'):
+                    audio = assistant.capture_audio()
+                if audio is not None:
+                    with timer.measure('stt.transcribe'):
+                        assistant.transcribe(audio)
+            with timer.measure('stt.listen_command'):
+                assistant.listen_command()
+
+
+def bench_llm(main, timer, server, runs):
+    """Time first token, first sentence and full answers against the mock server"""
+    if not main.OLLAMA_AVAILABLE:
+        print(" Skipping LLM: ollama not installed", file=sys.stderr)
+        return
+
+    assistant = main.VoiceAssistant(headless=True)
+    assistant.llama_client = main.LlamaClient(model_name=server.model_name, host_url=server.url)
+    if not assistant.llama_client.is_ready:
+        print(" Skipping LLM: mock server not reachable", file=sys.stderr)
+        return
+
+    prompt = "What is the capital of France?"
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        first_token = None
+        for _token in assistant.llama_client.stream_response(prompt):
+            if first_token is None:
+                first_token = time.perf_counter()
+        if first_token is not None:
+            timer.record('llm.first_token', first_token - start_time)
+            timer.record('llm.stream_complete', time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        for _sentence in assistant.response_sentences(prompt):
+            timer.record('llm.first_sentence', time.perf_counter() - start_time)
+            break
+
+        with timer.measure('llm.generate'):
+            assistant.llama_client.generate_response(prompt)
+
+
+def bench_tts(main, timer, engines, runs):
+    """Time in-memory synthesis for each available engine, bypassing the cache"""
+    if main.pygame is None:
+        print(" Skipping TTS: pygame not installed", file=sys.stderr)
+        return
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    # probe.choose() returns an explicit engine without checking it, so check here
+    probe = load_probe(main.config.TTS_CONFIG)
+    for engine in engines:
+        if not probe.available(engine):
+            print(f" Skipping TTS {engine}: not installed", file=sys.stderr)
+            continue
+        try:
+            tts = main.MultiTTS(engine=engine)
+        except Exception as e:
+            print(f" Skipping TTS {engine}: {e}", file=sys.stderr)
+            continue
+        if tts.engine != engine:
+            print(f" Skipping TTS {engine}: not installed", file=sys.stderr)
+            tts.player.stop()
+            continue
+        for _ in range(runs):
+            for phrase in TTS_PHRASES:
+                with timer.measure(f'tts.{engine}'):
+                    tts._synthesize_clip(phrase)
+        tts.player.stop()
+
+
+def bench_routing(main, timer, iterations):
+    """Time the intent router alone and the full route_command path"""
+    assistant = main.VoiceAssistant(headless=True)
+    commands = [BENCHMARK_COMMANDS[i % len(BENCHMARK_COMMANDS)] for i in range(iterations)]
+    for command in commands:
+        start_time = time.perf_counter()
+        assistant.router.match(command)
+        timer.record('routing.match', time.perf_counter() - start_time)
+    for command in commands:
+        start_time = time.perf_counter()
+        assistant.route_command(command)
+        timer.record('routing.route_command', time.perf_counter() - start_time)
+
+
+def bench_memory(main, timer, iterations):
+    """Time conversation memory updates and context building"""
+    memory = main.ConversationMemory()
+    for i in range(iterations):
+        message = BENCHMARK_COMMANDS[i % len(BENCHMARK_COMMANDS)]
+        start_time = time.perf_counter()
+        memory.add_message("User" if i % 2 == 0 else "Assistant", message)
+        timer.record('memory.add_message', time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        memory.messages(message)
+        timer.record('memory.messages', time.perf_counter() - start_time)
+
+
+def load_fixtures(directory):
+    """WAV fixtures from a directory, or a synthetic one when there are none"""
+    fixtures = []
+    for path in sorted(Path(directory).glob('*.wav')):
+        try:
+            fixtures.append((path.name, FakeMicrophone.from_wav(path)))
+        except (ValueError, wave.Error) as e:
+            print(f" Skipping fixture {e}", file=sys.stderr)
+    if not fixtures:
+        fixtures.append(('synthetic', FakeMicrophone(synthetic_fixture(), 16000)))
+    return fixtures
+
+
+def compare(current, previous_path):
+    """Print p50/p95 changes against an earlier results file"""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)['stages']
+    print(f"\n{'stage':<28} {'p50 ms':>10} {'change':>8} {'p95 ms':>10} {'change':>8}")
+    for stage, stats in current.items():
+        if 'p50_ms' not in stats:
+            continue
+        before = previous.get(stage, {})
+        changes = []
+        for key in ('p50_ms', 'p95_ms'):
+            if before.get(key):
+                changes.append(f"{(stats[key] / before[key] - 1) * 100:+7.1f}%")
+            else:
+                changes.append(f"{'new':>8}")
+        print(f"{stage:<28} {stats['p50_ms']:>10.3f} {changes[0]} {stats['p95_ms']:>10.3f} {changes[1]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage latency benchmarks")
+    parser.add_argument('--runs', type=int, default=10, help="repetitions for STT, LLM and TTS stages")
+    parser.add_argument('--iterations', type=int, default=2000, help="repetitions for routing and memory")
+    parser.add_argument('--fixtures', default='data/benchmark_fixtures',
+                        help="directory of mono 16-bit WAV files (a synthetic one is used if empty)")
+    parser.add_argument('--realtime', action='store_true', help="pace the fake microphone at real time")
+    parser.add_argument('--stt', help="override SPEECH_CONFIG['stt_backend']")
+    parser.add_argument('--token-rate', type=float, default=40.0, help="mock Ollama tokens per second")
+    parser.add_argument('--first-token-ms', type=float, default=150.0, help="mock Ollama time to first token")
+    parser.add_argument('--tts-engines', default='espeak,google,coqui,elevenlabs',
+                        help="comma-separated engines to time")
+    parser.add_argument('--stages', default='stt,llm,tts,routing,memory')
+    parser.add_argument('--output', help="results file (default: data/benchmarks/<timestamp>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--verbose', action='store_true', help="show the assistant's own output")
+    args = parser.parse_args(argv)
+    stages = set(args.stages.split(','))
+
+    import config
+    server = MockOllamaServer(config.LLAMA_CONFIG.get('model_name', 'llama3.1:8b'),
+                              token_rate=args.token_rate,
+                              first_token_delay=args.first_token_ms / 1000).start()
+    config.LLAMA_CONFIG['host_url'] = server.url
+    if args.stt:
+        config.SPEECH_CONFIG['stt_backend'] = args.stt
+    # Keep caches and dry-run side effects out of the measurements; a response
+    # cache would also answer every run after the first and store mock answers
+    config.TTS_CONFIG['prewarm_cache'] = False
+    config.RESPONSE_CACHE_CONFIG['enabled'] = False
+
+    timer = StageTimer()
+    output = sys.stdout if args.verbose else open(os.devnull, 'w')
+    try:
+        with contextlib.redirect_stdout(output):
+            import main as assistant_main
+            if 'routing' in stages:
+                bench_routing(assistant_main, timer, args.iterations)
+            if 'memory' in stages:
+                bench_memory(assistant_main, timer, args.iterations)
+            if 'stt' in stages:
+                bench_stt(assistant_main, timer, load_fixtures(args.fixtures), args.runs, args.realtime)
+            if 'llm' in stages:
+                bench_llm(assistant_main, timer, server, args.runs)
+            if 'tts' in stages:
+                bench_tts(assistant_main, timer, args.tts_engines.split(','), args.runs)
+    finally:
+        server.stop()
+        if output is not sys.stdout:
+            output.close()
+
+    results = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'runs': args.runs, 'iterations': args.iterations, 'realtime': args.realtime,
+            'token_rate': args.token_rate, 'first_token_ms': args.first_token_ms
+        },
+        'stages': timer.summary()
+    }
+
+    output_path = Path(args.output or f"data/benchmarks/{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(results, indent=2))
+
+    print(f"{'stage':<28} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for stage, stats in results['stages'].items():
+        if 'p50_ms' in stats:
+            print(f"{stage:<28} {stats['count']:>6} {stats['p50_ms']:>10.3f} "
+                  f"{stats['p95_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+        else:
+            print(f"{stage:<28} {stats['count']:>6} {'failed':>10}")
+    print(f"\n Results written to {output_path}")
+
+    if args.compare:
+        compare(results['stages'], args.compare)
+    return results
+
+
+if __name__ == "__main__":
+    main()
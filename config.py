@@ -4,10 +4,19 @@ Configuration file for AI Voice Assistant
 
 # TTS Engine Settings
 TTS_CONFIG = {
-    'engine': 'auto',  # Options: 'auto', 'coqui', 'elevenlabs', 'google', 'windows', 'espeak', 'pyttsx3'
+    'engine': 'auto',  # Options: 'auto', 'daemon', 'coqui', 'elevenlabs', 'google', 'windows', 'espeak', 'pyttsx3'
     'rate': 140,       # Speech rate (words per minute)
     'volume': 1.0,     # Volume level (0.0 to 1.0)
-    'voice_preference': 'male'  # 'male', 'female', or 'auto'
+    'voice_preference': 'male',  # 'male', 'female', or 'auto'
+    'cache_enabled': True,       # Reuse synthesized audio for repeated phrases
+    'cache_dir': 'data/tts_cache',
+    'cache_max_mb': 200,         # Least recently used audio is evicted above this size
+    'prewarm_cache': True,       # Synthesize canned phrases in the background at startup
+    'probe_cache': 'data/tts_probe.json',  # Engine capabilities; re-probed when packages or PATH change
+    'parallel_workers': 0,       # Processes synthesizing sentences concurrently (coqui/espeak); 'auto' = one per core, 0 = off
+    'daemon_socket': 'data/tts_daemon.sock',  # Shared warm model served by tts_daemon.py; 'auto' uses it when running
+    'daemon_engine': 'coqui',    # Engine the daemon loads ('coqui' or 'espeak')
+    'daemon_autostart': False    # Start the daemon in the background when it is not running
 }
 
 # LLaMA Configuration
@@ -16,7 +25,20 @@ LLAMA_CONFIG = {
     'host_url': 'http://localhost:11434',
     'temperature': 0.7,
     'max_tokens': 200,
-    'timeout': 30
+    'timeout': 30,
+    'stream': True,    # Speak sentences while the rest of the answer is generated
+    'keep_alive': '30m',        # How long Ollama keeps the model loaded after a request
+    'preload': True,            # Load the model in the background at startup
+    'keep_warm_interval': 600   # Seconds idle before keep_alive is refreshed (0 disables)
+}
+
+# LLM Response Cache (answers to repeated questions)
+RESPONSE_CACHE_CONFIG = {
+    'enabled': True,
+    'db_path': 'assistant_memory.db',
+    'memory_entries': 256,     # Most recent answers kept in memory
+    'max_entries': 5000,       # Rows kept in the response_cache table
+    'ttl': 7 * 24 * 3600       # Seconds before a cached answer expires
 }
 
 # Speech Recognition Settings
@@ -24,14 +46,83 @@ SPEECH_CONFIG = {
     'timeout': 10,           # Listening timeout in seconds
     'phrase_time_limit': 10, # Maximum phrase duration
     'energy_threshold': 4000, # Microphone sensitivity
-    'dynamic_energy_threshold': True
+    'dynamic_energy_threshold': True,
+    'stt_backend': 'auto',   # 'auto' (Vosk when its model is present), 'vosk' or 'google'
+    'vosk_model_path': 'models/vosk-model-small-en-us-0.15',
+    'stt_sample_rate': 16000,
+    'vad_enabled': True,     # Frame-level voice activity detection for endpointing
+    'vad_backend': 'energy', # 'energy' (NumPy energy/zero-crossing) or 'webrtc'
+    'vad_aggressiveness': 2, # webrtcvad only, 0-3
+    'vad_frame_ms': 30,
+    'vad_hangover_ms': 300,  # Silence that ends an utterance
+    'vad_min_speech_ms': 90, # Speech needed before an utterance starts
+    'vad_preroll_ms': 300    # Audio kept from before speech was detected
+}
+
+# Wake Word (needs vosk and the model at SPEECH_CONFIG['vosk_model_path'])
+WAKE_WORD_CONFIG = {
+    'enabled': False,
+    'phrases': ['hey assistant', 'okay assistant'],
+    'model_path': None   # Defaults to SPEECH_CONFIG['vosk_model_path']
+}
+
+# Speculative Generation (needs a streaming recognizer such as Vosk)
+SPECULATIVE_CONFIG = {
+    'enabled': True,
+    'stable_ms': 300,          # A partial transcript unchanged this long starts generation
+    'min_words': 3,            # Shorter partials are not worth guessing from
+    'max_per_utterance': 2,    # Guesses started while one utterance is spoken
+    'max_wasted_tokens_per_minute': 400,  # Pause speculation when cancelled guesses cost more
+    'min_hit_rate': 0.3        # Over the last 20 guesses; below this only every fifth one runs
+}
+
+# Barge-in (talk over the assistant to interrupt it; needs the VAD)
+BARGE_IN_CONFIG = {
+    'enabled': True,         # Only with engines played through AudioPlayer (not pyttsx3 or windows)
+    'echo_margin': 1.0,      # Voice left after echo removal must be this many times the expected echo
+    'min_speech_ms': 200,    # Sustained voice needed to interrupt
+    'warmup_ms': 300,        # Playback used to learn the speaker-to-mic echo level before interrupting
+    'echo_latency_ms': 150   # Delay from playing a sound to hearing it in the microphone
+}
+
+# Pipeline Mode (python main.py --pipeline)
+PIPELINE_CONFIG = {
+    'enabled': False,       # Run capture, STT, LLM and TTS as overlapping stages
+    'queue_size': 4,        # Bound on each queue between stages
+    'executor_workers': 6   # Threads for blocking audio, STT and LLM calls
 }
 
 # Memory Settings
 MEMORY_CONFIG = {
     'max_conversation_size': 10,  # Number of exchanges to remember
-    'save_conversations': False,   # Save to file (future feature)
-    'context_window': 5           # Messages to include in AI context
+    'save_conversations': True,    # Persist turns and preferences to db_path
+    'db_path': 'assistant_memory.db',
+    'restore_turns': 10,          # Messages loaded from earlier sessions at startup
+    'log_path': 'data/conversation_log.txt',  # Readable log when DEBUG_CONFIG['log_conversations']
+    'context_window': 5,          # Messages in get_context_string()
+    'token_budget': 1200,         # History tokens sent to the LLM; old turns are summarized beyond this
+    'summary_tokens': 150,        # Size limit for the summary of dropped turns
+    'system_prompt': 'default'    # Key in SYSTEM_PROMPTS
+}
+
+# Long-Term Memory (vector recall of past turns and notes; needs numpy)
+LONG_TERM_MEMORY_CONFIG = {
+    'enabled': True,
+    'embedder': 'auto',        # 'auto', 'sentence-transformers', 'ollama' or 'hashing' (no model needed)
+    'sentence_model': 'all-MiniLM-L6-v2',
+    'ollama_model': 'nomic-embed-text',
+    'db_path': 'assistant_memory.db',
+    'vector_path': 'assistant_memory.vectors',  # Memory-mapped float32 matrix
+    'notes_file': 'data/notes.txt',
+    'top_k': 3,                # Memories added to each LLM request
+    'min_score': 0.3           # Minimum cosine similarity to be recalled
+}
+
+# Notes ("take a note ...", "what did I note about ...")
+NOTES_CONFIG = {
+    'db_path': 'assistant_memory.db',
+    'notes_file': 'data/notes.txt',  # Imported once; new notes are appended too
+    'max_results': 3                 # Notes read out per search
 }
 
 # Application Shortcuts
@@ -122,5 +213,10 @@ DEBUG_CONFIG = {
     'verbose_logging': False,
     'save_audio_files': False,
     'log_conversations': True,
-    'performance_monitoring': False
+    'performance_monitoring': False,  # Per-turn latency spans (see telemetry.py)
+    'startup_report': True,   # Print per-step startup times at the first "Listening..."
+    'trace_file': 'data/traces/trace.jsonl',    # One JSON line per turn
+    'metrics_file': 'data/traces/metrics.prom', # Prometheus text format
+    'metrics_window': 500,    # Recent spans used for p50/p95/p99
+    'metrics_interval': 10.0  # Seconds between metrics file rewrites
 }
@@ -0,0 +1,191 @@
+"""
+Durable conversation history in assistant_memory.db
+
+Turns and preferences are queued in memory and written by a single background
+thread in batched transactions, so the voice loop never waits on disk. The
+database runs in WAL mode so the startup restore and other readers do not
+block the writer.
+"""
+
+import atexit
+import datetime
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    ended_at REAL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id INTEGER NOT NULL REFERENCES conversations(id),
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_turns_conversation ON turns(conversation_id);
+CREATE TABLE IF NOT EXISTS preferences (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def connect(db_path):
+    """Open assistant_memory.db in WAL mode"""
+    db = sqlite3.connect(db_path, timeout=10)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class ConversationStore:
+    """Persist conversations, turns and preferences from a background writer"""
+    def __init__(self, db_path, batch_size=64, flush_interval=0.5, log_path=None):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.log_path = Path(log_path) if log_path else None
+        self.pending = queue.Queue()
+        self.closed = False
+
+        db = connect(db_path)
+        try:
+            db.executescript(SCHEMA)
+            cursor = db.execute("INSERT INTO conversations (started_at) VALUES (?)", (time.time(),))
+            self.conversation_id = cursor.lastrowid
+            db.commit()
+        finally:
+            db.close()
+
+        self.writer = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def add_turn(self, role, message, timestamp=None):
+        """Queue one message for writing; never blocks"""
+        if not self.closed:
+            self.pending.put(('turn', role, message, timestamp or time.time()))
+
+    def save_preference(self, key, value):
+        if not self.closed:
+            self.pending.put(('preference', key, str(value)))
+
+    def load_recent_turns(self, limit):
+        """The last turns across previous conversations, oldest first"""
+        db = connect(self.db_path)
+        try:
+            rows = db.execute(
+                "SELECT role, message, timestamp FROM turns WHERE conversation_id != ? "
+                "ORDER BY id DESC LIMIT ?",
+                (self.conversation_id, limit)
+            ).fetchall()
+        finally:
+            db.close()
+        return list(reversed(rows))
+
+    def load_preferences(self):
+        db = connect(self.db_path)
+        try:
+            return dict(db.execute("SELECT key, value FROM preferences").fetchall())
+        finally:
+            db.close()
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far is on disk"""
+        if self.closed:
+            return True
+        done = threading.Event()
+        self.pending.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self):
+        """Flush, mark the conversation as ended and stop the writer"""
+        if self.closed:
+            return
+        self.pending.put(('end', time.time()))
+        self.pending.put(None)
+        self.closed = True
+        self.writer.join(timeout=5.0)
+
+    def _run(self):
+        """Write queued items in batches, one transaction per batch"""
+        db = connect(self.db_path)
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Gather whatever else arrives shortly after, up to the batch size
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self.pending.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            turns = []
+            preferences = []
+            waiters = []
+            ended_at = None
+            for item in batch:
+                if item is None:
+                    running = False
+                elif item[0] == 'turn':
+                    turns.append((self.conversation_id,) + item[1:])
+                elif item[0] == 'preference':
+                    preferences.append(item[1:])
+                elif item[0] == 'flush':
+                    waiters.append(item[1])
+                elif item[0] == 'end':
+                    ended_at = item[1]
+
+            try:
+                with db:
+                    if turns:
+                        db.executemany(
+                            "INSERT INTO turns (conversation_id, role, message, timestamp) VALUES (?, ?, ?, ?)",
+                            turns
+                        )
+                    if preferences:
+                        db.executemany(
+                            "INSERT OR REPLACE INTO preferences (key, value) VALUES (?, ?)", preferences
+                        )
+                    if ended_at is not None:
+                        db.execute("UPDATE conversations SET ended_at = ? WHERE id = ?",
+                                   (ended_at, self.conversation_id))
+                if turns:
+                    self._append_log(turns)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Conversation store write error: {e}")
+
+            for waiter in waiters:
+                waiter.set()
+        db.close()
+
+    def _append_log(self, turns):
+        """Mirror turns to the human-readable conversation log"""
+        if self.log_path is None:
+            return
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            for _, role, message, timestamp in turns:
+                stamp = datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+                f.write(f"[{stamp}] {role}: {message}\n")
+
+
+def create_conversation_store(settings, log_conversations=False):
+    """Build the store from MEMORY_CONFIG, or None when persistence is off"""
+    if not settings.get('save_conversations', True):
+        return None
+    try:
+        return ConversationStore(
+            settings.get('db_path', 'assistant_memory.db'),
+            log_path=settings.get('log_path', 'data/conversation_log.txt') if log_conversations else None
+        )
+    except sqlite3.Error as e:
+        print(f"Conversation history will not be saved: {e}")
+        return None
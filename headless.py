@@ -0,0 +1,156 @@
+"""
+Headless text and batch mode
+
+Commands are read from stdin, a text file (one command per line) or a JSONL
+corpus (records with a "text", "command" or "transcript" key) and run through
+VoiceAssistant.process_command. No microphone, speaker, browser or application
+launcher is touched; one JSON line per turn is written with the responses and
+timings.
+
+    python main.py --headless < commands.txt
+    python main.py --headless --input transcripts.jsonl --output results.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from telemetry import tracer
+
+TEXT_KEYS = ('text', 'command', 'transcript')
+
+
+def read_commands(stream):
+    """Yield (command, record) pairs from plain text or JSONL lines"""
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if line.startswith('{'):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if isinstance(record, dict):
+                command = next((record[key] for key in TEXT_KEYS if record.get(key)), None)
+                if command:
+                    yield command, record
+                continue
+
+        yield line, {}
+
+
+def run_turn(assistant, command):
+    """Process one command and return its result record"""
+    assistant.spoken_responses = []
+    assistant.last_intent = None
+    assistant.last_error = None
+    timings = {}
+
+    tracer.begin_turn()
+    start_time = time.perf_counter()
+    continue_running = assistant.process_command(command, timings)
+    timings['total'] = time.perf_counter() - start_time
+
+    intent = assistant.last_intent
+    error = assistant.last_error
+    if error is not None:
+        route = 'error'
+    elif not continue_running:
+        route = 'exit'
+    elif intent is not None:
+        route = 'handled'
+    else:
+        route = 'llm'
+
+    tracer.end_turn(route=route, headless=True)
+
+    return {
+        'input': command,
+        'route': route,
+        'intent': intent.name if intent is not None else None,
+        'slots': intent.slots if intent is not None else {},
+        'responses': list(assistant.spoken_responses),
+        'continue': continue_running,
+        'error': str(error) if error is not None else None,
+        'timings_ms': {name: round(value * 1000, 3) for name, value in timings.items()}
+    }
+
+
+def run_batch(assistant, commands, output, isolate=False, stop_on_exit=False):
+    """Run every command and write one JSON line per turn; return a summary"""
+    turns = 0
+    start_time = time.perf_counter()
+
+    for command, record in commands:
+        if isolate:
+            # Every transcript starts from an empty conversation
+            assistant.memory.clear()
+
+        result = run_turn(assistant, command)
+        if 'id' in record:
+            result['id'] = record['id']
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        turns += 1
+
+        if stop_on_exit and not result['continue']:
+            break
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        'turns': turns,
+        'seconds': elapsed,
+        'turns_per_second': turns / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None, assistant_factory=None):
+    """Parse headless options and run the batch"""
+    parser = argparse.ArgumentParser(description="Run the assistant on text commands without audio")
+    parser.add_argument('--input', help="text or JSONL file of commands (default: stdin)")
+    parser.add_argument('--output', help="JSONL file for results (default: stdout)")
+    parser.add_argument('--no-llm', action='store_true',
+                        help="skip Ollama and use the built-in default responses")
+    parser.add_argument('--isolate', action='store_true',
+                        help="clear conversation memory before every command")
+    parser.add_argument('--stop-on-exit', action='store_true',
+                        help="stop at the first exit command instead of continuing")
+    parser.add_argument('--live', action='store_true',
+                        help="really open apps, URLs and screenshots instead of a dry run")
+    args = parser.parse_args(argv)
+
+    if assistant_factory is None:
+        from main import VoiceAssistant
+        assistant_factory = VoiceAssistant
+
+    # Diagnostics go to stderr so stdout stays valid JSONL
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        assistant = assistant_factory(headless=True, dry_run=not args.live)
+        if args.no_llm:
+            assistant.llama_client.is_ready = False
+
+        input_file = open(args.input, encoding='utf-8') if args.input else sys.stdin
+        output_file = open(args.output, 'w', encoding='utf-8') if args.output else stdout
+        try:
+            summary = run_batch(assistant, read_commands(input_file), output_file,
+                                isolate=args.isolate, stop_on_exit=args.stop_on_exit)
+        finally:
+            if args.input:
+                input_file.close()
+            if args.output:
+                output_file.close()
+    finally:
+        sys.stdout = stdout
+
+    print(f" {summary['turns']} turns in {summary['seconds']:.2f}s "
+          f"({summary['turns_per_second']:.1f} turns/sec)", file=sys.stderr)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Precompiled intent matcher for direct voice commands
+
+All shortcut phrases ("open chrome", "lock screen", "search google for" ...)
+are compiled once into a token trie. A command is matched in a single pass
+over its tokens, independent of how many shortcuts are configured.
+
+Run this file directly for a micro-benchmark against the old linear scans.
+"""
+
+import re
+from collections import namedtuple
+
+Intent = namedtuple('Intent', ['name', 'slots', 'start', 'end'])
+
+APP_VERBS = ['open', 'launch', 'start']
+WEBSITE_VERBS = ['open']
+SYSTEM_PHRASES = {
+    'lock computer': 'lock',
+    'lock screen': 'lock',
+    'shutdown computer': 'shutdown',
+    'screenshot': 'screenshot',
+    'take screenshot': 'screenshot',
+    'take a screenshot': 'screenshot',
+    'battery': 'battery'
+}
+SEARCH_PATTERNS = ['search google for', 'google search for', 'search for', 'google', 'look up']
+
+# Whole-utterance exit commands; a stray "stop" inside a sentence is not an exit
+EXIT_PHRASES = {'exit', 'quit', 'goodbye', 'good bye', 'bye', 'bye bye', 'stop', 'stop listening'}
+EXIT_FILLERS = {'ok', 'okay', 'please', 'now', 'assistant', 'thanks', 'thank', 'you', 'then', 'alright'}
+
+# Lower number wins when several shortcuts match (mirrors the old handler order)
+PRIORITIES = {'take_note': 0, 'search_notes': 0, 'open_app': 1, 'lock': 2, 'shutdown': 2, 'screenshot': 2, 'battery': 2, 'open_website': 3, 'search': 4}
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_END = object()
+
+
+class IntentRouter:
+    """Match commands against every configured shortcut in one pass"""
+    def __init__(self, apps, websites, extra_phrases=None):
+        self.trie = {}
+        self.size = 0
+
+        for app_name in apps:
+            for verb in APP_VERBS:
+                self.add(f"{verb} {app_name}", 'open_app', {'app': app_name})
+        for site_name in websites:
+            for verb in WEBSITE_VERBS:
+                self.add(f"{verb} {site_name}", 'open_website', {'site': site_name})
+        for phrase, name in SYSTEM_PHRASES.items():
+            self.add(phrase, name)
+        for pattern in SEARCH_PATTERNS:
+            self.add(pattern, 'search', rest_slot='query')
+        for phrase, name, rest_slot in extra_phrases or []:
+            self.add(phrase, name, rest_slot=rest_slot)
+
+    def add(self, phrase, name, slots=None, rest_slot=None, priority=None):
+        """Register a phrase; rest_slot captures the text that follows it"""
+        node = self.trie
+        for token in _TOKEN.findall(phrase.lower()):
+            node = node.setdefault(token, {})
+        node.setdefault(_END, []).append((PRIORITIES.get(name, 5) if priority is None else priority,
+                                          name, slots or {}, rest_slot))
+        self.size += 1
+
+    def match(self, command):
+        """Return the best intent for a command, or None"""
+        intents = self.match_all(command)
+        return intents[0] if intents else None
+
+    def match_all(self, command):
+        """Return every matching intent, best first"""
+        lowered = command.lower()
+        tokens = [(m.group(), m.start(), m.end()) for m in _TOKEN.finditer(lowered)]
+
+        if self._is_exit(tokens):
+            return [Intent('exit', {}, 0, len(command))]
+
+        candidates = []
+        for i in range(len(tokens)):
+            node = self.trie
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                for priority, name, slots, rest_slot in node.get(_END, ()):
+                    start, end = tokens[i][1], tokens[j][2]
+                    slot_values = dict(slots)
+                    if rest_slot:
+                        rest = lowered[end:].strip()
+                        if not rest:
+                            continue
+                        slot_values[rest_slot] = rest
+                    # Prefer higher priority, then earlier, then longer phrases
+                    candidates.append(((priority, start, -(end - start)), Intent(name, slot_values, start, end)))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [intent for _, intent in candidates]
+
+    def _is_exit(self, tokens):
+        words = [token for token, _, _ in tokens if token not in EXIT_FILLERS]
+        return bool(words) and " ".join(words) in EXIT_PHRASES
+
+
+def legacy_route(command, apps, websites):
+    """The pre-router substring scans, kept for benchmarking"""
+    command = command.lower()
+    if any(word in command for word in ['exit', 'quit', 'goodbye', 'bye', 'stop']):
+        return 'exit'
+    for app_name in apps:
+        if f'open {app_name}' in command or f'launch {app_name}' in command or f'start {app_name}' in command:
+            return 'open_app'
+    if 'lock computer' in command or 'lock screen' in command:
+        return 'lock'
+    if 'shutdown computer' in command:
+        return 'shutdown'
+    if 'screenshot' in command or 'take screenshot' in command:
+        return 'screenshot'
+    if 'battery' in command:
+        return 'battery'
+    for site_name in websites:
+        if f'open {site_name}' in command:
+            return 'open_website'
+    for pattern in ['search google for ', 'google search for ', 'search for ', 'google ', 'look up ']:
+        if pattern in command:
+            query = command.split(pattern, 1)
+            if len(query) > 1 and query[1].strip():
+                return 'search'
+    return None
+
+
+def benchmark(shortcut_counts=(14, 100, 1000, 5000), commands_per_run=2000):
+    """Time the router against legacy_route for growing shortcut tables"""
+    import random
+    import time
+
+    import config
+
+    random.seed(0)
+    print(f"{'shortcuts':>10} {'legacy us/cmd':>15} {'router us/cmd':>15} {'speedup':>9}")
+    for count in shortcut_counts:
+        apps = dict(config.APPLICATIONS)
+        websites = dict(config.WEBSITES)
+        for i in range(max(0, count - len(apps) - len(websites))):
+            (apps if i % 2 else websites)[f"shortcut{i}"] = []
+
+        names = list(apps) + list(websites)
+        templates = [
+            "open {}", "please launch {} for me", "what is the weather like today",
+            "search google for {} tutorials", "tell me a joke about {}", "take a screenshot"
+        ]
+        commands = [random.choice(templates).format(random.choice(names)) for _ in range(commands_per_run)]
+
+        router = IntentRouter(apps, websites)
+
+        start = time.perf_counter()
+        for command in commands:
+            legacy_route(command, apps, websites)
+        legacy_time = (time.perf_counter() - start) / len(commands) * 1e6
+
+        start = time.perf_counter()
+        for command in commands:
+            router.match(command)
+        router_time = (time.perf_counter() - start) / len(commands) * 1e6
+
+        print(f"{count:>10} {legacy_time:>15.1f} {router_time:>15.1f} {legacy_time / router_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,60 @@
+"""
+Deferred imports for heavy and optional modules
+
+lazy_import() finds a module without running it and returns a placeholder
+that executes the real import on first attribute access, so startup only pays
+for the libraries a session actually uses. Missing modules return None, which
+keeps the existing "module is None" checks working.
+
+The placeholder is not thread-safe before Python 3.12: while one thread runs
+the real import, another thread touching the module sees it half-initialized.
+Modules that several threads use at once are loaded up front with preload().
+"""
+
+import importlib.util
+import sys
+import threading
+
+_lock = threading.Lock()
+
+
+def module_available(name):
+    """True when the module can be imported; does not import it"""
+    if name in sys.modules:
+        return sys.modules[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name):
+    """Return the module, loaded on first use, or None when it is not installed"""
+    with _lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is None or spec.loader is None:
+            return None
+        spec.loader = importlib.util.LazyLoader(spec.loader)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        return module
+
+
+def preload(*names):
+    """Finish loading lazily imported modules now, before other threads use them"""
+    for name in names:
+        module = sys.modules.get(name)
+        if module is not None:
+            with _lock:
+                getattr(module, '__name__')  # Any attribute access runs the deferred import
+
+
+def missing_modules(*names):
+    """Names from the list that cannot be imported"""
+    return [name for name in names if not module_available(name)]
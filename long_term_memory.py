@@ -0,0 +1,371 @@
+"""
+Long-term memory: vector search over past turns and notes
+
+Each remembered text is embedded once and its unit vector is appended to a
+memory-mapped float32 matrix next to assistant_memory.db; the texts themselves
+live in the memory_items table. A query is one matrix-vector product over all
+rows plus a partial sort, so top-k retrieval stays in the low milliseconds at
+100k items. Run this file directly for a retrieval benchmark.
+"""
+
+import hashlib
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from lazy_imports import lazy_import
+
+# Loaded when the first vector is built, not when the assistant module is imported
+np = lazy_import('numpy')
+
+_WORD = re.compile(r"[a-z0-9']+")
+_NOTE_STAMP = re.compile(r"^\[[^\]]*\]\s*")
+
+
+class HashingEmbedder:
+    """Dependency-free embedder: signed feature hashing of words, bigrams and trigrams"""
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for word in words:
+                padded = f"#{word}#"
+                features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+            for feature in features:
+                digest = zlib.crc32(feature.encode('utf-8'))
+                vectors[row, digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        return vectors
+
+
+class OllamaEmbedder:
+    """Embeddings from a local Ollama embedding model (e.g. nomic-embed-text)"""
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+        self.name = f"ollama:{model}"
+        self.dim = len(self.client.embeddings(model=model, prompt="dimension probe")['embedding'])
+
+    def embed(self, texts):
+        return np.array([self.client.embeddings(model=self.model, prompt=text)['embedding'] for text in texts],
+                        dtype=np.float32)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a local sentence-transformers model"""
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.name = f"st:{model_name}"
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return np.asarray(self.model.encode(list(texts)), dtype=np.float32)
+
+
+def _normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    """Append-only memory-mapped matrix of unit vectors with top-k cosine search"""
+    def __init__(self, path, dim, count=0, initial_capacity=1024):
+        self.path = Path(path)
+        self.dim = dim
+        self.count = count
+        self.lock = threading.Lock()
+
+        row_bytes = dim * 4
+        existing = self.path.stat().st_size // row_bytes if self.path.exists() else 0
+        self.capacity = max(existing, initial_capacity, count)
+        self._map(self.capacity)
+
+    def _map(self, capacity):
+        """(Re)map the file at the given capacity, growing it if needed"""
+        self.matrix = None
+        with open(self.path, 'ab') as f:
+            f.truncate(max(capacity * self.dim * 4, f.tell()))
+        self.capacity = capacity
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+
+    def append(self, vectors):
+        """Add unit vectors; grows the file by doubling, never rebuilds"""
+        vectors = _normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        with self.lock:
+            needed = self.count + len(vectors)
+            if needed > self.capacity:
+                self.matrix.flush()
+                capacity = self.capacity
+                while capacity < needed:
+                    capacity *= 2
+                self._map(capacity)
+            self.matrix[self.count:needed] = vectors
+            self.matrix.flush()
+            first = self.count
+            self.count = needed
+        return first
+
+    def search(self, vector, k=3):
+        """Return (row, cosine) pairs for the k most similar rows, best first"""
+        query = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        with self.lock:
+            count = self.count
+            if count == 0:
+                return []
+            scores = self.matrix[:count] @ query
+
+        k = min(k, count)
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def reset(self):
+        with self.lock:
+            self.count = 0
+
+
+class LongTermMemory:
+    """Remember texts across sessions and recall the most relevant ones for a prompt"""
+    def __init__(self, db_path, vector_path, embedder):
+        self.db_path = db_path
+        self.embedder = embedder
+        self.texts = []      # Row number -> text
+        self.hashes = set()
+        self.pending = queue.Queue()
+
+        db = sqlite3.connect(db_path)
+        try:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS memory_items (
+                    row INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    text_hash TEXT NOT NULL UNIQUE,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS memory_index_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            meta = dict(db.execute("SELECT key, value FROM memory_index_meta").fetchall())
+            rows = db.execute("SELECT text, text_hash FROM memory_items ORDER BY row").fetchall()
+        finally:
+            db.close()
+
+        self.texts = [text for text, _ in rows]
+        self.hashes = {text_hash for _, text_hash in rows}
+        self.index = VectorIndex(vector_path, embedder.dim, count=len(rows))
+
+        # A different embedding model means the stored vectors are meaningless.
+        # The writer thread rebuilds them; until then searches find nothing.
+        rebuild = meta.get('embedder') != embedder.name or int(meta.get('count', -1)) != len(rows)
+        if rebuild:
+            self.index.reset()
+
+        self.writer = threading.Thread(target=self._run, args=(rebuild,), name="long-term-memory", daemon=True)
+        self.writer.start()
+
+    def _reembed_all(self, batch_size=256):
+        if self.texts:
+            print(f" Building long-term memory index with {self.embedder.name} ({len(self.texts)} items)...")
+        self.index.reset()
+        for start in range(0, len(self.texts), batch_size):
+            self.index.append(self.embedder.embed(self.texts[start:start + batch_size]))
+        self._save_meta()
+
+    def _save_meta(self):
+        db = sqlite3.connect(self.db_path)
+        try:
+            with db:
+                db.executemany("INSERT OR REPLACE INTO memory_index_meta (key, value) VALUES (?, ?)",
+                               [('embedder', self.embedder.name), ('count', str(self.index.count))])
+        finally:
+            db.close()
+
+    def add(self, text, kind='turn'):
+        """Queue a text to be embedded and indexed in the background"""
+        text = text.strip()
+        if text:
+            self.pending.put((kind, text))
+
+    def search(self, query, k=3, min_score=0.0):
+        """Return up to k (score, text) pairs relevant to query"""
+        if not query.strip() or self.index.count == 0:
+            return []
+        vector = self.embedder.embed([query])[0]
+        return [(score, self.texts[row]) for row, score in self.index.search(vector, k)
+                if score >= min_score and row < len(self.texts)]
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far is indexed"""
+        done = threading.Event()
+        self.pending.put(done)
+        return done.wait(timeout)
+
+    def import_notes(self, path):
+        """Index each line of a notes file such as data/notes.txt"""
+        path = Path(path)
+        if not path.exists():
+            return
+        for line in path.read_text(encoding='utf-8').splitlines():
+            self.add(_NOTE_STAMP.sub('', line), kind='note')
+
+    def _run(self, rebuild=False):
+        """Embed and append queued texts in small batches, after rebuilding the index if needed"""
+        if rebuild:
+            try:
+                self._reembed_all()
+            except Exception as e:
+                print(f"Long-term memory rebuild error: {e}")
+        db = sqlite3.connect(self.db_path)
+        while True:
+            batch = [self.pending.get()]
+            while len(batch) < 32:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = [item for item in batch if isinstance(item, threading.Event)]
+            items = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    continue
+                kind, text = item
+                text_hash = hashlib.sha1(text.lower().encode('utf-8')).hexdigest()
+                if text_hash not in self.hashes:
+                    self.hashes.add(text_hash)
+                    items.append((kind, text, text_hash))
+
+            if items:
+                try:
+                    vectors = self.embedder.embed([text for _, text, _ in items])
+                    with db:
+                        first = self.index.count
+                        db.executemany(
+                            "INSERT INTO memory_items (row, kind, text, text_hash, created_at) VALUES (?, ?, ?, ?, ?)",
+                            [(first + i, kind, text, text_hash, time.time())
+                             for i, (kind, text, text_hash) in enumerate(items)]
+                        )
+                        # Texts first so a search never sees a row without its text
+                        self.texts.extend(text for _, text, _ in items)
+                        self.index.append(vectors)
+                        db.execute("INSERT OR REPLACE INTO memory_index_meta (key, value) VALUES ('count', ?)",
+                                   (str(self.index.count),))
+                except Exception as e:
+                    print(f"Long-term memory indexing error: {e}")
+
+            for waiter in waiters:
+                waiter.set()
+
+
+# Embedder name prefix -> LONG_TERM_MEMORY_CONFIG['embedder'] backend
+_BACKENDS = {'st': 'sentence-transformers', 'ollama': 'ollama', 'hashing': 'hashing'}
+
+
+def stored_embedder(db_path):
+    """Name of the embedder the saved index was built with, or None"""
+    try:
+        db = sqlite3.connect(db_path)
+        try:
+            row = db.execute("SELECT value FROM memory_index_meta WHERE key = 'embedder'").fetchone()
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def create_embedder(settings, ollama_client=None, pinned=None):
+    """Pick the embedding backend named in LONG_TERM_MEMORY_CONFIG
+
+    In 'auto' mode the backend of the existing index (pinned) is kept, so
+    whether Ollama happens to be up at startup does not force a rebuild.
+    """
+    backend = settings.get('embedder', 'auto')
+    if backend == 'auto' and pinned:
+        backend = _BACKENDS.get(re.split(r'[:-]', pinned, 1)[0], 'auto')
+
+    if backend in ('auto', 'sentence-transformers'):
+        try:
+            return SentenceTransformerEmbedder(settings.get('sentence_model', 'all-MiniLM-L6-v2'))
+        except ImportError:
+            if backend != 'auto':
+                print(" sentence-transformers not installed")
+        except Exception as e:
+            print(f" sentence-transformers unavailable: {e}")
+
+    if backend in ('auto', 'ollama') and ollama_client is not None:
+        try:
+            return OllamaEmbedder(ollama_client, settings.get('ollama_model', 'nomic-embed-text'))
+        except Exception as e:
+            if backend != 'auto':
+                print(f" Ollama embeddings unavailable: {e}")
+
+    return HashingEmbedder(settings.get('hashing_dim', 512))
+
+
+def create_long_term_memory(settings, ollama_client=None):
+    """Build long-term memory from LONG_TERM_MEMORY_CONFIG, or None when it is off"""
+    if not settings.get('enabled', True):
+        return None
+    if np is None:
+        print(" Long-term memory disabled: install numpy")
+        return None
+    try:
+        db_path = settings.get('db_path', 'assistant_memory.db')
+        embedder = create_embedder(settings, ollama_client, pinned=stored_embedder(db_path))
+        memory = LongTermMemory(
+            db_path,
+            settings.get('vector_path', 'assistant_memory.vectors'),
+            embedder
+        )
+        if settings.get('notes_file'):
+            memory.import_notes(settings['notes_file'])
+        print(f" Long-term memory ready: {len(memory.texts)} items ({embedder.name})")
+        return memory
+    except (sqlite3.Error, OSError) as e:
+        print(f" Long-term memory disabled: {e}")
+        return None
+
+
+def benchmark(sizes=(1000, 10000, 100000), dim=384, queries=200):
+    """Time top-k search over random unit vectors"""
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    print(f"{'items':>8} {'dim':>5} {'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            index = VectorIndex(Path(directory) / f"bench{size}.f32", dim)
+            for start in range(0, size, 10000):
+                index.append(rng.standard_normal((min(10000, size - start), dim), dtype=np.float32))
+            timings = []
+            for _ in range(queries):
+                query = rng.standard_normal(dim, dtype=np.float32)
+                start_time = time.perf_counter()
+                index.search(query, k=3)
+                timings.append((time.perf_counter() - start_time) * 1000)
+            timings.sort()
+            print(f"{size:>8} {dim:>5} {timings[len(timings) // 2]:>8.2f} {timings[int(len(timings) * 0.99)]:>8.2f}")
+            index.matrix = None
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,3 +1,6 @@
+import argparse
+import hashlib
+import io
 import os
 import sys
 import subprocess
@@ -6,49 +9,100 @@ import datetime
 import random
 import time
 import json
+import queue
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-# Added MultiTTS
-import pygame
 from pathlib import Path
 
-try:
-    import speech_recognition as sr
-    import pyttsx3
-    import pyaudio
-    print(" All speech modules imported successfully")
-except ImportError as e:
-    print(f"Missing dependency: {e}")
-    print("Install with: pip install SpeechRecognition pyttsx3 pyaudio")
-    sys.exit(1)
+# Start of the startup report; project modules below are part of it
+_PROCESS_START = time.perf_counter()
 
-try:
-    import ollama
-    OLLAMA_AVAILABLE = True
-except ImportError:
-    OLLAMA_AVAILABLE = False
-    print("Ollama not available")
+import config
+from audio_output import AudioClip, AudioPlayer
+from conversation_store import create_conversation_store
+from intent_router import IntentRouter
+from lazy_imports import lazy_import, missing_modules, preload
+from long_term_memory import create_long_term_memory
+from notes import NOTE_COMMANDS, clean_note, create_note_store
+from parallel_tts import PARALLEL_ENGINES, ParallelSynthesizer, SynthesisStats
+from response_cache import ResponseCache, create_response_cache, normalize_prompt
+from speculative import create_speculative_generator
+from telemetry import tracer
+from text_utils import SentenceChunker, estimate_tokens, split_sentences
+from tts_backends import Pyttsx3Worker, create_espeak_synthesizer
+from tts_cache import TTSAudioCache
+from tts_daemon import connect_daemon
+from tts_probe import load_probe
 
-try:
-    import pyautogui
-    SCREENSHOT_AVAILABLE = True
-except ImportError:
-    SCREENSHOT_AVAILABLE = False
+# Heavy and optional modules are imported on first use (see lazy_imports.py)
+pygame = lazy_import('pygame')
+sr = lazy_import('speech_recognition')
+ollama = lazy_import('ollama')
+pyautogui = lazy_import('pyautogui')
+psutil = lazy_import('psutil')
 
-try:
-    import psutil
-    BATTERY_AVAILABLE = True
-except ImportError:
-    BATTERY_AVAILABLE = False
+# Used by more than one startup thread (VAD calibration, long-term memory), so
+# loaded before they start; see lazy_imports.preload()
+SHARED_STARTUP_MODULES = ('numpy',)
+
+# Audio input is optional so headless mode runs without it; main() checks for it
+SPEECH_MODULES = ('speech_recognition', 'pyttsx3', 'pyaudio')
+SPEECH_AVAILABLE = not missing_modules(*SPEECH_MODULES)
+OLLAMA_AVAILABLE = ollama is not None
+SCREENSHOT_AVAILABLE = pyautogui is not None
+BATTERY_AVAILABLE = psutil is not None
+if not OLLAMA_AVAILABLE:
+    print("Ollama not available", file=sys.stderr)
 
 class MultiTTS:
     """Multi-engine TTS class to replace pyttsx3 and fix vocal response issues"""
+    # Engines that synthesize to memory and can be served from the cache
+    CLIP_ENGINES = ('coqui', 'elevenlabs', 'google', 'espeak', 'daemon')
+    VOICES = {
+        'coqui': 'tts_models/en/ljspeech/tacotron2-DDC',
+        'elevenlabs': 'Adam',
+        'google': 'en',
+        'espeak': 'en'
+    }
+    
     def __init__(self, engine="auto"):
+        self.probe = load_probe(config.TTS_CONFIG)
+        self.daemon = None
+        self.windows_process = None   # PowerShell speaking for the windows engine
         self.engine = self._select_engine(engine)
+        self.rate = config.TTS_CONFIG.get('rate', 140)
+        self.synth_lock = threading.Lock()
         pygame.mixer.init()
+        self.player = AudioPlayer()
+        
+        self.cache = None
+        if config.TTS_CONFIG.get('cache_enabled', True):
+            try:
+                self.cache = TTSAudioCache(
+                    config.TTS_CONFIG.get('cache_dir', 'data/tts_cache'),
+                    config.TTS_CONFIG.get('cache_max_mb', 200)
+                )
+            except OSError as e:
+                print(f"TTS cache disabled: {e}")
+        
+        # Long answers can be synthesized sentence by sentence in worker processes
+        self.stats = SynthesisStats()
+        self.parallel = None
+        workers = config.TTS_CONFIG.get('parallel_workers', 0)
+        if workers and self.engine in PARALLEL_ENGINES and self.probe.available(self.engine):
+            workers = os.cpu_count() if workers == 'auto' else int(workers)
+            self.parallel = ParallelSynthesizer(self.engine, self.VOICES[self.engine], self.rate,
+                                                workers=workers, stats=self.stats)
+            self.parallel.warm_up()
+            print(f" Parallel TTS: {self.parallel.workers} {self.engine} workers")
         
         # Initialize chosen engine
-        if self.engine == "coqui":
+        load_start = time.perf_counter()
+        if self.engine == "coqui" and self.parallel is not None:
+            pass  # The workers hold the model; loading it here too would cost another copy
+        elif self.engine == "coqui":
             try:
                 from TTS.api import TTS
                 self.tts = TTS("tts_models/en/ljspeech/tacotron2-DDC")
@@ -66,95 +120,242 @@ class MultiTTS:
                 self.gtts = True
             except ImportError:
                 self.engine = "windows" if sys.platform.startswith('win') else "pyttsx3"
+        elif self.engine == "espeak":
+            self.espeak = create_espeak_synthesizer(self.VOICES['espeak'], self.rate,
+                                                    self.probe.get('espeak', 'library'))
         
-        # Default to pyttsx3 with engine reinitialization fix
+        # pyttsx3 runs on one long-lived worker that restarts itself if the driver dies
         if self.engine == "pyttsx3":
-            self.pyttsx3_available = True
+            self.pyttsx3_worker = Pyttsx3Worker(
+                rate=self.rate,
+                volume=config.TTS_CONFIG.get('volume', 1.0),
+                voice_preference=config.TTS_CONFIG.get('voice_preference', 'male')
+            )
+        self.probe.record_load_time(self.engine, time.perf_counter() - load_start)
     
     def _select_engine(self, preference):
-        """Auto-select best available engine"""
-        if preference != "auto":
-            return preference
-        
-        # Trying Coqui first (best quality local)
-        try:
-            import TTS
-            return "coqui"
-        except ImportError:
-            pass
+        """Auto-select best available engine from the cached capability probe"""
+        # A running TTS daemon already has a model loaded; use it before loading our own
+        if preference in ("auto", "daemon"):
+            self.daemon = self._connect_daemon(preference)
+            if self.daemon is not None:
+                info = self.daemon.info()
+                self.VOICES = dict(self.VOICES, daemon=f"{info['engine']}:{info['voice']}")
+                print(f" TTS engine: daemon ({info['engine']}, pid {info['pid']})")
+                return "daemon"
+            if preference == "daemon":
+                print(" TTS daemon unavailable - choosing another engine")
+                preference = "auto"
         
-        # Try Windows SAPI (reliable on Windows)
-        if sys.platform.startswith('win'):
-            return "windows"
-        
-        # Try eSpeak (lightweight Default)
-        try:
-            if os.system("espeak --version > /dev/null 2>&1") == 0:
-                return "espeak"
-        except:
-            pass
-        
-        # Default to Google TTS (requires internet)
-        try:
-            import gtts
-            return "google"
-        except ImportError:
-            pass
-        
-        # Final Default to fixed pyttsx3
-        return "pyttsx3"
+        engine = self.probe.choose(preference)
+        source = "cached probe" if self.probe.from_cache else "probe"
+        print(f" TTS engine: {engine} ({source})")
+        return engine
+    
+    def _connect_daemon(self, preference):
+        """Client for the TTS daemon in TTS_CONFIG, or None"""
+        settings = config.TTS_CONFIG
+        socket_path = Path(settings.get('daemon_socket', 'data/tts_daemon.sock'))
+        can_start = settings.get('daemon_autostart', False) and (
+            preference == "daemon" or self.probe.available(settings.get('daemon_engine', 'coqui'))
+        )
+        if preference == "auto" and not socket_path.exists() and not can_start:
+            return None
+        return connect_daemon(dict(settings, daemon_autostart=can_start), self.VOICES)
     
-    def speak(self, text):
-        """Universal speak method with engine-specific implementations"""
+    def speak(self, text, wait=True):
+        """Universal speak method with engine-specific implementations
+        
+        Returns the playback handle for queued audio, or None when the engine spoke directly.
+        """
         if not text or not text.strip():
-            return
+            return None
         
         print(f"🗣️ Speaking with {self.engine}: {text}")
         
         try:
-            if self.engine == "coqui":
-                self._coqui_speak(text)
-            elif self.engine == "elevenlabs":
-                self._elevenlabs_speak(text)
-            elif self.engine == "google":
-                self._google_speak(text)
+            handle = None
+            sentences = split_sentences(text) if self.parallel is not None else None
+            if sentences and len(sentences) > 1:
+                handle = self._speak_parallel(sentences)
+                if wait and handle is not None:
+                    handle.wait()
+            elif self.engine in self.CLIP_ENGINES:
+                if self.parallel is not None and not wait:
+                    # Streamed answers: this sentence synthesizes while earlier ones play
+                    clip = self._pending_clip(text)
+                else:
+                    clip = self.synthesize(text)
+                handle = self.player.enqueue(clip)
+                if wait:
+                    handle.wait()
             elif self.engine == "windows":
-                self._windows_speak(text)
-            elif self.engine == "espeak":
-                self._espeak_speak(text)
+                with tracer.span('tts.speak'):
+                    self._windows_speak(text)
             elif self.engine == "pyttsx3":
-                self._pyttsx3_speak_fixed(text)
+                handle = self.pyttsx3_worker.speak(text)
+                if wait:
+                    handle.wait()
+                    if handle.error is not None:
+                        raise handle.error
             
-            print(" Speech completed successfully")
+            if wait:
+                print(" Speech completed successfully")
+            return handle
             
         except Exception as e:
             print(f" TTS Error with {self.engine}: {e}")
             # Try Default
             self._Default_speak(text)
+            return None
+    
+    def _speak_parallel(self, sentences):
+        """Synthesize sentences concurrently and queue each one as soon as it and those before it are ready"""
+        generation = self.player.generation
+        clips = [self._cached_clip(sentence) for sentence in sentences]
+        futures = {index: self.parallel.submit(sentence)
+                   for index, sentence in enumerate(sentences) if clips[index] is None}
+        handle = None
+        try:
+            for index, sentence in enumerate(sentences):
+                clip = clips[index]
+                if clip is None:
+                    with tracer.span('tts.synthesis'):
+                        clip = self.parallel.result(futures[index])
+                    self._cache_clip(sentence, clip)
+                # stop() was called while waiting; drop the rest
+                if self.player.generation != generation:
+                    return None
+                handle = self.player.enqueue(clip)
+        finally:
+            for future in futures.values():
+                future.cancel()
+        
+        stats = self.stats.summary().get(self.engine, {})
+        print(f" Synthesized {len(sentences)} sentences in parallel ({self.engine} RTF so far: "
+              f"{stats.get('rtf')} per worker, {stats.get('wall_rtf')} wall clock)")
+        return handle
+    
+    def _pending_clip(self, text):
+        """Cached clip, or a PendingClip the player waits for while the pool synthesizes it"""
+        clip = self._cached_clip(text)
+        if clip is not None:
+            return clip
+        return self.parallel.pending(text, on_ready=lambda clip: self._cache_clip(text, clip))
+    
+    def _cached_clip(self, text):
+        if self.cache is None:
+            return None
+        # Read under the cache lock; the prewarm thread may be evicting files
+        cached = self.cache.read(TTSAudioCache.make_key(self.engine, self.VOICES.get(self.engine), self.rate, text))
+        return AudioClip(*cached) if cached is not None else None
+    
+    def _cache_clip(self, text, clip):
+        if self.cache is not None:
+            self.cache.put(TTSAudioCache.make_key(self.engine, self.VOICES.get(self.engine), self.rate, text),
+                           clip.data, clip.format)
+    
+    def close(self):
+        """Stop the synthesis worker processes and disconnect from the TTS daemon"""
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.daemon is not None:
+            self.daemon.close()
+    
+    def stop(self):
+        """Cut off current speech and drop anything queued"""
+        self.player.stop()
+        if self.parallel is not None:
+            self.parallel.cancel()
+        if self.engine == "espeak":
+            self.espeak.cancel()
+        elif self.engine == "daemon":
+            self.daemon.cancel()
+        elif self.engine == "windows":
+            process = self.windows_process
+            if process is not None and process.poll() is None:
+                process.terminate()
+        elif self.engine == "pyttsx3":
+            self.pyttsx3_worker.stop()
+    
+    def synthesize(self, text):
+        """Render text to an in-memory AudioClip, using the cache when possible"""
+        clip = self._cached_clip(text)
+        if clip is not None:
+            return clip
+        
+        if self.parallel is not None:
+            with tracer.span('tts.synthesis'):
+                clip = self.parallel.synthesize(text)
+        else:
+            with self.synth_lock, tracer.span('tts.synthesis'):
+                start_time = time.perf_counter()
+                clip = self._synthesize_clip(text)
+                audio_seconds = clip.duration()
+                if audio_seconds:
+                    self.stats.add(self.engine, time.perf_counter() - start_time, audio_seconds)
+        self._cache_clip(text, clip)
+        return clip
     
-    def _coqui_speak(self, text):
+    def _synthesize_clip(self, text):
+        """Render text with the active engine"""
+        if self.engine == "coqui":
+            return self._coqui_synthesize(text)
+        elif self.engine == "elevenlabs":
+            return self._elevenlabs_synthesize(text)
+        elif self.engine == "google":
+            return self._google_synthesize(text)
+        elif self.engine == "espeak":
+            return self._espeak_synthesize(text)
+        elif self.engine == "daemon":
+            pcm = self.daemon.synthesize(text)
+            return AudioClip.from_pcm(pcm, self.daemon.sample_rate)
+        raise ValueError(f"{self.engine} cannot synthesize to memory")
+    
+    def prewarm(self, phrases):
+        """Synthesize known phrases into the cache in the background"""
+        if self.cache is None or self.engine not in self.CLIP_ENGINES:
+            return None
+        
+        def warm():
+            warmed = 0
+            for phrase in phrases:
+                try:
+                    key = TTSAudioCache.make_key(self.engine, self.VOICES.get(self.engine), self.rate, phrase)
+                    if self.cache.get(key) is None:
+                        self.synthesize(phrase)
+                        warmed += 1
+                except Exception as e:
+                    print(f"TTS cache warm-up error: {e}")
+                    return
+            print(f" TTS cache warmed with {warmed} new phrases")
+        
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+    
+    def _coqui_synthesize(self, text):
         """Coqui TTS implementation"""
-        self.tts.tts_to_file(text=text, file_path="temp_audio.wav")
-        self._play_audio("temp_audio.wav")
+        import numpy as np
+        samples = np.clip(np.asarray(self.tts.tts(text=text), dtype=np.float32), -1.0, 1.0)
+        pcm = (samples * 32767).astype('<i2').tobytes()
+        return AudioClip.from_pcm(pcm, self.tts.synthesizer.output_sample_rate)
     
-    def _elevenlabs_speak(self, text):
+    def _elevenlabs_synthesize(self, text):
         """ElevenLabs TTS implementation"""
         from elevenlabs import generate
-        audio = generate(text=text, voice="Adam")
-        with open("temp_audio.wav", "wb") as f:
-            f.write(audio)
-        self._play_audio("temp_audio.wav")
+        audio = generate(text=text, voice=self.VOICES['elevenlabs'])
+        return AudioClip(audio, 'mp3')
     
-    def _google_speak(self, text):
+    def _google_synthesize(self, text):
         """Google TTS implementation"""
         from gtts import gTTS
-        tts = gTTS(text=text, lang='en')
-        tts.save("temp_audio.mp3")
-        self._play_audio("temp_audio.mp3")
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.VOICES['google']).write_to_fp(buffer)
+        return AudioClip(buffer.getvalue(), 'mp3')
     
     def _windows_speak(self, text):
         """ Windows TTS with base64 encoding to avoid all PowerShell quote issues"""
-        import os
         import base64
     
         try:
@@ -162,16 +363,16 @@ class MultiTTS:
             encoded_text = base64.b64encode(text.encode('utf-8')).decode('ascii')
         
             
-            command = (
-                f'powershell -NoProfile -Command "'
+            script = (
                 f'Add-Type -AssemblyName System.Speech; '
                 f'$synth = New-Object System.Speech.Synthesis.SpeechSynthesizer; '
                 f'$decoded = [System.Text.Encoding]::UTF8.GetString([System.Convert]::FromBase64String(\'{encoded_text}\')); '
                 f'$synth.Speak($decoded)'
-                f'"'
             )
         
-            os.system(command)
+            # A child process, not os.system, so stop() can cut it off
+            self.windows_process = subprocess.Popen(['powershell', '-NoProfile', '-Command', script])
+            self.windows_process.wait()
         
         except Exception as e:
             print(f"Windows TTS error: {e}")
@@ -179,56 +380,10 @@ class MultiTTS:
             print(f"  Default: {text}")
 
     
-    def _espeak_speak(self, text):
+    def _espeak_synthesize(self, text):
         """eSpeak TTS implementation"""
-        # Escape quotes and special characters
-        clean_text = text.replace('"', '\\"')
-        os.system(f'espeak "{clean_text}" 2>/dev/null')
-    
-    def _pyttsx3_speak_fixed(self, text):
-        """reinitialize engine each time"""
-        try:
-            #Reinitialize engine each time to prevent death
-            engine = pyttsx3.init()
-            engine.setProperty('rate', 140)
-            engine.setProperty('volume', 1.0)
-            
-            # Select male voice if available
-            voices = engine.getProperty('voices')
-            if voices:
-                for voice in voices:
-                    if 'male' in voice.name.lower() or 'david' in voice.name.lower():
-                        engine.setProperty('voice', voice.id)
-                        break
-            
-            engine.say(text)
-            engine.runAndWait()  # Must have parentheses!
-            
-            # Brief delay to ensure completion
-            time.sleep(0.1)
-            
-        except Exception as e:
-            print(f"pyttsx3 error: {e}")
-            self._Default_speak(text)
-    
-    def _play_audio(self, file_path):
-        """Play audio file using pygame"""
-        try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to complete
-            while pygame.mixer.music.get_busy():
-                pygame.time.wait(100)
-            
-            # Clean up temp file
-            try:
-                Path(file_path).unlink()
-            except:
-                pass
-                
-        except Exception as e:
-            print(f"Audio playback error: {e}")
+        pcm = self.espeak.synthesize(text)
+        return AudioClip.from_pcm(pcm, self.espeak.sample_rate)
     
     def _Default_speak(self, text):
         """ Default - try Windows SAPI or print"""
@@ -241,17 +396,121 @@ class MultiTTS:
             print(f"  Default: {text}")
 
 class ConversationMemory:
-    """Simple memory system to maintain context"""
-    def __init__(self, max_size=10):
-        self.context = []
-        self.max_size = max_size
+    """Conversation history laid out as a prefix-stable chat message list
+    
+    Turns are only ever appended. When the history outgrows its token budget
+    (or max_size exchanges) the oldest turns are folded into a short summary in
+    one step, down to half the limit, so the prefix Ollama has in its KV cache
+    stays the same for many turns between compactions.
+    
+    With a ConversationStore attached, every message and preference is also
+    queued for writing to assistant_memory.db; with a LongTermMemory attached,
+    messages are indexed for later recall. The history is locked because
+    speculative generation and pipeline stages read it from other threads.
+    """
+    ROLES = {'User': 'user', 'Assistant': 'assistant'}
+    
+    def __init__(self, max_size=None, token_budget=None, system_prompt=None, summary_tokens=None,
+                 store=None, long_term=None):
+        settings = config.MEMORY_CONFIG
+        self.store = store
+        self.long_term = long_term
+        self.context = deque()
+        self.max_size = max_size or settings.get('max_conversation_size', 10)
+        self.token_budget = token_budget or settings.get('token_budget', 1200)
+        self.summary_tokens = summary_tokens or settings.get('summary_tokens', 150)
+        self.context_window = settings.get('context_window', 5)
+        self.system_prompt = system_prompt or config.SYSTEM_PROMPTS[settings.get('system_prompt', 'default')]
         self.user_preferences = {}
+        
+        self.summary = deque()   # One short note per dropped user turn
+        self.history_tokens = 0
+        self.compactions = 0
+        self._system_message = {"role": "system", "content": self.system_prompt}
+        self._messages = []      # Plain role/content dicts mirroring self.context
+        self.lock = threading.RLock()
     
     def add_message(self, role, message):
         """Add message to conversation history"""
-        self.context.append({"role": role, "message": message, "timestamp": datetime.datetime.now()})
-        if len(self.context) > self.max_size:
-            self.context.pop(0)
+        self._append(role, message, datetime.datetime.now())
+        if self.store is not None:
+            self.store.add_turn(role, message)
+        if self.long_term is not None:
+            self.long_term.add(f"{role}: {message}")
+    
+    def restore(self, turns, preferences):
+        """Load (role, message, unix time) turns and preferences saved by earlier sessions"""
+        for role, message, timestamp in turns:
+            self._append(role, message, datetime.datetime.fromtimestamp(timestamp))
+        self.user_preferences.update(preferences)
+    
+    def _append(self, role, message, timestamp):
+        tokens = estimate_tokens(message)
+        with self.lock:
+            self.context.append({"role": role, "message": message, "timestamp": timestamp, "tokens": tokens})
+            self._messages.append({"role": self.ROLES.get(role, 'user'), "content": message})
+            self.history_tokens += tokens
+            
+            if self.history_tokens > self.token_budget or len(self.context) > self.max_size * 2:
+                self._compact()
+    
+    def messages(self, prompt=None, recalled=None):
+        """Chat messages for the LLM: system prompt, then the turns in order
+        
+        The prompt is appended as the last user turn unless it was already
+        added to the history. Recalled long-term memories go in a system
+        message just before that turn, so the cached prefix is unaffected.
+        """
+        with self.lock:
+            messages = [self._system_message] + self._messages
+            if prompt and not (self.context and self.context[-1]['role'] == 'User'
+                               and self.context[-1]['message'] == prompt):
+                messages.append({"role": "user", "content": prompt})
+        if recalled:
+            note = {"role": "system", "content": "Things you remember from earlier conversations and notes:\n"
+                                                  + "\n".join(f"- {text}" for text in recalled)}
+            messages.insert(len(messages) - 1 if prompt else len(messages), note)
+        return messages
+    
+    def recall(self, prompt, k=3, min_score=0.0):
+        """Long-term memories relevant to prompt that are not already in the history"""
+        if self.long_term is None:
+            return []
+        with self.lock:
+            recent = {f"{entry['role']}: {entry['message']}" for entry in self.context}
+        return [text for _, text in self.long_term.search(prompt, k + len(recent), min_score)
+                if text not in recent][:k]
+    
+    def _compact(self):
+        """Fold the oldest turns into the summary until the history is at half its limits"""
+        while self.context and (self.history_tokens > self.token_budget // 2
+                                or len(self.context) > self.max_size):
+            entry = self.context.popleft()
+            self.history_tokens -= entry['tokens']
+            if entry['role'] == 'User':
+                words = entry['message'].split()
+                self.summary.append(" ".join(words[:12]) + ("..." if len(words) > 12 else ""))
+        
+        while self.summary and estimate_tokens("; ".join(self.summary)) > self.summary_tokens:
+            self.summary.popleft()
+        
+        content = self.system_prompt
+        if self.summary:
+            content += "\n\nEarlier in this conversation the user asked: " + "; ".join(self.summary)
+        self._system_message = {"role": "system", "content": content}
+        self._messages = [{"role": self.ROLES.get(entry['role'], 'user'), "content": entry['message']}
+                          for entry in self.context]
+        self.compactions += 1
+        tracer.count('memory.compaction')
+    
+    def clear(self):
+        """Forget the conversation (preferences are kept)"""
+        with self.lock:
+            self.context.clear()
+            self.summary.clear()
+            self.history_tokens = 0
+            self._system_message = {"role": "system", "content": self.system_prompt}
+            self._messages = []
     
     def get_context_string(self):
         """Get context as formatted string for LLaMA"""
@@ -259,124 +518,280 @@ class ConversationMemory:
             return ""
         
         context_str = "\nRecent conversation:\n"
-        for entry in self.context[-5:]:  # Last 5 messages
+        with self.lock:
+            entries = list(self.context)[-self.context_window:]  # Last few messages
+        for entry in entries:
             context_str += f"{entry['role']}: {entry['message']}\n"
         return context_str
     
     def save_preference(self, key, value):
         """Save user preference"""
         self.user_preferences[key] = value
+        if self.store is not None:
+            self.store.save_preference(key, value)
     
     def get_preference(self, key):
         """Get user preference"""
         return self.user_preferences.get(key)
 
 class LlamaClient:
-    """ LLaMA 3.1 8B client with conversation support"""
-    def __init__(self, model_name="llama3.1:8b", host_url="http://localhost:11434"):
-        self.model_name = model_name
-        self.host_url = host_url
+    """ LLaMA 3.1 8B client with conversation support
+    
+    Uses one pooled ollama.Client for every request, preloads the model in the
+    background at startup and re-sends keep_alive while idle so the first
+    question after a pause does not pay the model load time. Repeated
+    questions are answered from the response cache.
+    """
+    def __init__(self, model_name=None, host_url=None, settings=None, headless=False):
+        self.settings = settings if settings is not None else config.LLAMA_CONFIG
+        self.model_name = model_name or self.settings.get('model_name', 'llama3.1:8b')
+        self.host_url = host_url or self.settings.get('host_url', 'http://localhost:11434')
+        self.keep_alive = self.settings.get('keep_alive', '30m')
+        self.system_prompt = config.SYSTEM_PROMPTS[config.MEMORY_CONFIG.get('system_prompt', 'default')]
         self.is_ready = False
+        self.client = None
+        self.last_used = 0.0
+        self.stop_event = threading.Event()
+        self.generation = 0   # Bumped by cancel() to abandon in-flight streams
+        self.cache = create_response_cache(getattr(config, 'RESPONSE_CACHE_CONFIG', {}), headless=headless)
         
         if OLLAMA_AVAILABLE:
+            # httpx keeps the connection open between requests
+            self.client = ollama.Client(host=self.host_url, timeout=self.settings.get('timeout', 30))
             self.is_ready = self.check_connection()
             if self.is_ready:
-                print(f" LLaMA 3.1 8B connected: {model_name}")
+                print(f" LLaMA 3.1 8B connected: {self.model_name}")
+                if self.settings.get('preload', True):
+                    threading.Thread(target=self.warm_up, daemon=True).start()
+                interval = self.settings.get('keep_warm_interval', 600)
+                if interval:
+                    threading.Thread(target=self._keep_warm, args=(interval,), daemon=True).start()
             else:
                 print(" LLaMA not available - using Default responses")
     
     def check_connection(self):
         """Check if Ollama server is running and model is available"""
-        import requests
         try:
-            response = requests.get(f"{self.host_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                models = [model.get('name', '') for model in data.get('models', [])]
-                return any('llama3.1' in model.lower() for model in models)
-            return False
+            models = [model.get('name', '') for model in self.client.list().get('models', [])]
+            wanted = self.model_name.lower()
+            if ':' not in wanted:
+                wanted += ':latest'
+            return any(model.lower() == wanted for model in models)
         except Exception as e:
             print(f"Connection check failed: {e}")
             return False
     
-    def generate_response(self, prompt, context="", max_tokens=200):
+    def warm_up(self):
+        """Load the model into memory without generating anything"""
+        try:
+            start_time = time.perf_counter()
+            self.client.generate(model=self.model_name, prompt="", keep_alive=self.keep_alive)
+            self.last_used = time.monotonic()
+            print(f" LLaMA model loaded in {time.perf_counter() - start_time:.1f}s")
+        except Exception as e:
+            print(f"LLaMA warm-up failed: {e}")
+    
+    def _keep_warm(self, interval):
+        """Refresh keep_alive whenever the model has been idle for an interval"""
+        while not self.stop_event.wait(interval):
+            if time.monotonic() - self.last_used >= interval:
+                self.warm_up()
+    
+    def close(self):
+        """Stop the keep-warm thread"""
+        self.stop_event.set()
+    
+    def cancel(self):
+        """Abandon every response being streamed; closing the stream stops Ollama generating"""
+        self.generation += 1
+    
+    def _cache_key(self, prompt, messages, max_tokens):
+        """Cache key for a prompt, or None when it must be generated fresh
+        
+        The fingerprint covers the system prompt and any recalled memories but
+        not the conversation history, which grows every turn; questions that
+        depend on earlier turns are left to the follow-up bypass. The prompt
+        itself is keyed in normalized form so phrasing variants still match.
+        """
+        if self.cache is None:
+            return None
+        normalized = normalize_prompt(prompt)
+        reason = ResponseCache.bypass_reason(normalized)
+        if reason is not None:
+            self.cache.note_bypass(reason)
+            return None
+        # The first system message also carries the rolling summary; key on the configured prompt
+        recalled = [message['content'] for message in messages[1:] if message.get('role') == 'system']
+        context = json.dumps([self.system_prompt, recalled])
+        fingerprint = hashlib.sha256(context.encode('utf-8')).hexdigest()
+        return ResponseCache.make_key(normalized, fingerprint, self.model_name, self._options(max_tokens))
+    
+    def _options(self, max_tokens):
+        return {
+            "temperature": self.settings.get('temperature', 0.7),
+            "num_predict": max_tokens or self.settings.get('max_tokens', 200)
+        }
+    
+    def _build_messages(self, prompt, messages=None):
+        """Build the chat messages sent to Ollama
+        
+        Conversation history comes from ConversationMemory.messages(); without
+        it the prompt is sent on its own after the system prompt.
+        """
+        if messages:
+            return messages
+        return [{"role": "system", "content": self.system_prompt}, {"role": "user", "content": prompt}]
+    
+    def generate_response(self, prompt, messages=None, max_tokens=None):
         """Generate response using LLaMA 3.1 8B"""
         if not self.is_ready:
             return None
         
+        messages = self._build_messages(prompt, messages)
+        cache_key = self._cache_key(prompt, messages, max_tokens)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(" Answered from response cache")
+                return cached
+        
         try:
-            # Create comprehensive prompt for natural conversation
-            system_prompt = """You are a helpful AI voice assistant running on a PC. You should:
-- Give natural, conversational responses
-- Be concise but informative
-- Sound friendly and approachable
-- Answer questions directly and helpfully
-- For chit-chat, be engaging and personable
-- Keep responses under 50 words unless more detail is specifically requested"""
-            
-            full_prompt = f"{system_prompt}\n{context}\nUser: {prompt}\nAssistant:"
-            
             # Call Ollama
-            response = ollama.chat(
+            self.last_used = time.monotonic()
+            response = self.client.chat(
                 model=self.model_name,
-                messages=[{"role": "user", "content": full_prompt}],
-                options={"temperature": 0.7, "max_tokens": max_tokens}
+                messages=messages,
+                options=self._options(max_tokens),
+                keep_alive=self.keep_alive
             )
             
             if response and 'message' in response:
-                return response['message']['content'].strip()
+                answer = response['message']['content'].strip()
+                if cache_key is not None and answer:
+                    self.cache.put(cache_key, prompt, answer, self.model_name)
+                return answer
             
         except Exception as e:
             print(f"LLaMA generation error: {e}")
         
         return None
+    
+    def stream_response(self, prompt, messages=None, max_tokens=None):
+        """Yield response tokens from LLaMA 3.1 8B as they are generated"""
+        if not self.is_ready:
+            return
+        
+        messages = self._build_messages(prompt, messages)
+        cache_key = self._cache_key(prompt, messages, max_tokens)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(" Answered from response cache")
+                yield cached
+                return
+        
+        self.last_used = time.monotonic()
+        generation = self.generation
+        stream = self.client.chat(
+            model=self.model_name,
+            messages=messages,
+            options=self._options(max_tokens),
+            keep_alive=self.keep_alive,
+            stream=True
+        )
+        
+        tokens = []
+        for chunk in stream:
+            if self.generation != generation:
+                stream.close()
+                print(" LLaMA generation cancelled")
+                return
+            token = chunk.get('message', {}).get('content', '')
+            if token:
+                tokens.append(token)
+                yield token
+        self.last_used = time.monotonic()
+        
+        # Only complete answers are cached; an abandoned stream never gets here
+        answer = "".join(tokens).strip()
+        if cache_key is not None and answer:
+            self.cache.put(cache_key, prompt, answer, self.model_name)
 
 class VoiceAssistant:
     """Main AI Voice Assistant with LLaMA 3.1 8B integration and Fixed TTS"""
     
-    def __init__(self):
+    def __init__(self, headless=False, dry_run=None):
         print(" Initializing Enhanced AI Voice Assistant with MultiTTS...")
         
-        # Initialize speech recognition
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        # Headless mode has no microphone or TTS; responses are collected instead
+        self.headless = headless
+        self.dry_run = headless if dry_run is None else dry_run
+        self.spoken_responses = []
+        self.last_intent = None
+        self.last_error = None
         
-        # Calibrate microphone
-        with self.microphone as source:
-            print("🎤 Calibrating microphone...")
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        self.recognizer = None
+        self.microphone = None
+        self.stt = None
+        self.endpointer = None
+        self.wake_word = None
+        self.barge_in = None
+        self.tts = None
+        self.startup_timings = {}
+        self.startup_reported = False
         
-        # REPLACED: Initialize MultiTTS instead of pyttsx3
-        self.tts = MultiTTS(engine="auto")  # Will auto-select best available TTS
-        print(" ")
+        # Mic calibration, TTS engine load, the Ollama check and the databases do
+        # not depend on each other, so they start together instead of in turn
+        if not headless:
+            preload(*SHARED_STARTUP_MODULES)
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="startup") as pool:
+            audio_ready = tts_ready = store_ready = None
+            if not headless:
+                audio_ready = pool.submit(self._timed_init, 'audio input', self._init_audio_input)
+                # REPLACED: Initialize MultiTTS instead of pyttsx3
+                tts_ready = pool.submit(self._timed_init, 'tts', MultiTTS, engine="auto")
+                # Headless batches are not saved; live sessions pick up where the last one ended
+                store_ready = pool.submit(self._timed_init, 'conversation store', self._load_conversation_store)
+            llama_ready = pool.submit(self._timed_init, 'llm', LlamaClient, headless=headless)
+            notes_ready = pool.submit(self._timed_init, 'notes', create_note_store,
+                                      config.NOTES_CONFIG, headless=headless)
+            
+            # Ollama embeddings are only tried once the server is known to be up
+            self.llama_client = llama_ready.result()
+            self.long_term_memory = None
+            if not headless:
+                self.long_term_memory = self._timed_init(
+                    'long-term memory', create_long_term_memory, config.LONG_TERM_MEMORY_CONFIG,
+                    self.llama_client.client if self.llama_client.is_ready else None
+                )
+            
+            self.conversation_store, turns, preferences = (
+                store_ready.result() if store_ready is not None else (None, [], {})
+            )
+            self.notes = notes_ready.result()
+            if audio_ready is not None:
+                audio_ready.result()
+            if tts_ready is not None:
+                self.tts = tts_ready.result()
+                print(" ")
         
-        # Initialize AI and memory
-        self.llama_client = LlamaClient()
-        self.memory = ConversationMemory()
+        self.memory = ConversationMemory(system_prompt=self.llama_client.system_prompt,
+                                         store=self.conversation_store, long_term=self.long_term_memory)
+        if self.conversation_store is not None:
+            self.memory.restore(turns, preferences)
+            if turns:
+                print(f" Restored {len(turns)} messages from the last conversation")
         
         # Configuration
-        self.websites = {
-            'youtube': 'https://www.youtube.com',
-            'instagram': 'https://www.instagram.com',
-            'linkedin': 'https://www.linkedin.com',          
-            'gmail': 'https://mail.google.com',
-            'facebook': 'https://www.facebook.com',
-            'twitter': 'https://twitter.com',
-            'reddit': 'https://www.reddit.com',
-            'netflix': 'https://www.netflix.com',
-            'spotify': 'https://open.spotify.com',
-            'github': 'https://github.com',
-            'discord': 'https://discord.com'
-        }
+        self.websites = dict(config.WEBSITES)
+        self.apps = dict(config.APPLICATIONS)
+        self.router = IntentRouter(self.apps, self.websites,
+                                   extra_phrases=NOTE_COMMANDS if self.notes is not None else None)
         
-        self.apps = {
-            'chrome': ['chrome.exe', 'google-chrome', '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'],
-            'brave': ['brave.exe', 'brave-browser', '/Applications/Brave Browser.app/Contents/MacOS/Brave Browser'],
-            'firefox': ['firefox.exe', 'firefox', '/Applications/Firefox.app/Contents/MacOS/firefox'],
-            'notepad': ['notepad.exe', 'gedit', '/Applications/TextEdit.app/Contents/MacOS/TextEdit'],
-            'calculator': ['calc.exe', 'gnome-calculator', '/Applications/Calculator.app/Contents/MacOS/Calculator'],
-            'spotify': ['spotify.exe', 'spotify', '/Applications/Spotify.app/Contents/MacOS/Spotify']
-        }
+        # Streaming recognizers let the LLM start on a stable partial transcript
+        self.speculation = None
+        if not headless:
+            self.speculation = create_speculative_generator(config.SPECULATIVE_CONFIG, self)
         
         # Default responses for when LLaMA is not available
         self.Default_responses = {
@@ -402,50 +817,366 @@ class VoiceAssistant:
             ]
         }
         
+        self.welcome_messages = [
+            "Hello! I'm your  AI voice assistant, I'm ready to help with anything you need!",
+            "Hi there! Your AI assistant is online and ready to assist you.",
+            "Welcome! I'm your personal AI assistant, How can I help you today?"
+        ]
+        
+        # Fixed phrases spoken by command handlers
+        self.fixed_responses = {
+            'goodbye': "Goodbye! It's been great talking with you. Have a wonderful day!",
+            'farewell': "Voice assistant shutting down. Thanks for using me! Goodbye!",
+            'no_answer': "I'm not sure how to help with that. Could you try asking me something else?",
+            'command_error': "I encountered an error processing that request. Please try again.",
+            'loop_error': "I encountered an issue, but I'm still here and ready to help!",
+            'stt_error': "I'm having trouble with speech recognition. Please try again.",
+            'lock': "Locking your computer now!",
+            'shutdown': "Are you sure you want to shutdown? This is just a demo response for safety.",
+            'screenshot_saved': "Screenshot taken and saved to your desktop!",
+            'screenshot_failed': "Sorry, I couldn't take a screenshot.",
+            'screenshot_unavailable': "Screenshot feature is not available. Please install pyautogui.",
+            'battery_unavailable': "Battery information is not available on this system.",
+            'battery_error': "Sorry, I couldn't check the battery status."
+        }
+        
+        if self.tts is not None and config.TTS_CONFIG.get('prewarm_cache', True):
+            self.tts.prewarm(self._canned_phrases())
+        
+        self.last_stream_stats = None
+        self.speech_sink = None  # Set by the pipeline to take over speech output
         self.running = True
-        print(" Enhanced AI Voice Assistant ready!")
+        self.startup_timings['ready'] = time.perf_counter() - _PROCESS_START
+        print(f" Enhanced AI Voice Assistant ready! ({self.startup_timings['ready']:.2f}s)")
+    
+    def _timed_init(self, name, factory, *args, **kwargs):
+        """Run one startup step and remember how long it took"""
+        start_time = time.perf_counter()
+        try:
+            return factory(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start_time
+            self.startup_timings[name] = seconds
+            tracer.record(f"startup.{name.replace(' ', '_')}", seconds)
+    
+    def _load_conversation_store(self):
+        """Open the conversation store and read back what the last session said"""
+        store = create_conversation_store(
+            config.MEMORY_CONFIG, config.DEBUG_CONFIG.get('log_conversations', False)
+        )
+        if store is None:
+            return None, [], {}
+        turns = store.load_recent_turns(config.MEMORY_CONFIG.get('restore_turns', 10))
+        return store, turns, store.load_preferences()
+    
+    def _announce_listening(self):
+        """Prompt the user to speak; the first time, also print the startup report"""
+        print("\n Listening... (speak now)")
+        if not self.startup_reported:
+            self.startup_reported = True
+            self.startup_timings['first listening'] = time.perf_counter() - _PROCESS_START
+            if config.DEBUG_CONFIG.get('startup_report', True):
+                self.print_startup_report()
+    
+    def print_startup_report(self):
+        """Per-step startup times; steps run in parallel, so they overlap"""
+        print(" Startup timing:")
+        for name, seconds in self.startup_timings.items():
+            if name not in ('ready', 'first listening'):
+                print(f"   {name:<20} {seconds * 1000:8.0f} ms")
+        for name in ('ready', 'first listening'):
+            if name in self.startup_timings:
+                print(f"   {name:<20} {self.startup_timings[name]:8.2f} s  (since launch)")
+    
+    def _init_audio_input(self, microphone=None):
+        """Open the microphone (or a stand-in source) and set up STT, VAD and the wake word"""
+        from stt_backends import create_stt_backend
+        from vad import create_endpointer
+        from wake_word import create_wake_word_detector
+        
+        # Initialize speech recognition
+        self.recognizer = sr.Recognizer()
+        self.stt = create_stt_backend(self.recognizer, config.SPEECH_CONFIG)
+        self.microphone = microphone or sr.Microphone(sample_rate=self.stt.sample_rate)
+        
+        self.recognizer.energy_threshold = config.SPEECH_CONFIG.get('energy_threshold', 4000)
+        self.recognizer.dynamic_energy_threshold = config.SPEECH_CONFIG.get('dynamic_energy_threshold', True)
+        self.listen_timeout = config.SPEECH_CONFIG.get('timeout', 10)
+        self.phrase_time_limit = config.SPEECH_CONFIG.get('phrase_time_limit', 10)
+        
+        # Frame-level VAD decides where utterances start and end
+        self.endpointer = None
+        if config.SPEECH_CONFIG.get('vad_enabled', True):
+            self.endpointer = create_endpointer(config.SPEECH_CONFIG, self.microphone.SAMPLE_RATE)
+        
+        # Optional wake word; only after it fires does a phrase go to STT
+        self.wake_word = None
+        if config.WAKE_WORD_CONFIG.get('enabled', False):
+            if self.endpointer is not None:
+                wake_vad = self.endpointer.vad
+            else:
+                wake_vad = create_endpointer(config.SPEECH_CONFIG, self.microphone.SAMPLE_RATE).vad
+            self.wake_word = create_wake_word_detector(
+                config.WAKE_WORD_CONFIG, config.SPEECH_CONFIG, self.stt, wake_vad
+            )
+        
+        # Mic stays open while the assistant answers so the user can interrupt
+        if config.BARGE_IN_CONFIG.get('enabled', True):
+            from barge_in import create_barge_in_monitor
+            self.barge_in = create_barge_in_monitor(self, config.BARGE_IN_CONFIG, config.SPEECH_CONFIG)
+        
+        # Calibrate microphone
+        with self.microphone as source:
+            print("🎤 Calibrating microphone...")
+            if self.endpointer is not None:
+                self.endpointer.vad.calibrate(source, duration=0.5)
+            else:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                if self.wake_word is not None:
+                    self.wake_word.vad.calibrate(source, duration=0.5)
+    
+    def _canned_phrases(self):
+        """All fixed phrases the assistant is known to speak"""
+        phrases = list(self.welcome_messages)
+        phrases.extend(self.fixed_responses.values())
+        for responses in self.Default_responses.values():
+            phrases.extend(responses)
+        for app_name in self.apps:
+            phrases.append(f"Opening {app_name.title()}!")
+        for site_name in self.websites:
+            phrases.append(f"Opening {site_name.title()} in your browser!")
+        return phrases
     
     def listen_command(self):
         """Capture user voice input and convert to text"""
+        # An utterance that interrupted the last answer is already recorded
+        if self.barge_in is not None:
+            audio = self.barge_in.take_audio()
+            if audio is not None:
+                return self.transcribe(audio)
+        
+        if self.stt.streaming:
+            return self.listen_streaming()
+        
+        audio = self.capture_audio()
+        if audio is None:
+            return None
+        return self.transcribe(audio)
+    
+    def capture_audio(self):
+        """Record one phrase from the microphone"""
         try:
             with self.microphone as source:
-                print("\n Listening... (speak now)")
-                audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=10)
+                start_time = time.perf_counter()
+                if not self._wait_for_wake_word(source):
+                    return None
+                self._announce_listening()
+                if self.endpointer is not None:
+                    from vad import capture_utterance
+                    audio = capture_utterance(source, self.endpointer, self.listen_timeout, self.phrase_time_limit)
+                    self._record_capture(start_time)
+                    return audio
+                with tracer.span('capture'):
+                    return self.recognizer.listen(source, timeout=self.listen_timeout,
+                                                  phrase_time_limit=self.phrase_time_limit)
             
-            print(" Processing speech...")
-            command = self.recognizer.recognize_google(audio)
+        except sr.WaitTimeoutError:
+            print(" No speech detected")
+            return None
+        except Exception as e:
+            print(f" Listen error: {e}")
+            return None
+    
+    def listen_streaming(self):
+        """Capture and decode at the same time with a streaming recognizer"""
+        try:
+            with self.microphone as source:
+                start_time = time.perf_counter()
+                if not self._wait_for_wake_word(source):
+                    return None
+                self._announce_listening()
+                command = self.stt.listen(source, timeout=self.listen_timeout,
+                                          phrase_time_limit=self.phrase_time_limit,
+                                          on_partial=self._on_partial_transcript,
+                                          endpointer=self.endpointer)
+                self._record_capture(start_time)
             print(f" You said: '{command}'")
             return command.strip()
             
         except sr.WaitTimeoutError:
             print(" No speech detected")
             return None
+        except sr.UnknownValueError:
+            print(" Could not understand speech")
+            return None
+        except Exception as e:
+            print(f" Listen error: {e}")
+            return None
+    
+    def _record_capture(self, start_time):
+        """Split a finished capture into waiting for speech and the utterance itself"""
+        if not tracer.enabled:
+            return
+        now = time.perf_counter()
+        speech_started_at = self.endpointer.speech_started_at if self.endpointer is not None else None
+        if speech_started_at is None:
+            tracer.record('capture', now - start_time)
+            return
+        tracer.record('listen_wait', speech_started_at - start_time)
+        tracer.record('capture', now - speech_started_at)
+    
+    def _wait_for_wake_word(self, source):
+        """Hold the open microphone until the wake phrase is heard; False if it never was"""
+        if self.wake_word is None:
+            return True
+        print(f"\n Waiting for wake word ({', '.join(self.wake_word.phrases)})...")
+        phrase = self.wake_word.wait(source)
+        if phrase is None:
+            print(" Stopped waiting for the wake word")
+            return False
+        print(f" Wake word detected: '{phrase}'")
+        return True
+    
+    def _on_partial_transcript(self, partial):
+        """Show partial hypotheses while the user is still talking"""
+        print(f"   ... {partial}")
+        if self.speculation is not None:
+            self.speculation.on_partial(partial)
+    
+    def transcribe(self, audio):
+        """Convert captured audio to text"""
+        try:
+            print(" Processing speech...")
+            with tracer.span('stt'):
+                command = self.stt.transcribe(audio)
+            print(f" You said: '{command}'")
+            return command.strip()
+            
         except sr.UnknownValueError:
             print(" Could not understand speech")
             self.speak_response(" ")
             return None
         except sr.RequestError as e:
             print(f" Speech recognition error: {e}")
-            self.speak_response("I'm having trouble with speech recognition. Please try again.")
+            self.speak_response(self.fixed_responses['stt_error'])
             return None
         except Exception as e:
             print(f" Listen error: {e}")
             return None
     
-    def speak_response(self, text):
+    def speak_response(self, text, wait=True):
         """FIXED: Use MultiTTS for reliable vocal responses"""
         if not text or not text.strip():
-            return
+            return None
+        
+        if self.headless:
+            print(f" Assistant: {text}")
+            self.spoken_responses.append(text)
+            return None
+        
+        # The user talked over this answer; say nothing more of it
+        if self._interrupted():
+            return None
+        
+        # Pipeline mode takes over synthesis and playback
+        if self.speech_sink is not None:
+            self.speech_sink(text)
+            return None
         
         # Use the new MultiTTS system - no threading issues!
-        self.tts.speak(text)
+        return self.tts.speak(text, wait=wait)
+    
+    def _interrupted(self):
+        """True once barge-in has cut off the current answer"""
+        return self.barge_in is not None and self.barge_in.triggered.is_set()
+    
+    def response_sentences(self, prompt):
+        """Yield LLaMA response sentences as soon as each one is complete"""
+        # An answer speculatively started from the partial transcript may already be under way
+        tokens = self.speculation.claim(prompt) if self.speculation is not None else None
+        if tokens is None:
+            tokens = self.llama_client.stream_response(prompt, self.memory.messages(prompt, self._recall(prompt)))
+        chunker = SentenceChunker()
+        start_time = time.perf_counter()
+        first_token = True
+        for token in tokens:
+            if first_token:
+                tracer.record('llm.first_token', time.perf_counter() - start_time)
+                first_token = False
+            for sentence in chunker.feed(token):
+                yield sentence
+        tracer.record('llm.total', time.perf_counter() - start_time)
+        yield from chunker.flush()
+    
+    def _recall(self, prompt):
+        """Long-term memories to add to the LLM context for this prompt"""
+        settings = config.LONG_TERM_MEMORY_CONFIG
+        with tracer.span('memory.recall'):
+            return self.memory.recall(prompt, settings.get('top_k', 3), settings.get('min_score', 0.3))
+    
+    def stream_response(self, prompt):
+        """Speak a LLaMA response sentence by sentence while it is still being generated"""
+        sentences = queue.Queue()
+        start_time = time.perf_counter()
+        
+        def produce():
+            try:
+                for sentence in self.response_sentences(prompt):
+                    # Leaving the loop closes the LLM stream
+                    if self._interrupted():
+                        break
+                    sentences.put(sentence)
+            except Exception as e:
+                print(f"LLaMA streaming error: {e}")
+            finally:
+                sentences.put(None)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
+        # Queue each sentence as soon as it is complete; playback is gapless
+        spoken = []
+        first_handle = None
+        first_queued_at = None
+        last_handle = None
+        while True:
+            sentence = sentences.get()
+            if sentence is None or self._interrupted():
+                break
+            handle = self.speak_response(sentence, wait=False)
+            if first_queued_at is None:
+                first_handle = handle
+                first_queued_at = time.perf_counter()
+            last_handle = handle or last_handle
+            spoken.append(sentence)
+        
+        producer.join()
+        if last_handle is not None:
+            last_handle.wait()
+        
+        time_to_first_audio = None
+        if first_handle is not None and first_handle.started_at is not None:
+            time_to_first_audio = first_handle.started_at - start_time
+        elif first_queued_at is not None:
+            time_to_first_audio = first_queued_at - start_time
+        if time_to_first_audio is not None:
+            print(f" Time to first audio: {time_to_first_audio * 1000:.0f} ms")
+            tracer.record('response.first_audio', time_to_first_audio)
+        self.last_stream_stats = {
+            'time_to_first_audio': time_to_first_audio,
+            'total_time': time.perf_counter() - start_time,
+            'sentences': len(spoken)
+        }
+        
+        return " ".join(spoken) if spoken else None
     
     def generate_response(self, prompt, is_question=True):
         """Generate AI response using LLaMA 3.1 8B with context"""
-        context = self.memory.get_context_string()
-        
         if self.llama_client.is_ready:
-            response = self.llama_client.generate_response(prompt, context)
+            with tracer.span('llm.total'):
+                response = self.llama_client.generate_response(
+                    prompt, self.memory.messages(prompt, self._recall(prompt))
+                )
             if response:
                 return response
         
@@ -461,141 +1192,187 @@ class VoiceAssistant:
         else:
             return random.choice(self.Default_responses['unknown'])
     
-    def process_command(self, command):
-        """Process and execute commands - distinguish between direct commands and queries"""
+    def process_command(self, command, timings=None):
+        """Process and execute commands - distinguish between direct commands and queries
+        
+        If a timings dict is passed, route and response durations are recorded in it.
+        """
         if not command:
             return True
         
-        command_lower = command.lower()
-        
-        # Add to conversation memory
-        self.memory.add_message("User", command)
-        
+        self.last_error = None
         try:
-            # EXIT COMMANDS
-            if any(word in command_lower for word in ['exit', 'quit', 'goodbye', 'bye', 'stop']):
-                response = "Goodbye! It's been great talking with you. Have a wonderful day!"
-                self.speak_response(response)
-                self.memory.add_message("Assistant", response)
+            start_time = time.perf_counter()
+            route = self.route_command(command)
+            tracer.record('routing', time.perf_counter() - start_time)
+            if timings is not None:
+                timings['route'] = time.perf_counter() - start_time
+            if route == 'exit':
                 return False
             
-            # SYSTEM COMMANDS - Execute immediately
-            if self._handle_system_commands(command_lower):
-                return True
-            
-            # WEB COMMANDS - Execute immediately  
-            if self._handle_web_commands(command_lower):
-                return True
-            
-            # SEARCH COMMANDS - Execute immediately
-            if self._handle_search_commands(command_lower, command):
-                return True
-            
             # ALL OTHER QUERIES - Send to LLaMA 3.1 8B
-            response = self.generate_response(command)
-            if response:
-                self.speak_response(response)
-                self.memory.add_message("Assistant", response)
-            else:
-                Default = "I'm not sure how to help with that. Could you try asking me something else?"
-                self.speak_response(Default)
-                self.memory.add_message("Assistant", Default)
+            if route == 'llm':
+                start_time = time.perf_counter()
+                self.answer_query(command)
+                if timings is not None:
+                    timings['response'] = time.perf_counter() - start_time
             
             return True
             
         except Exception as e:
             print(f" Command processing error: {e}")
-            error_response = "I encountered an error processing that request. Please try again."
+            self.last_error = e
+            error_response = self.fixed_responses['command_error']
             self.speak_response(error_response)
             return True
     
-    def _handle_system_commands(self, command):
-        """Handle direct system commands"""
-        # Application launching
-        for app_name, commands in self.apps.items():
-            if f'open {app_name}' in command or f'launch {app_name}' in command or f'start {app_name}' in command:
-                success = self._open_application(app_name)
-                if success:
-                    response = f"Opening {app_name.title()}!"
-                else:
-                    response = f"Sorry, I couldn't open {app_name}. Make sure it's installed."
-                self.speak_response(response)
+    def route_command(self, command):
+        """Run exit and direct commands; return 'exit', 'handled' or 'llm'"""
+        # Add to conversation memory
+        self.memory.add_message("User", command)
+        
+        # EXIT, SYSTEM, WEB and SEARCH COMMANDS - Execute immediately
+        for intent in self.router.match_all(command):
+            # Set before running the handler so a turn that fails still names its intent
+            self.last_intent = intent
+            if self._handle_intent(intent):
+                return 'exit' if intent.name == 'exit' else 'handled'
+        
+        self.last_intent = None
+        return 'llm'
+    
+    def answer_query(self, command):
+        """Answer a query with LLaMA, streaming into TTS when enabled"""
+        if config.LLAMA_CONFIG.get('stream', True) and self.llama_client.is_ready:
+            response = self.stream_response(command)
+            if response:
                 self.memory.add_message("Assistant", response)
-                return True
+                return response
+        
+        # Non-streaming LLaMA or Default responses
+        response = self.generate_response(command)
+        if not response:
+            response = self.fixed_responses['no_answer']
+        self.speak_response(response)
+        self.memory.add_message("Assistant", response)
+        return response
+    
+    def _handle_intent(self, intent):
+        """Execute a routed intent; return False to let the next candidate try"""
+        if intent.name == 'exit':
+            response = self.fixed_responses['goodbye']
+            self.speak_response(response)
+            self.memory.add_message("Assistant", response)
+            return True
+        
+        # Application launching
+        if intent.name == 'open_app':
+            app_name = intent.slots['app']
+            success = self._open_application(app_name)
+            if success:
+                response = f"Opening {app_name.title()}!"
+            else:
+                response = f"Sorry, I couldn't open {app_name}. Make sure it's installed."
+            self.speak_response(response)
+            self.memory.add_message("Assistant", response)
+            return True
         
         # System commands
-        if 'lock computer' in command or 'lock screen' in command:
-            self.speak_response("Locking your computer now!")
-            if sys.platform.startswith('win'):
+        if intent.name == 'lock':
+            self.speak_response(self.fixed_responses['lock'])
+            if self.dry_run:
+                print(" [dry-run] lock workstation")
+            elif sys.platform.startswith('win'):
                 os.system("rundll32.exe user32.dll,LockWorkStation")
             self.memory.add_message("Assistant", "Locked the computer")
             return True
         
-        if 'shutdown computer' in command:
-            self.speak_response("Are you sure you want to shutdown? This is just a demo response for safety.")
+        if intent.name == 'shutdown':
+            self.speak_response(self.fixed_responses['shutdown'])
             self.memory.add_message("Assistant", "Shutdown request (demo only)")
             return True
         
-        if 'screenshot' in command or 'take screenshot' in command:
-            if SCREENSHOT_AVAILABLE:
+        if intent.name == 'screenshot':
+            if SCREENSHOT_AVAILABLE or self.dry_run:
                 success = self._take_screenshot()
                 if success:
-                    response = "Screenshot taken and saved to your desktop!"
+                    response = self.fixed_responses['screenshot_saved']
                 else:
-                    response = "Sorry, I couldn't take a screenshot."
+                    response = self.fixed_responses['screenshot_failed']
             else:
-                response = "Screenshot feature is not available. Please install pyautogui."
+                response = self.fixed_responses['screenshot_unavailable']
             
             self.speak_response(response)
             self.memory.add_message("Assistant", response)
             return True
         
-        if 'battery' in command and BATTERY_AVAILABLE:
+        if intent.name == 'battery' and BATTERY_AVAILABLE:
             battery_info = self._get_battery_status()
             self.speak_response(battery_info)
             self.memory.add_message("Assistant", battery_info)
             return True
         
-        return False
-    
-    def _handle_web_commands(self, command):
-        """Handle website opening commands"""
-        for site_name, url in self.websites.items():
-            if f'open {site_name}' in command:
-                webbrowser.open(url)
-                response = f"Opening {site_name.title()} in your browser!"
-                self.speak_response(response)
-                self.memory.add_message("Assistant", response)
-                return True
-        return False
-    
-    def _handle_search_commands(self, command_lower, original_command):
-        """Handle web search commands"""
-        search_patterns = [
-            'search google for ',
-            'google search for ',
-            'search for ',
-            'google ',
-            'look up '
-        ]
+        # Notes
+        if intent.name == 'take_note':
+            text = clean_note(intent.slots['text'])
+            if not text:
+                return False
+            self.notes.add(text)
+            if self.long_term_memory is not None:
+                self.long_term_memory.add(text, kind='note')
+            response = f"Got it. I noted: {text}"
+            self.speak_response(response)
+            self.memory.add_message("Assistant", response)
+            return True
         
-        for pattern in search_patterns:
-            if pattern in command_lower:
-                query = original_command.lower().split(pattern, 1)
-                if len(query) > 1 and query[1].strip():
-                    search_query = query[1].strip()
-                    search_url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
-                    webbrowser.open(search_url)
-                    response = f"Searching Google for: {search_query}"
-                    self.speak_response(response)
-                    self.memory.add_message("Assistant", response)
-                    return True
+        if intent.name == 'search_notes':
+            query = intent.slots['query']
+            start_time = time.perf_counter()
+            results = self.notes.search(query, limit=config.NOTES_CONFIG.get('max_results', 3))
+            print(f" Note search took {(time.perf_counter() - start_time) * 1000:.1f} ms")
+            if results:
+                found = ". ".join(snippet for _, snippet, _ in results)
+                response = f"You noted: {found}"
+            else:
+                response = f"I couldn't find any notes about {query}."
+            self.speak_response(response)
+            self.memory.add_message("Assistant", response)
+            return True
+        
+        # Website opening
+        if intent.name == 'open_website':
+            site_name = intent.slots['site']
+            self._open_url(self.websites[site_name])
+            response = f"Opening {site_name.title()} in your browser!"
+            self.speak_response(response)
+            self.memory.add_message("Assistant", response)
+            return True
+        
+        # Web search
+        if intent.name == 'search':
+            search_query = intent.slots['query']
+            search_url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
+            self._open_url(search_url)
+            response = f"Searching Google for: {search_query}"
+            self.speak_response(response)
+            self.memory.add_message("Assistant", response)
+            return True
         
         return False
     
+    def _open_url(self, url):
+        """Open a URL in the default browser"""
+        if self.dry_run:
+            print(f" [dry-run] open {url}")
+            return True
+        return webbrowser.open(url)
+    
     def _open_application(self, app_name):
         """Open system application"""
         if app_name in self.apps:
+            if self.dry_run:
+                print(f" [dry-run] launch {self.apps[app_name][0] if self.apps[app_name] else app_name}")
+                return True
             for command in self.apps[app_name]:
                 try:
                     subprocess.Popen([command])
@@ -608,6 +1385,9 @@ class VoiceAssistant:
     
     def _take_screenshot(self):
         """Take screenshot and save to desktop"""
+        if self.dry_run:
+            print(" [dry-run] take screenshot")
+            return True
         try:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"screenshot_{timestamp}.png"
@@ -639,21 +1419,15 @@ class VoiceAssistant:
                 
                 return f"Battery is at {percent} percent and {plugged}. {status_comment}"
             else:
-                return "Battery information is not available on this system."
+                return self.fixed_responses['battery_unavailable']
         except Exception:
-            return "Sorry, I couldn't check the battery status."
+            return self.fixed_responses['battery_error']
     
     def main_loop(self):
         """Main continuous listening loop"""
         # Welcome message
-        welcome_messages = [
-            "Hello! I'm your  AI voice assistant, I'm ready to help with anything you need!",
-            "Hi there! Your AI assistant is online and ready to assist you.",
-            "Welcome! I'm your personal AI assistant, How can I help you today?"
-        ]
-        
-        welcome = random.choice(welcome_messages)
-        self.speak_response(welcome)
+        welcome = random.choice(self.welcome_messages)
+        self._timed_init('welcome', self.speak_response, welcome)
         self.memory.add_message("Assistant", welcome)
         
         print("\n Enhanced AI Voice Assistant is active!")
@@ -664,6 +1438,7 @@ class VoiceAssistant:
         print("   • 'Open YouTube' or 'Open Instagram' - Websites")
         print("   • 'Search Google for Python tutorials' - Web search")
         print("   • 'Take a screenshot' - System commands")
+        print("   • 'Take a note...' or 'What did I note about...' - Notes")
         print("   • 'Exit' or 'Goodbye' - Stop assistant")
         print("\n Make sure your microphone and speakers are working!")
         
@@ -672,45 +1447,98 @@ class VoiceAssistant:
         while self.running:
             try:
                 # Listen for voice command
+                tracer.begin_turn()
                 user_command = self.listen_command()
                 
                 if user_command:
                     conversation_count += 1
                     print(f"\n--- Conversation #{conversation_count} ---")
                     
-                    # Process the command
-                    continue_running = self.process_command(user_command)
+                    # Process the command; talking over the answer interrupts it
+                    if self.barge_in is not None:
+                        self.barge_in.start()
+                    try:
+                        continue_running = self.process_command(user_command)
+                    finally:
+                        if self.barge_in is not None:
+                            self.barge_in.finish()
+                        # A command that never reached the LLM leaves its speculation unused
+                        if self.speculation is not None:
+                            self.speculation.discard()
+                    tracer.end_turn(route=self.last_intent.name if self.last_intent else 'llm')
                     
                     if not continue_running:
                         self.running = False
                         break
+                else:
+                    tracer.discard_turn()
                 
-                # Brief pause between listening cycles
-                time.sleep(0.5)
+                # Brief pause between listening cycles, unless an interruption is waiting
+                if self.barge_in is None or self.barge_in.pending_audio is None:
+                    time.sleep(0.5)
                 
             except KeyboardInterrupt:
                 print("\n Assistant stopped by user")
-                farewell = "Voice assistant shutting down. Thanks for using me! Goodbye!"
+                farewell = self.fixed_responses['farewell']
                 self.speak_response(farewell)
                 break
             except Exception as e:
                 print(f" Main loop error: {e}")
-                error_msg = "I encountered an issue, but I'm still here and ready to help!"
+                error_msg = self.fixed_responses['loop_error']
                 self.speak_response(error_msg)
+        
+        self.shutdown()
+
+    def run_pipeline(self):
+        """Run the assistant as a concurrent staged pipeline"""
+        # asyncio and the pipeline are only loaded for pipeline mode
+        import asyncio
+        from pipeline import AssistantPipeline
+        
+        try:
+            asyncio.run(AssistantPipeline(self).run())
+        except KeyboardInterrupt:
+            print("\n Assistant stopped by user")
+            self.speak_response(self.fixed_responses['farewell'])
+        finally:
+            self.shutdown()
+    
+    def shutdown(self):
+        """Save pending history and stop background threads"""
+        if self.conversation_store is not None:
+            self.conversation_store.close()
+        if self.tts is not None:
+            self.tts.close()
+        if self.speculation is not None and self.speculation.stats['started']:
+            stats = self.speculation.summary()
+            print(f" Speculative generation: {stats['hits']}/{stats['hits'] + stats['misses']} hits, "
+                  f"{stats['saved_ms']:.0f} ms saved, {stats['wasted_tokens']} tokens wasted")
+        self.llama_client.close()
 
 def main():
     """Main function with comprehensive error handling"""
+    parser = argparse.ArgumentParser(description="AI Voice Assistant")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="run capture, STT, LLM and TTS as concurrent stages")
+    parser.add_argument('--headless', action='store_true',
+                        help="process text commands from stdin or --input without audio (see headless.py)")
+    args, remaining = parser.parse_known_args()
+    
+    # Headless mode needs no microphone, speakers or audio libraries
+    if args.headless:
+        import headless
+        headless.main(remaining, VoiceAssistant)
+        return
+    if remaining:
+        parser.error(f"unrecognized arguments: {' '.join(remaining)}")
+    
     print("🔍 Checking system requirements...")
     
     # Check essential dependencies
     missing_deps = []
     
-    try:
-        import speech_recognition
-        import pyttsx3
-        import pyaudio
-    except ImportError as e:
-        missing_deps.append(str(e))
+    for name in missing_modules(*SPEECH_MODULES):
+        missing_deps.append(f"No module named '{name}'")
     
     if missing_deps:
         print(" Missing essential dependencies:")
@@ -722,7 +1550,10 @@ def main():
     try:
         # Initialize and run the assistant
         assistant = VoiceAssistant()
-        assistant.main_loop()
+        if args.pipeline or config.PIPELINE_CONFIG.get('enabled', False):
+            assistant.run_pipeline()
+        else:
+            assistant.main_loop()
         
     except Exception as e:
         print(f" Failed to start assistant: {e}")
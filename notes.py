@@ -0,0 +1,206 @@
+"""
+Voice notes with full-text search
+
+Notes live in the notes table of assistant_memory.db. An FTS5 index over it is
+kept in sync by triggers, so "what did I note about ..." is a ranked index
+lookup instead of an LLM call. data/notes.txt is imported once and new notes
+are still appended to it.
+"""
+
+import datetime
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+# Router phrases: (phrase, intent, slot that captures the rest of the command)
+NOTE_COMMANDS = [
+    ("take a note", 'take_note', 'text'),
+    ("make a note", 'take_note', 'text'),
+    ("note down", 'take_note', 'text'),
+    ("write down", 'take_note', 'text'),
+    ("what did i note about", 'search_notes', 'query'),
+    ("what did i write about", 'search_notes', 'query'),
+    ("what are my notes about", 'search_notes', 'query'),
+    ("search my notes for", 'search_notes', 'query'),
+    ("find my notes about", 'search_notes', 'query'),
+    ("find notes about", 'search_notes', 'query')
+]
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_NOTE_LINE = re.compile(r"^\[(?P<stamp>[^\]]*)\]\s*(?P<text>.*)$")
+_LEADING_FILLER = re.compile(r"^(?:that|saying|to remember that|to remember|:)\s+")
+
+# Words that would match almost every note when the search falls back to any word
+SEARCH_STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'at', 'for', 'with', 'about',
+    'from', 'by', 'is', 'are', 'was', 'were', 'be', 'it', 'its', 'this', 'that', 'my', 'me', 'i',
+    'you', 'your', 'we', 'our', 'what', 'did', 'do', 'does', 'any', 'some', 'note', 'notes'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content TEXT NOT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS note_imports (
+    path TEXT PRIMARY KEY,
+    imported_at REAL NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE notes_fts USING fts5(content, content='notes', content_rowid='id', tokenize='porter unicode61');
+CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER notes_fts_update AFTER UPDATE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO notes_fts(rowid, content) VALUES (new.id, new.content);
+END;
+INSERT INTO notes_fts(notes_fts) VALUES ('rebuild');
+"""
+
+
+def clean_note(text):
+    """Strip the connective words people say after 'take a note'"""
+    return _LEADING_FILLER.sub('', text.strip()).strip()
+
+
+class NoteStore:
+    """Add and search notes in assistant_memory.db"""
+    def __init__(self, db_path, notes_file=None, append_to_file=True, max_ranked=1000):
+        self.max_ranked = max_ranked
+        self.notes_file = Path(notes_file) if notes_file else None
+        self.append_to_file = append_to_file
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+        self.fts = True
+        exists = self.db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'"
+        ).fetchone()
+        if not exists:
+            try:
+                with self.db:
+                    self.db.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5: fall back to substring search
+                print(f" Notes full-text search unavailable ({e}); using simple search")
+                self.fts = False
+
+        if self.notes_file is not None:
+            self.import_file(self.notes_file)
+
+    def import_file(self, path):
+        """Copy '[timestamp] text' lines from a notes file into the table, once per file"""
+        path = Path(path)
+        key = str(path.resolve())
+        if not path.exists() or self.db.execute(
+                "SELECT 1 FROM note_imports WHERE path = ?", (key,)).fetchone():
+            return 0
+
+        rows = []
+        for line in path.read_text(encoding='utf-8').splitlines():
+            match = _NOTE_LINE.match(line.strip())
+            if match:
+                rows.append((match.group('text'), match.group('stamp')))
+            elif line.strip():
+                rows.append((line.strip(), datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+        with self.db:
+            self.db.executemany("INSERT INTO notes (content, timestamp) VALUES (?, ?)", rows)
+            self.db.execute("INSERT INTO note_imports (path, imported_at) VALUES (?, ?)", (key, time.time()))
+        if rows:
+            print(f" Imported {len(rows)} notes from {path}")
+        return len(rows)
+
+    def add(self, text):
+        """Save a note and return its id"""
+        stamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.db:
+            cursor = self.db.execute("INSERT INTO notes (content, timestamp) VALUES (?, ?)", (text, stamp))
+        if self.notes_file is not None and self.append_to_file:
+            try:
+                with open(self.notes_file, 'a', encoding='utf-8') as f:
+                    f.write(f"[{stamp}] {text}\n")
+            except OSError as e:
+                print(f"Notes file write error: {e}")
+        return cursor.lastrowid
+
+    def search(self, query, limit=3):
+        """Return (content, snippet, timestamp) for the best matching notes"""
+        words = [word for word in _WORD.findall(query.lower()) if word not in SEARCH_STOPWORDS]
+        if not words:
+            return []
+        if not self.fts:
+            pattern = f"%{' '.join(words)}%"
+            rows = self.db.execute(
+                "SELECT content, content, timestamp FROM notes WHERE lower(content) LIKE ? "
+                "ORDER BY id DESC LIMIT ?", (pattern, limit)
+            ).fetchall()
+            return rows
+
+        # All words first; if nothing has every word, accept any of them.
+        # Only the newest matches are ranked, which bounds the cost of very common words.
+        quoted = [f'"{word}"' for word in words]
+        for expression in (" ".join(quoted), " OR ".join(quoted)):
+            rows = self.db.execute(
+                "SELECT notes.content, snippet(notes_fts, 0, '', '', '...', 12), notes.timestamp "
+                "FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid "
+                "WHERE notes_fts MATCH ? AND notes_fts.rowid >= coalesce(("
+                "    SELECT rowid FROM notes_fts WHERE notes_fts MATCH ? "
+                "    ORDER BY rowid DESC LIMIT 1 OFFSET ?), 0) "
+                "ORDER BY rank LIMIT ?",
+                (expression, expression, self.max_ranked - 1, limit)
+            ).fetchall()
+            if rows:
+                return rows
+        return []
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+
+def create_note_store(settings, headless=False):
+    """Open the note store from NOTES_CONFIG; headless runs search an in-memory copy"""
+    try:
+        if headless:
+            return NoteStore(':memory:', settings.get('notes_file'), append_to_file=False)
+        return NoteStore(settings.get('db_path', 'assistant_memory.db'), settings.get('notes_file'))
+    except sqlite3.Error as e:
+        print(f" Notes disabled: {e}")
+        return None
+
+
+def benchmark(sizes=(1000, 10000, 50000), queries=200):
+    """Time note searches against growing in-memory note tables"""
+    import random
+
+    random.seed(0)
+    vocabulary = ("meeting dentist groceries python project deadline birthday flight hotel invoice "
+                  "password recipe garden tax report gym doctor car insurance book movie").split()
+    print(f"{'notes':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in sizes:
+        store = NoteStore(':memory:')
+        with store.db:
+            store.db.executemany(
+                "INSERT INTO notes (content) VALUES (?)",
+                ((" ".join(random.choices(vocabulary, k=12)),) for _ in range(size))
+            )
+        timings = []
+        for _ in range(queries):
+            query = " ".join(random.sample(vocabulary, 2))
+            start_time = time.perf_counter()
+            store.search(query)
+            timings.append((time.perf_counter() - start_time) * 1000)
+        timings.sort()
+        print(f"{size:>8} {timings[len(timings) // 2]:>8.2f} {timings[int(len(timings) * 0.99)]:>8.2f}")
+
+
+if __name__ == "__main__":
+    benchmark()
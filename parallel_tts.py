@@ -0,0 +1,223 @@
+"""
+Sentence-parallel speech synthesis across worker processes
+
+Sentences are synthesized concurrently by a pool of worker processes, each
+holding its own loaded engine (a Coqui model or libespeak-ng), so synthesis
+uses every core instead of one. A complete answer is split up front; a
+streamed answer submits each sentence as the LLM produces it and hands the
+player a PendingClip, which it waits for in order. Either way playback starts
+after the first sentence. SynthesisStats tracks the real-time factor
+(synthesis time / audio time) per engine. Run this file directly to compare
+one worker against a full pool.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from audio_output import AudioClip
+from text_utils import split_sentences
+from tts_backends import create_synthesizer
+
+# Engines that synthesize locally and can be loaded in a worker process
+PARALLEL_ENGINES = ('coqui', 'espeak')
+
+_synthesizer = None
+
+
+def _init_worker(factory, args):
+    """Load the engine once per worker process"""
+    global _synthesizer
+    _synthesizer = factory(*args)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _synthesize(text):
+    start_time = time.perf_counter()
+    pcm = _synthesizer.synthesize(text)
+    return pcm, _synthesizer.sample_rate, time.perf_counter() - start_time
+
+
+class SynthesisStats:
+    """Audio seconds produced versus seconds spent synthesizing, per engine"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.engines = {}
+
+    def add(self, engine, synthesis_seconds, audio_seconds, wall_seconds=None, sentences=1):
+        with self.lock:
+            entry = self.engines.setdefault(engine, {'sentences': 0, 'synthesis_s': 0.0,
+                                                     'audio_s': 0.0, 'wall_s': 0.0})
+            entry['sentences'] += sentences
+            entry['synthesis_s'] += synthesis_seconds
+            entry['audio_s'] += audio_seconds
+            entry['wall_s'] += synthesis_seconds if wall_seconds is None else wall_seconds
+
+    def summary(self):
+        """Per engine: RTF of the synthesis itself and of the wall-clock time it took"""
+        with self.lock:
+            return {
+                engine: {
+                    'sentences': entry['sentences'],
+                    'audio_s': round(entry['audio_s'], 3),
+                    'rtf': round(entry['synthesis_s'] / entry['audio_s'], 3) if entry['audio_s'] else None,
+                    'wall_rtf': round(entry['wall_s'] / entry['audio_s'], 3) if entry['audio_s'] else None
+                }
+                for engine, entry in self.engines.items()
+            }
+
+
+class PendingClip:
+    """AudioClip stand-in for a sentence still being synthesized in the pool
+
+    AudioPlayer decodes queued clips in order, so it waits here for this
+    sentence while the ones after it keep synthesizing in other workers.
+    """
+    def __init__(self, synthesizer, future, on_ready=None):
+        self.synthesizer = synthesizer
+        self.future = future
+        self.on_ready = on_ready
+        self.clip = None
+
+    def resolve(self):
+        """Wait for the synthesized AudioClip"""
+        if self.clip is None:
+            self.clip = self.synthesizer.result(self.future)
+            if self.on_ready is not None:
+                self.on_ready(self.clip)
+        return self.clip
+
+    def to_sound(self):
+        return self.resolve().to_sound()
+
+    def levels(self, frame_seconds=0.03):
+        return self.resolve().levels(frame_seconds)
+
+    def duration(self):
+        return self.resolve().duration()
+
+
+class ParallelSynthesizer:
+    """Pool of worker processes, each with a loaded engine"""
+    def __init__(self, engine, voice, rate=140, workers=None, factory=create_synthesizer, stats=None):
+        """factory(engine, voice, rate, threads) runs in each worker and returns the synthesizer"""
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.stats = stats or SynthesisStats()
+        self.lock = threading.Lock()
+        self.outstanding = set()
+        self.busy_until = 0.0   # End of the wall-clock time already counted in the stats
+        # Threads per worker so the pool as a whole uses each core once
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # spawn, not fork: the parent already runs audio and network threads
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(factory, (engine, voice, rate, threads))
+        )
+
+    def warm_up(self):
+        """Start every worker and load its engine in the background"""
+        return [self.pool.submit(_ping) for _ in range(self.workers)]
+
+    def submit(self, text):
+        """Start synthesizing one sentence; pass the future to result()"""
+        future = self.pool.submit(_synthesize, text)
+        future.submitted_at = time.perf_counter()
+        future.done_at = None
+        with self.lock:
+            self.outstanding.add(future)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        future.done_at = time.perf_counter()
+        with self.lock:
+            self.outstanding.discard(future)
+
+    def result(self, future):
+        """Wait for a submitted sentence and return it as an AudioClip
+
+        Results are expected in submission order; wall-clock time is counted
+        once while several sentences are synthesizing at the same time.
+        """
+        pcm, sample_rate, seconds = future.result()
+        audio_seconds = len(pcm) / 2 / sample_rate if sample_rate else 0.0
+        done_at = future.done_at or time.perf_counter()
+        with self.lock:
+            wall_seconds = max(0.0, done_at - max(future.submitted_at, self.busy_until))
+            self.busy_until = max(self.busy_until, done_at)
+        self.stats.add(self.engine, seconds, audio_seconds, wall_seconds=wall_seconds)
+        return AudioClip.from_pcm(pcm, sample_rate)
+
+    def synthesize(self, text):
+        """Synthesize one text in a worker"""
+        return self.result(self.submit(text))
+
+    def pending(self, text, on_ready=None):
+        """Submit one sentence and return a PendingClip to queue for playback right away"""
+        return PendingClip(self, self.submit(text), on_ready)
+
+    def stream(self, sentences):
+        """Yield one AudioClip per sentence, in order, as soon as each is ready"""
+        futures = [self.submit(sentence) for sentence in sentences]
+        try:
+            for future in futures:
+                yield self.result(future)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def cancel(self):
+        """Drop sentences that have not started synthesizing"""
+        with self.lock:
+            futures = list(self.outstanding)
+        for future in futures:
+            future.cancel()
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def benchmark(engine='espeak', voice='en', repeats=3):
+    """Compare sequential and pooled synthesis of a long answer"""
+    text = " ".join([
+        "Sure, here is a quick overview of how the solar system formed.",
+        "About four and a half billion years ago a cloud of gas and dust collapsed.",
+        "Most of the material gathered in the center and became the sun.",
+        "The rest flattened into a spinning disk around it.",
+        "Dust grains stuck together into pebbles, then boulders, then planetesimals.",
+        "Close to the sun only rock and metal could survive the heat.",
+        "Farther out, ice let the giant planets grow large enough to capture gas.",
+        "What was left over became asteroids, comets and the dwarf planets."
+    ] * 2)
+    sentences = split_sentences(text)
+    cores = os.cpu_count() or 1
+    print(f"{len(sentences)} sentences, {cores} cores, engine {engine}")
+    print(f"{'workers':>8} {'wall s':>8} {'audio s':>8} {'rtf':>6} {'wall rtf':>9} {'first ms':>9}")
+    for workers in sorted({1, cores}):
+        synthesizer = ParallelSynthesizer(engine, voice, workers=workers)
+        for future in synthesizer.warm_up():
+            future.result()
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            first = None
+            for _clip in synthesizer.stream(sentences):
+                if first is None:
+                    first = time.perf_counter() - start_time
+        wall = time.perf_counter() - start_time
+        stats = synthesizer.stats.summary()[engine]
+        print(f"{workers:>8} {wall:>8.2f} {stats['audio_s'] / repeats:>8.2f} {stats['rtf']:>6.3f} "
+              f"{stats['wall_rtf']:>9.3f} {first * 1000:>9.0f}")
+        synthesizer.close()
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(*sys.argv[1:2])
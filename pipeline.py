@@ -0,0 +1,261 @@
+"""
+Concurrent staged pipeline for the voice assistant
+
+Capture, speech-to-text, routing, LLM generation, synthesis and playback run
+as separate asyncio stages connected by bounded queues. Blocking libraries run
+in a thread pool so stages overlap instead of running one after another.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from telemetry import tracer
+
+
+class AssistantPipeline:
+    """Run a VoiceAssistant as overlapping stages instead of a sequential loop"""
+    def __init__(self, assistant, queue_size=None, workers=None):
+        settings = getattr(config, 'PIPELINE_CONFIG', {})
+        self.assistant = assistant
+        self.queue_size = queue_size or settings.get('queue_size', 4)
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or settings.get('executor_workers', 6),
+            thread_name_prefix="pipeline"
+        )
+        self.loop = None
+        self.stopping = None
+        self.quiet = None
+
+        # Speech queued but not yet played; the mic is ignored while it is non-zero
+        self.pending_speech = 0
+        self.speech_epoch = 0
+        self.turn_started_at = None
+
+    async def run(self):
+        """Run all stages until the user says goodbye"""
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.quiet = asyncio.Event()
+        self.quiet.set()
+
+        self.audio_queue = asyncio.Queue(self.queue_size)
+        self.text_queue = asyncio.Queue(self.queue_size)
+        self.prompt_queue = asyncio.Queue(self.queue_size)
+        self.speech_queue = asyncio.Queue(self.queue_size)
+        self.playback_queue = asyncio.Queue(self.queue_size)
+
+        self.assistant.speech_sink = self._speech_sink_threadsafe
+
+        stages = [
+            self._capture_stage(),
+            self._stt_stage(),
+            self._routing_stage(),
+            self._llm_stage(),
+            self._synthesis_stage(),
+            self._playback_stage()
+        ]
+        tasks = [asyncio.create_task(stage) for stage in stages]
+
+        welcome = random.choice(self.assistant.welcome_messages)
+        await self._enqueue_speech(welcome)
+        self.assistant.memory.add_message("Assistant", welcome)
+        print("\n Enhanced AI Voice Assistant is active (pipeline mode)!")
+
+        try:
+            await self.stopping.wait()
+            # Let the goodbye finish playing
+            await self.speech_queue.join()
+            await self.playback_queue.join()
+            await self.quiet.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.assistant.speech_sink = None
+            self.executor.shutdown(wait=False)
+
+    def _in_executor(self, func, *args):
+        """Run a blocking call on the pipeline thread pool"""
+        return self.loop.run_in_executor(self.executor, func, *args)
+
+    def _speech_sink_threadsafe(self, text):
+        """Receive speak_response calls from worker threads"""
+        future = asyncio.run_coroutine_threadsafe(self._enqueue_speech(text), self.loop)
+        future.result()
+
+    async def _enqueue_speech(self, text):
+        """Queue text for synthesis and mark the assistant as talking"""
+        if not text or not text.strip():
+            return
+        self.pending_speech += 1
+        self.speech_epoch += 1
+        self.quiet.clear()
+        await self.speech_queue.put(text)
+
+    def _speech_done(self):
+        """Mark one queued utterance as played"""
+        self.pending_speech -= 1
+        if self.pending_speech <= 0:
+            self.pending_speech = 0
+            self.quiet.set()
+
+    async def _capture_stage(self):
+        """Record phrases whenever the assistant is not talking"""
+        streaming = self.assistant.stt.streaming
+        while True:
+            await self.quiet.wait()
+            epoch = self.speech_epoch
+
+            # Streaming recognizers decode during capture and skip the STT stage
+            if streaming:
+                result = await self._in_executor(self.assistant.listen_streaming)
+            else:
+                result = await self._in_executor(self.assistant.capture_audio)
+            if not result:
+                continue
+
+            # Drop audio that overlapped our own speech
+            if epoch != self.speech_epoch or not self.quiet.is_set():
+                continue
+
+            if streaming:
+                await self.text_queue.put((result, time.perf_counter()))
+            else:
+                await self.audio_queue.put((result, time.perf_counter()))
+
+    async def _stt_stage(self):
+        """Turn captured audio into text"""
+        while True:
+            audio, captured_at = await self.audio_queue.get()
+            try:
+                command = await self._in_executor(self.assistant.transcribe, audio)
+                if command:
+                    await self.text_queue.put((command, captured_at))
+            finally:
+                self.audio_queue.task_done()
+
+    async def _routing_stage(self):
+        """Run exit and direct commands, and pass queries on to the LLM"""
+        conversation_count = 0
+        while True:
+            command, captured_at = await self.text_queue.get()
+            try:
+                conversation_count += 1
+                print(f"\n--- Conversation #{conversation_count} ---")
+                self.turn_started_at = captured_at
+
+                route = await self._in_executor(self._safe_route, command)
+                # A command that never reaches the LLM leaves its speculation unused
+                if route != 'llm' and self.assistant.speculation is not None:
+                    self.assistant.speculation.discard()
+                if route == 'exit':
+                    self.assistant.running = False
+                    self.stopping.set()
+                elif route == 'llm':
+                    await self.prompt_queue.put(command)
+            finally:
+                self.text_queue.task_done()
+
+    def _safe_route(self, command):
+        """Route a command without letting handler errors kill the stage"""
+        try:
+            return self.assistant.route_command(command)
+        except Exception as e:
+            print(f" Command processing error: {e}")
+            self.assistant.speak_response(self.assistant.fixed_responses['command_error'])
+            return 'handled'
+
+    async def _llm_stage(self):
+        """Generate answers; sentences reach the speech queue as they are produced"""
+        while True:
+            prompt = await self.prompt_queue.get()
+            try:
+                await self._in_executor(self.assistant.answer_query, prompt)
+            except Exception as e:
+                print(f" LLM stage error: {e}")
+            finally:
+                self.prompt_queue.task_done()
+
+    async def _synthesis_stage(self):
+        """Render queued text to audio ahead of playback"""
+        tts = self.assistant.tts
+        while True:
+            text = await self.speech_queue.get()
+            try:
+                clip = None
+                if tts.engine in tts.CLIP_ENGINES:
+                    try:
+                        clip = await self._in_executor(tts.synthesize, text)
+                    except Exception as e:
+                        print(f" TTS Error with {tts.engine}: {e}")
+                await self.playback_queue.put((text, clip))
+            finally:
+                self.speech_queue.task_done()
+
+    async def _playback_stage(self):
+        """Hand rendered audio to the player in order as soon as it is ready"""
+        tts = self.assistant.tts
+        outstanding = deque()
+        waiter = None  # Executor wait on the oldest outstanding handle
+        while True:
+            self._retire_finished(outstanding)
+
+            if outstanding and self.playback_queue.empty():
+                # Wake for whichever comes first: the next clip, or the oldest one finishing
+                if waiter is None:
+                    waiter = self._in_executor(outstanding[0].wait)
+                getter = asyncio.ensure_future(self.playback_queue.get())
+                try:
+                    done, _ = await asyncio.wait({getter, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                except asyncio.CancelledError:
+                    getter.cancel()
+                    raise
+                if waiter in done:
+                    waiter = None
+                if getter not in done:
+                    getter.cancel()
+                    continue
+                text, clip = getter.result()
+            else:
+                text, clip = await self.playback_queue.get()
+
+            try:
+                if clip is not None:
+                    # The player plays queued clips back to back, so queue it before anything else
+                    print(f"🗣️ Speaking with {tts.engine}: {text}")
+                    outstanding.append(tts.player.enqueue(clip))
+                else:
+                    while outstanding:
+                        await self._retire_playback(outstanding)
+                    self._report_turn_latency(time.perf_counter())
+                    await self._in_executor(tts.speak, text)
+                    self._speech_done()
+            finally:
+                self.playback_queue.task_done()
+
+    def _retire_finished(self, outstanding):
+        """Mark clips that have finished playing as done without waiting"""
+        while outstanding and outstanding[0].done.is_set():
+            self._retire(outstanding.popleft())
+
+    async def _retire_playback(self, outstanding):
+        """Wait for the oldest queued clip to finish playing"""
+        handle = outstanding.popleft()
+        await self._in_executor(handle.wait)
+        self._retire(handle)
+
+    def _retire(self, handle):
+        self._report_turn_latency(handle.started_at)
+        self._speech_done()
+
+    def _report_turn_latency(self, first_audio_at):
+        """Print time from end of capture to the first audio of the turn"""
+        if self.turn_started_at is None or first_audio_at is None:
+            return
+        print(f" Turn latency: {(first_audio_at - self.turn_started_at) * 1000:.0f} ms")
+        tracer.record('turn.first_audio', first_audio_at - self.turn_started_at)
+        self.turn_started_at = None
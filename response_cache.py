@@ -0,0 +1,168 @@
+"""
+Cache of LLM answers for repeated questions
+
+Keys combine the normalized prompt, a fingerprint of the system prompt and
+any recalled memories sent with it, and the model and generation options.
+Entries live in an in-memory LRU backed by a table in assistant_memory.db and expire after a TTL.
+Follow-up and time-sensitive questions are never cached.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from telemetry import tracer
+from text_utils import normalize_text
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Answers that go stale ("what time is it", "latest news")
+TIME_SENSITIVE_WORDS = {
+    'time', 'today', 'tonight', 'tomorrow', 'yesterday', 'now', 'date', 'day', 'weather',
+    'forecast', 'news', 'latest', 'current', 'currently', 'recent', 'score', 'price', 'stock',
+    'week', 'month', 'year', 'battery'
+}
+# Answers that depend on the previous turns ("tell me more about it")
+FOLLOW_UP_WORDS = {
+    'it', 'its', 'that', 'this', 'those', 'these', 'he', 'she', 'they', 'him', 'her', 'them',
+    'his', 'their', 'more', 'again', 'else', 'previous', 'earlier', 'continue', 'also', 'another'
+}
+FILLER_WORDS = {'please', 'hey', 'ok', 'okay', 'assistant', 'um', 'uh'}
+
+
+def normalize_prompt(prompt):
+    """Lowercase, drop punctuation and filler words so phrasing variants share a key"""
+    words = _WORD.findall(normalize_text(prompt).lower())
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+class ResponseCache:
+    """In-memory LRU over a persisted SQLite table of LLM responses"""
+    def __init__(self, db_path, memory_entries=256, max_entries=5000, ttl=7 * 24 * 3600):
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (response, expires_at)
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0}
+
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                model TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            )
+        """)
+        self.db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+        self.db.commit()
+
+    @staticmethod
+    def make_key(normalized_prompt, fingerprint, model, options):
+        payload = json.dumps([normalized_prompt, fingerprint, model, options], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def bypass_reason(normalized_prompt):
+        """Why a prompt must not be answered from the cache, or None"""
+        words = set(normalized_prompt.split())
+        if not words:
+            return 'empty'
+        if words & TIME_SENSITIVE_WORDS:
+            return 'time_sensitive'
+        if words & FOLLOW_UP_WORDS:
+            return 'follow_up'
+        return None
+
+    def get(self, key):
+        """Return a cached response, or None on a miss"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                row = self.db.execute(
+                    "SELECT response, expires_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._forget(key)
+                self.stats['misses'] += 1
+                tracer.count('llm_cache.miss')
+                return None
+
+            self.entries.move_to_end(key)
+            self.db.execute("UPDATE response_cache SET hits = hits + 1 WHERE key = ?", (key,))
+            self.db.commit()
+            self.stats['hits'] += 1
+            tracer.count('llm_cache.hit')
+            return entry[0]
+
+    def put(self, key, prompt, response, model, ttl=None):
+        """Store a response for ttl seconds"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self._remember(key, (response, expires_at))
+            self.db.execute(
+                "INSERT OR REPLACE INTO response_cache (key, prompt, response, model, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, prompt, response, model, now, expires_at)
+            )
+            # Keep the table bounded; drop the oldest entries first
+            self.db.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                "SELECT key FROM response_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.db.commit()
+            self.stats['stores'] += 1
+
+    def note_bypass(self, reason):
+        with self.lock:
+            self.stats['bypassed'] += 1
+        tracer.count(f'llm_cache.bypass.{reason}')
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.db.execute("DELETE FROM response_cache")
+            self.db.commit()
+
+    def _remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.memory_entries:
+            self.entries.popitem(last=False)
+
+    def _forget(self, key):
+        self.entries.pop(key, None)
+        self.db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+        self.db.commit()
+
+
+def create_response_cache(settings, headless=False):
+    """Build the cache from RESPONSE_CACHE_CONFIG, or None when disabled; headless runs use an in-memory table"""
+    if not settings.get('enabled', True):
+        return None
+    try:
+        return ResponseCache(
+            ':memory:' if headless else settings.get('db_path', 'assistant_memory.db'),
+            memory_entries=settings.get('memory_entries', 256),
+            max_entries=settings.get('max_entries', 5000),
+            ttl=settings.get('ttl', 7 * 24 * 3600)
+        )
+    except sqlite3.Error as e:
+        print(f"Response cache disabled: {e}")
+        return None
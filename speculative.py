@@ -0,0 +1,201 @@
+"""
+Speculative LLM generation from partial transcripts
+
+With a streaming recognizer the hypothesis usually stops changing a few
+hundred milliseconds before the endpointer decides the user has finished.
+Once a partial has been stable for stable_ms, generation starts from it in
+the background. If the final transcript normalizes to the same text, the
+answer already under way is used; otherwise it is cancelled and the normal
+request runs. Hit rate, saved milliseconds and wasted tokens are tracked, and
+speculation pauses itself when it wastes too much of the Ollama server's time.
+"""
+
+import collections
+import queue
+import threading
+import time
+
+import config
+from response_cache import normalize_prompt
+from telemetry import tracer
+
+_DONE = object()
+
+
+class Speculation:
+    """One background generation started from a partial transcript"""
+    def __init__(self, prompt, key):
+        self.prompt = prompt
+        self.key = key
+        self.started_at = time.perf_counter()
+        self.tokens = queue.Queue()
+        self.token_count = 0
+        self.cancelled = threading.Event()
+        self.finished_at = None
+        self.thread = None
+
+    def run(self, start_stream):
+        """Pull tokens into the buffer until the stream ends or the speculation is cancelled"""
+        try:
+            for token in start_stream(self.prompt):
+                if self.cancelled.is_set():
+                    break  # Leaving the loop closes the LLM stream
+                self.token_count += 1
+                self.tokens.put(token)
+        except Exception as e:
+            print(f"Speculative generation error: {e}")
+        finally:
+            self.finished_at = time.perf_counter()
+            self.tokens.put(_DONE)
+
+    def stream(self):
+        """Yield buffered and still-arriving tokens"""
+        while True:
+            token = self.tokens.get()
+            if token is _DONE:
+                return
+            yield token
+
+
+class SpeculativeGenerator:
+    """Start LLM answers from stable partial transcripts and hand them over on a match"""
+    def __init__(self, start_stream, accept_prompt, settings):
+        """start_stream(prompt) returns a token iterator; accept_prompt(prompt) says whether it would go to the LLM"""
+        self.start_stream = start_stream
+        self.accept_prompt = accept_prompt
+        self.stable_ms = settings.get('stable_ms', 300)
+        self.min_words = settings.get('min_words', 3)
+        self.max_per_utterance = settings.get('max_per_utterance', 2)
+        self.max_wasted_tokens = settings.get('max_wasted_tokens_per_minute', 400)
+        self.min_hit_rate = settings.get('min_hit_rate', 0.3)
+
+        self.lock = threading.Lock()
+        self.timer = None
+        self.current = None
+        self.started_this_utterance = 0
+        self.waste = collections.deque()            # (time, tokens) of cancelled speculations
+        self.recent = collections.deque(maxlen=20)  # True for hits, False for misses
+        self.skipped = 0
+        self.stats = {'started': 0, 'hits': 0, 'misses': 0, 'superseded': 0,
+                      'wasted_tokens': 0, 'saved_ms': 0.0, 'throttled': 0}
+
+    def on_partial(self, partial):
+        """Feed every partial hypothesis; speculation starts after it stops changing"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.stable_ms / 1000, self._speculate, args=(partial,))
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _speculate(self, partial):
+        key = normalize_prompt(partial)
+        if len(key.split()) < self.min_words:
+            return
+        with self.lock:
+            if self.current is not None and self.current.key == key:
+                return
+            if self.started_this_utterance >= self.max_per_utterance or not self._within_budget():
+                self.stats['throttled'] += 1
+                return
+            if not self.accept_prompt(partial):
+                return
+            if self.current is not None:
+                # The hypothesis moved on; the older guess can no longer match
+                self._cancel(self.current)
+                self.stats['superseded'] += 1
+            speculation = Speculation(partial, key)
+            speculation.thread = threading.Thread(
+                target=speculation.run, args=(self.start_stream,), name="speculative-llm", daemon=True
+            )
+            self.current = speculation
+            self.started_this_utterance += 1
+            self.stats['started'] += 1
+        speculation.thread.start()
+        tracer.count('speculation_started')
+
+    def _within_budget(self):
+        """Stay under the wasted-token budget and pause while the hit rate is poor (lock held)"""
+        cutoff = time.monotonic() - 60
+        while self.waste and self.waste[0][0] < cutoff:
+            self.waste.popleft()
+        if sum(tokens for _, tokens in self.waste) >= self.max_wasted_tokens:
+            return False
+        if len(self.recent) >= 10 and sum(self.recent) / len(self.recent) < self.min_hit_rate:
+            # Let every fifth attempt through so the hit rate can recover
+            self.skipped += 1
+            return self.skipped % 5 == 0
+        return True
+
+    def _cancel(self, speculation):
+        speculation.cancelled.set()
+        self.waste.append((time.monotonic(), speculation.token_count))
+        self.stats['wasted_tokens'] += speculation.token_count
+
+    def claim(self, prompt):
+        """Token stream for prompt if a matching speculation is running, else None"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            speculation, self.current = self.current, None
+            self.started_this_utterance = 0
+            if speculation is None:
+                return None
+            if speculation.key != normalize_prompt(prompt):
+                self._cancel(speculation)
+                self.stats['misses'] += 1
+                self.recent.append(False)
+                tracer.count('speculation_miss')
+                print(f" Speculation missed ('{speculation.prompt}' vs '{prompt}')")
+                return None
+
+            # Head start: the request would have begun now
+            saved = (speculation.finished_at or time.perf_counter()) - speculation.started_at
+            self.stats['hits'] += 1
+            self.stats['saved_ms'] += saved * 1000
+            self.recent.append(True)
+        tracer.count('speculation_hit')
+        tracer.record('speculation.saved', saved)
+        print(f" Speculative answer used ({saved * 1000:.0f} ms head start)")
+        return speculation.stream()
+
+    def discard(self):
+        """Cancel whatever was started for an utterance that did not reach the LLM"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.current is not None:
+                self._cancel(self.current)
+                self.stats['misses'] += 1
+                self.recent.append(False)
+                self.current = None
+            self.started_this_utterance = 0
+
+    def summary(self):
+        """Hit rate, average saved milliseconds and wasted tokens so far"""
+        with self.lock:
+            stats = dict(self.stats)
+        decided = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / decided, 3) if decided else None
+        stats['avg_saved_ms'] = round(stats['saved_ms'] / stats['hits'], 1) if stats['hits'] else None
+        stats['saved_ms'] = round(stats['saved_ms'], 1)
+        return stats
+
+
+def create_speculative_generator(settings, assistant):
+    """Build speculation from SPECULATIVE_CONFIG for a streaming recognizer, or None"""
+    if not settings.get('enabled', True) or assistant.stt is None or not assistant.stt.streaming:
+        return None
+    if not assistant.llama_client.is_ready or not config.LLAMA_CONFIG.get('stream', True):
+        return None
+
+    def start_stream(prompt):
+        return assistant.llama_client.stream_response(prompt, assistant.memory.messages(prompt, assistant._recall(prompt)))
+
+    def accept_prompt(prompt):
+        # Direct commands (open, search, notes...) never reach the LLM
+        return not any(True for _ in assistant.router.match_all(prompt))
+
+    return SpeculativeGenerator(start_stream, accept_prompt, settings)
@@ -0,0 +1,134 @@
+"""
+Pluggable speech-to-text backends
+"""
+
+import json
+import os
+import time
+
+import speech_recognition as sr
+
+
+class STTBackend:
+    """Interface every speech-to-text engine implements"""
+    name = "base"
+    streaming = False    # Decodes while audio is still arriving
+    sample_rate = None   # Preferred microphone rate, or None for the device default
+
+    def transcribe(self, audio):
+        """Convert a captured sr.AudioData phrase to text"""
+        raise NotImplementedError
+
+    def listen(self, source, timeout, phrase_time_limit, on_partial=None, endpointer=None):
+        """Capture and decode one utterance from an open microphone"""
+        raise NotImplementedError
+
+
+class GoogleSTT(STTBackend):
+    """Google Web Speech API through speech_recognition (needs network)"""
+    name = "google"
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def transcribe(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+
+class VoskSTT(STTBackend):
+    """Offline Kaldi decoder that emits partial hypotheses while the user is speaking"""
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path, sample_rate=16000):
+        from vosk import KaldiRecognizer, Model, SetLogLevel
+        SetLogLevel(-1)
+        self.KaldiRecognizer = KaldiRecognizer
+        self.model = Model(model_path)
+        self.sample_rate = sample_rate
+
+    def _new_recognizer(self, sample_rate):
+        recognizer = self.KaldiRecognizer(self.model, sample_rate)
+        # Finalize quickly once speech stops (available in vosk >= 0.3.45)
+        if hasattr(recognizer, 'SetEndpointerDelays'):
+            recognizer.SetEndpointerDelays(5.0, 0.4, 20.0)
+        return recognizer
+
+    def transcribe(self, audio):
+        recognizer = self._new_recognizer(self.sample_rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def listen(self, source, timeout, phrase_time_limit, on_partial=None, endpointer=None):
+        """Feed microphone chunks to the decoder and return at the endpoint
+
+        With a VAD endpointer the utterance ends after its hangover instead of
+        waiting for the decoder's own silence detection.
+        """
+        recognizer = self._new_recognizer(source.SAMPLE_RATE)
+        started_at = time.perf_counter()
+        speech_started_at = None
+        last_partial = ""
+        if endpointer is not None:
+            endpointer.reset()
+
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                break
+            now = time.perf_counter()
+
+            if endpointer is not None:
+                state = endpointer.feed(chunk)
+                if state != endpointer.WAITING and speech_started_at is None:
+                    speech_started_at = endpointer.speech_started_at
+                if state == endpointer.ENDED:
+                    recognizer.AcceptWaveform(chunk)
+                    break
+
+            if recognizer.AcceptWaveform(chunk):
+                text = json.loads(recognizer.Result()).get('text', '')
+                if text:
+                    return text
+                # Endpoint on noise only; keep waiting for real speech
+                last_partial = ""
+            else:
+                partial = json.loads(recognizer.PartialResult()).get('partial', '')
+                if partial and speech_started_at is None:
+                    speech_started_at = now
+                if partial and partial != last_partial:
+                    last_partial = partial
+                    if on_partial is not None:
+                        on_partial(partial)
+
+            if speech_started_at is None and now - started_at > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            if speech_started_at is not None and now - speech_started_at > phrase_time_limit:
+                break
+
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+def create_stt_backend(recognizer, settings):
+    """Build the backend named in SPEECH_CONFIG, falling back to Google"""
+    backend = settings.get('stt_backend', 'auto')
+    model_path = settings.get('vosk_model_path', 'models/vosk-model-small-en-us-0.15')
+
+    if backend in ('auto', 'vosk'):
+        if os.path.isdir(model_path):
+            try:
+                stt = VoskSTT(model_path, settings.get('stt_sample_rate', 16000))
+                print(f" Offline speech recognition ready (Vosk: {model_path})")
+                return stt
+            except Exception as e:
+                print(f" Vosk unavailable: {e}")
+        elif backend == 'vosk':
+            print(f" Vosk model not found at {model_path}")
+
+    return GoogleSTT(recognizer)
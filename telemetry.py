@@ -0,0 +1,245 @@
+"""
+Per-turn latency tracing
+
+Spans (listen wait, capture, STT, routing, LLM, TTS, playback) are grouped
+into turns, aggregated into rolling histograms in memory, appended to a JSONL
+trace file and periodically written as a Prometheus text file. Everything is
+controlled by DEBUG_CONFIG['performance_monitoring']; when it is off, span()
+and record() return immediately.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import config
+
+# Prometheus histogram bucket bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _NullSpan:
+    """Shared no-op span used while tracing is off"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.record(self.name, time.perf_counter() - self.start_time)
+        return False
+
+
+class SpanHistogram:
+    """Cumulative Prometheus buckets plus a rolling window for recent quantiles"""
+    def __init__(self, window):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+
+    def quantile(self, q):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Tracer:
+    """Collect spans per turn and export them as JSONL and Prometheus text"""
+    def __init__(self, enabled=False, trace_file=None, metrics_file=None,
+                 window=500, metrics_interval=10.0):
+        self.enabled = enabled
+        self.trace_file = Path(trace_file) if trace_file else None
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.window = window
+        self.metrics_interval = metrics_interval
+
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.turn = None
+        self.turn_count = 0
+        self.last_export = 0.0
+
+        if enabled:
+            for path in (self.trace_file, self.metrics_file):
+                if path is not None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+            atexit.register(self.export_metrics)
+
+    @classmethod
+    def from_config(cls, settings):
+        return cls(
+            enabled=settings.get('performance_monitoring', False),
+            trace_file=settings.get('trace_file', 'data/traces/trace.jsonl'),
+            metrics_file=settings.get('metrics_file', 'data/traces/metrics.prom'),
+            window=settings.get('metrics_window', 500),
+            metrics_interval=settings.get('metrics_interval', 10.0)
+        )
+
+    def span(self, name):
+        """Context manager timing a block as one span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, seconds):
+        """Add a measured duration; it joins the current turn if one is open"""
+        if not self.enabled or seconds is None:
+            return
+        with self.lock:
+            if self.turn is not None:
+                self.turn['spans'].setdefault(name, []).append(seconds)
+            else:
+                self._add(name, seconds)
+
+    def count(self, name, amount=1):
+        """Increment an event counter such as a cache hit"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            if self.turn is not None:
+                events = self.turn['events']
+                events[name] = events.get(name, 0) + amount
+
+    def begin_turn(self):
+        """Start collecting spans for a new turn"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.turn = {'started_at': time.time(), 'perf_start': time.perf_counter(),
+                         'spans': {}, 'events': {}}
+
+    def discard_turn(self):
+        """Drop the open turn, e.g. when listening timed out without a command"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.turn = None
+
+    def end_turn(self, **attributes):
+        """Close the open turn, fold its spans into the histograms and export it"""
+        if not self.enabled:
+            return
+        with self.lock:
+            turn, self.turn = self.turn, None
+            if turn is None:
+                return
+            self.turn_count += 1
+            total = time.perf_counter() - turn['perf_start']
+            for name, values in turn['spans'].items():
+                for seconds in values:
+                    self._add(name, seconds)
+            self._add('turn.total', total)
+
+            record = {
+                'turn': self.turn_count,
+                'timestamp': turn['started_at'],
+                'total_ms': round(total * 1000, 3),
+                'spans_ms': {
+                    name: round(sum(values) * 1000, 3) for name, values in turn['spans'].items()
+                }
+            }
+            if turn['events']:
+                record['events'] = turn['events']
+            record.update(attributes)
+            export_due = time.monotonic() - self.last_export >= self.metrics_interval
+
+        if self.trace_file is not None:
+            try:
+                with open(self.trace_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                print(f"Trace write error: {e}")
+        if export_due:
+            self.export_metrics()
+
+    def _add(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = SpanHistogram(self.window)
+        histogram.add(seconds)
+
+    def summary(self):
+        """Recent p50/p95/p99 in milliseconds for every span"""
+        with self.lock:
+            return {
+                name: {
+                    'count': histogram.count,
+                    **{f"p{int(q * 100)}_ms": histogram.quantile(q) * 1000 for q in QUANTILES}
+                }
+                for name, histogram in sorted(self.histograms.items()) if histogram.recent
+            }
+
+    def prometheus_text(self):
+        """Render all spans in the Prometheus text exposition format"""
+        lines = [
+            "# HELP assistant_span_seconds Duration of voice assistant pipeline spans.",
+            "# TYPE assistant_span_seconds histogram"
+        ]
+        recent = [
+            "# HELP assistant_span_recent_seconds Quantiles over the most recent spans.",
+            "# TYPE assistant_span_recent_seconds summary"
+        ]
+        with self.lock:
+            for name, histogram in sorted(self.histograms.items()):
+                for bound, count in zip(BUCKETS, histogram.bucket_counts):
+                    lines.append(f'assistant_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'assistant_span_seconds_bucket{{span="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'assistant_span_seconds_sum{{span="{name}"}} {histogram.total:.6f}')
+                lines.append(f'assistant_span_seconds_count{{span="{name}"}} {histogram.count}')
+                for q in QUANTILES:
+                    value = histogram.quantile(q)
+                    if value is not None:
+                        recent.append(f'assistant_span_recent_seconds{{span="{name}",quantile="{q}"}} {value:.6f}')
+            lines.append("# TYPE assistant_turns_total counter")
+            lines.append(f"assistant_turns_total {self.turn_count}")
+            if self.counters:
+                lines.append("# TYPE assistant_events_total counter")
+                for name, value in sorted(self.counters.items()):
+                    lines.append(f'assistant_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines + recent) + "\n"
+
+    def export_metrics(self):
+        """Atomically rewrite the Prometheus text file"""
+        if not self.enabled or self.metrics_file is None:
+            return
+        self.last_export = time.monotonic()
+        tmp_path = self.metrics_file.with_suffix(self.metrics_file.suffix + '.tmp')
+        try:
+            tmp_path.write_text(self.prometheus_text(), encoding='utf-8')
+            os.replace(tmp_path, self.metrics_file)
+        except OSError as e:
+            print(f"Metrics write error: {e}")
+
+
+tracer = Tracer.from_config(getattr(config, 'DEBUG_CONFIG', {}))
@@ -0,0 +1,53 @@
+import os
+import time
+
+import pytest
+
+pygame = pytest.importorskip('pygame')
+np = pytest.importorskip('numpy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from audio_output import AudioClip, AudioPlayer
+
+RATE = 16000
+
+
+def tone(seconds, amplitude=3000):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return AudioClip.from_pcm((np.sin(2 * np.pi * 220 * t) * amplitude).astype('<i2').tobytes(), RATE)
+
+
+@pytest.fixture(scope='module')
+def player():
+    try:
+        pygame.mixer.init(frequency=RATE, size=-16, channels=1)
+    except pygame.error as e:
+        pytest.skip(f"no audio driver: {e}")
+    return AudioPlayer()
+
+
+def test_clips_play_back_to_back_in_order(player):
+    start_time = time.perf_counter()
+    handles = [player.enqueue(tone(seconds)) for seconds in (0.3, 0.2, 0.2)]
+    assert all(handle.wait(5) for handle in handles)
+    assert not any(handle.cancelled for handle in handles)
+    starts = [handle.started_at - start_time for handle in handles]
+    assert starts == sorted(starts)
+    # Gapless: the whole queue takes about as long as the audio
+    assert 0.6 <= time.perf_counter() - start_time < 1.2
+
+
+def test_stop_cancels_everything_queued(player):
+    handles = [player.enqueue(tone(1.0)) for _ in range(3)]
+    time.sleep(0.1)
+    player.stop()
+    assert all(handle.wait(1) for handle in handles)
+    assert all(handle.cancelled for handle in handles)
+
+
+def test_reference_level_follows_playback(player):
+    handle = player.enqueue(tone(0.5, amplitude=3000))
+    handle.wait(5)
+    level = player.reference_level(handle.started_at, handle.started_at + 0.2)
+    assert 2000 < level < 2200   # RMS of a 3000 amplitude sine
+    assert player.reference_level(handle.started_at - 5, handle.started_at - 4) == 0.0
@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('speech_recognition')
+
+from barge_in import BargeInDetector, BargeInMonitor
+from vad import VoiceActivityDetector
+
+FRAME_MS = 30
+
+
+def make_detector(**kwargs):
+    vad = VoiceActivityDetector(sample_rate=16000, frame_ms=FRAME_MS, energy_threshold=300)
+    vad._set_noise_floor(100.0)
+    return BargeInDetector(vad, **kwargs)
+
+
+def playback(seconds, seed=0):
+    """Fluctuating reference levels of speech being played"""
+    rng = random.Random(seed)
+    return [rng.uniform(500, 6000) for _ in range(int(seconds * 1000 / FRAME_MS))]
+
+
+def echo(reference, gain, seed=1):
+    """What the microphone hears of it: scaled, with some error and room noise"""
+    rng = random.Random(seed)
+    return [max(level * gain * rng.uniform(0.8, 1.2), 100.0) for level in reference]
+
+
+@pytest.mark.parametrize("gain", [0.2, 0.5, 1.0, 2.0])
+def test_echo_alone_never_interrupts(gain):
+    detector = make_detector()
+    reference = playback(5.0)
+    mic = echo(reference, gain)
+    assert not any(detector.feed([level], ref) for level, ref in zip(mic, reference))
+
+
+def test_user_speaking_over_playback_interrupts():
+    detector = make_detector()
+    reference = playback(3.0)
+    mic = echo(reference, 0.5)
+    assert not any(detector.feed([level], ref) for level, ref in zip(mic[:50], reference[:50]))
+
+    speech = [(level ** 2 + 8000.0 ** 2) ** 0.5 for level in mic[50:]]
+    results = [detector.feed([level], ref) for level, ref in zip(speech, reference[50:])]
+    assert any(results)
+    # Needs min_speech_ms of sustained voice, not one loud frame
+    assert results.index(True) >= 200 // FRAME_MS - 1
+
+
+def test_speech_during_silence_interrupts():
+    detector = make_detector()
+    assert detector.feed([5000.0] * 10, 0.0)
+
+
+class FakeStream:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def read(self, size, exception_on_overflow=False):
+        time.sleep(self.delay)
+        return b'\0' * size * 2
+
+
+class FakeMicrophone:
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = 1024
+
+    def __init__(self, delay=0.05):
+        self.stream = FakeStream(delay)
+        self.entered = 0
+        self.inside = threading.Event()
+
+    def __enter__(self):
+        assert not self.inside.is_set(), "microphone opened twice"
+        self.entered += 1
+        self.inside.set()
+        return self
+
+    def __exit__(self, *exc):
+        self.inside.clear()
+
+
+class FakePlayer:
+    def reference_level(self, start_time, end_time):
+        return 0.0
+
+
+class FakeTTS:
+    CLIP_ENGINES = ('espeak',)
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.player = FakePlayer()
+
+
+class FakeAssistant:
+    def __init__(self, engine='espeak', delay=0.05):
+        self.microphone = FakeMicrophone(delay)
+        self.tts = FakeTTS(engine)
+        self.endpointer = None
+
+
+def test_finish_waits_until_the_microphone_is_released():
+    assistant = FakeAssistant(delay=0.3)
+    monitor = BargeInMonitor(assistant, {}, {})
+    for _ in range(2):
+        monitor.start()
+        time.sleep(0.05)
+        monitor.finish()
+        assert not assistant.microphone.inside.is_set()
+    assert assistant.microphone.entered == 2
+
+
+def test_engines_without_a_reference_do_not_listen():
+    assistant = FakeAssistant(engine='pyttsx3')
+    monitor = BargeInMonitor(assistant, {}, {})
+    monitor.start()
+    monitor.finish()
+    assert assistant.microphone.entered == 0
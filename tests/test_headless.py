@@ -0,0 +1,58 @@
+import io
+import json
+
+import pytest
+
+pytest.importorskip('speech_recognition')
+
+from headless import read_commands, run_batch, run_turn
+
+
+@pytest.fixture
+def assistant(tmp_path, monkeypatch):
+    import config
+    import main
+    monkeypatch.setattr(config, 'RESPONSE_CACHE_CONFIG', {'enabled': False})
+    monkeypatch.setitem(config.NOTES_CONFIG, 'notes_file', None)
+    assistant = main.VoiceAssistant(headless=True)
+    assistant.llama_client.is_ready = False
+    return assistant
+
+
+def test_read_commands_accepts_text_and_jsonl():
+    lines = io.StringIO('open youtube\n# comment\n{"id": 7, "transcript": "tell me a joke"}\n\n')
+    assert list(read_commands(lines)) == [
+        ("open youtube", {}),
+        ("tell me a joke", {'id': 7, 'transcript': "tell me a joke"}),
+    ]
+
+
+def test_direct_command_is_handled(assistant):
+    result = run_turn(assistant, "open youtube")
+    assert result['route'] == 'handled'
+    assert result['intent'] == 'open_website'
+    assert result['error'] is None
+
+
+def test_failed_intent_turn_is_recorded_as_an_error(assistant, monkeypatch):
+    def broken(intent):
+        raise RuntimeError("handler exploded")
+    monkeypatch.setattr(assistant, '_handle_intent', broken)
+
+    result = run_turn(assistant, "open youtube")
+    assert result['route'] == 'error'
+    assert result['intent'] == 'open_website'
+    assert result['error'] == "handler exploded"
+    assert result['responses'] == [assistant.fixed_responses['command_error']]
+
+
+def test_failed_llm_turn_is_recorded_as_an_error(assistant, monkeypatch):
+    def broken(command):
+        raise RuntimeError("no model")
+    monkeypatch.setattr(assistant, 'answer_query', broken)
+
+    output = io.StringIO()
+    run_batch(assistant, [("why is the sky blue", {'id': 1}), ("open youtube", {})], output)
+    first, second = (json.loads(line) for line in output.getvalue().splitlines())
+    assert (first['route'], first['intent'], first['id']) == ('error', None, 1)
+    assert second['route'] == 'handled' and second['error'] is None
@@ -0,0 +1,55 @@
+import pytest
+
+from intent_router import IntentRouter
+from notes import NOTE_COMMANDS
+
+APPS = {'chrome': [], 'notepad': [], 'vs code': []}
+WEBSITES = {'youtube': 'https://youtube.com', 'github': 'https://github.com'}
+
+
+@pytest.fixture(scope='module')
+def router():
+    return IntentRouter(APPS, WEBSITES, extra_phrases=NOTE_COMMANDS)
+
+
+@pytest.mark.parametrize("command, name, slots", [
+    ("open chrome", 'open_app', {'app': 'chrome'}),
+    ("please launch VS Code now", 'open_app', {'app': 'vs code'}),
+    ("open youtube", 'open_website', {'site': 'youtube'}),
+    ("lock the screen", None, None),
+    ("lock screen", 'lock', {}),
+    ("take a screenshot", 'screenshot', {}),
+    ("how much battery is left", 'battery', {}),
+    ("search google for python tutorials", 'search', {'query': 'python tutorials'}),
+    ("look up the eiffel tower", 'search', {'query': 'the eiffel tower'}),
+    ("take a note that the dentist is on friday", 'take_note', {'text': 'that the dentist is on friday'}),
+    ("what did I note about the dentist", 'search_notes', {'query': 'the dentist'}),
+    ("what is the capital of france", None, None),
+])
+def test_match(router, command, name, slots):
+    intent = router.match(command)
+    if name is None:
+        assert intent is None
+    else:
+        assert (intent.name, intent.slots) == (name, slots)
+
+
+@pytest.mark.parametrize("command", ["exit", "Goodbye!", "ok stop listening please", "bye bye"])
+def test_whole_utterance_exit(router, command):
+    assert router.match(command).name == 'exit'
+
+
+@pytest.mark.parametrize("command", ["don't stop the music", "how do I exit vim"])
+def test_exit_words_inside_a_sentence_are_not_exit(router, command):
+    intent = router.match(command)
+    assert intent is None or intent.name != 'exit'
+
+
+def test_search_needs_a_query(router):
+    assert router.match("google") is None
+
+
+def test_priorities_pick_the_app_over_the_search(router):
+    names = [intent.name for intent in router.match_all("open chrome and search for cats")]
+    assert names[0] == 'open_app'
+    assert 'search' in names
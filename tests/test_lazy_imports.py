@@ -0,0 +1,42 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from lazy_imports import lazy_import, missing_modules, module_available
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter so numpy has not been imported yet
+THREADED_USE = """
+import sys, threading
+from lazy_imports import lazy_import, preload
+np = lazy_import('numpy')
+preload('numpy')
+errors = []
+def use():
+    try:
+        np.zeros(3)
+    except Exception as e:
+        errors.append(repr(e))
+threads = [threading.Thread(target=use) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(errors)
+sys.exit(1 if errors else 0)
+"""
+
+
+def test_missing_module_is_none():
+    assert lazy_import('no_such_module_for_tests') is None
+    assert not module_available('no_such_module_for_tests')
+    assert missing_modules('json', 'no_such_module_for_tests') == ['no_such_module_for_tests']
+
+
+def test_preloaded_module_is_safe_to_use_from_many_threads():
+    pytest.importorskip('numpy')
+    result = subprocess.run([sys.executable, '-c', THREADED_USE], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from long_term_memory import HashingEmbedder, LongTermMemory, OllamaEmbedder, create_embedder, stored_embedder
+
+
+class FakeOllama:
+    def embeddings(self, model, prompt):
+        return {'embedding': [float(len(prompt)), 1.0, 0.5]}
+
+
+class SlowEmbedder(HashingEmbedder):
+    def __init__(self, name):
+        super().__init__(64)
+        self.name = name
+
+    def embed(self, texts):
+        time.sleep(0.3)
+        return super().embed(texts)
+
+
+def open_memory(tmp_path, embedder):
+    return LongTermMemory(str(tmp_path / 'memory.db'), str(tmp_path / 'memory.vectors'), embedder)
+
+
+def test_auto_keeps_the_embedder_the_index_was_built_with():
+    settings = {'embedder': 'auto'}
+    assert isinstance(create_embedder(settings, FakeOllama()), OllamaEmbedder)
+    assert isinstance(create_embedder(settings, FakeOllama(), pinned='hashing-512'), HashingEmbedder)
+    assert isinstance(create_embedder(settings, FakeOllama(), pinned='ollama:nomic-embed-text'), OllamaEmbedder)
+    # An explicit choice wins over the pinned one
+    assert isinstance(create_embedder({'embedder': 'hashing'}, FakeOllama(), pinned='ollama:x'), HashingEmbedder)
+
+
+def test_recall_finds_related_text(tmp_path):
+    memory = open_memory(tmp_path, HashingEmbedder())
+    memory.add("User: my sister lives in Lisbon")
+    memory.add("User: I parked the car on level three")
+    assert memory.flush()
+    score, text = memory.search("where does my sister live", k=1)[0]
+    assert text == "User: my sister lives in Lisbon"
+    assert stored_embedder(str(tmp_path / 'memory.db')) == 'hashing-512'
+
+
+def test_changed_embedder_rebuilds_in_the_background(tmp_path):
+    memory = open_memory(tmp_path, HashingEmbedder())
+    for i in range(5):
+        memory.add(f"User: remembered fact number {i}")
+    assert memory.flush()
+
+    start_time = time.perf_counter()
+    memory = open_memory(tmp_path, SlowEmbedder('slow-64'))
+    assert time.perf_counter() - start_time < 0.2
+    assert memory.flush()
+    assert memory.index.count == 5
+    assert stored_embedder(str(tmp_path / 'memory.db')) == 'slow-64'
@@ -0,0 +1,65 @@
+import pytest
+
+from notes import NoteStore, clean_note
+
+
+@pytest.fixture
+def store():
+    return NoteStore(':memory:')
+
+
+@pytest.mark.parametrize("spoken, note", [
+    ("that the dentist is on friday", "the dentist is on friday"),
+    ("to remember that milk is low", "milk is low"),
+    (": buy stamps", "buy stamps"),
+    ("  call mom  ", "call mom"),
+])
+def test_clean_note(spoken, note):
+    assert clean_note(spoken) == note
+
+
+def test_search_ranks_notes_with_every_word(store):
+    store.add("dentist appointment on friday at nine")
+    store.add("buy a birthday present")
+    store.add("the dentist said to floss")
+    results = store.search("dentist friday")
+    assert [content for content, _, _ in results] == ["dentist appointment on friday at nine"]
+
+
+def test_search_falls_back_to_any_word(store):
+    store.add("flight to lisbon on monday")
+    store.add("hotel booking reference 42")
+    contents = {content for content, _, _ in store.search("lisbon hotel")}
+    assert contents == {"flight to lisbon on monday", "hotel booking reference 42"}
+
+
+def test_stopwords_do_not_match_unrelated_notes(store):
+    store.add("the car needs new tyres")
+    store.add("return the library books")
+    assert store.search("the dentist") == []
+    assert store.search("the") == []
+    store.add("dentist on the 14th")
+    assert [content for content, _, _ in store.search("the dentist")] == ["dentist on the 14th"]
+
+
+def test_search_stems_words(store):
+    store.add("meeting with the designers")
+    assert store.search("meetings")
+
+
+def test_empty_query_finds_nothing(store):
+    store.add("something")
+    assert store.search("?!") == []
+
+
+def test_notes_file_is_imported_once(tmp_path):
+    notes_file = tmp_path / 'notes.txt'
+    notes_file.write_text("[2024-01-02 10:00:00] renew passport\nplain line without stamp\n", encoding='utf-8')
+    db_path = str(tmp_path / 'notes.db')
+    store = NoteStore(db_path, notes_file)
+    assert store.count() == 2
+    assert store.search("passport")[0][2] == "2024-01-02 10:00:00"
+
+    store.add("water the plants")
+    assert notes_file.read_text(encoding='utf-8').rstrip().endswith("water the plants")
+    assert NoteStore(db_path, notes_file).count() == 3
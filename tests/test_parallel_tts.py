@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from parallel_tts import ParallelSynthesizer
+
+SAMPLE_RATE = 16000
+
+
+class FakeSynthesizer:
+    """Takes 20 ms per word and returns 0.3 s of silence per word"""
+    sample_rate = SAMPLE_RATE
+
+    def synthesize(self, text):
+        time.sleep(0.02 * len(text.split()))
+        return b'\0\0' * int(SAMPLE_RATE * 0.3 * len(text.split()))
+
+
+def fake_factory(engine, voice, rate, threads):
+    return FakeSynthesizer()
+
+
+def test_pending_clips_resolve_in_order_while_later_ones_synthesize():
+    synthesizer = ParallelSynthesizer('fake', None, workers=2, factory=fake_factory)
+    try:
+        for future in synthesizer.warm_up():
+            future.result()
+        ready = []
+        sentences = ["one two three four five six.", "seven.", "eight nine."]
+        clips = [synthesizer.pending(sentence, on_ready=lambda clip, s=sentence: ready.append(s))
+                 for sentence in sentences]
+        durations = [clip.duration() for clip in clips]
+        assert durations == pytest.approx([0.3 * len(sentence.split()) for sentence in sentences])
+        assert ready == sentences
+
+        stats = synthesizer.stats.summary()['fake']
+        assert stats['sentences'] == 3
+        # Overlapping synthesis is only counted once on the wall clock
+        assert stats['wall_rtf'] < stats['rtf']
+    finally:
+        synthesizer.close()
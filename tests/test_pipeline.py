@@ -0,0 +1,75 @@
+import asyncio
+import types
+
+from audio_output import PlaybackHandle
+from pipeline import AssistantPipeline
+
+
+class FakePlayer:
+    def __init__(self):
+        self.handles = []
+
+    def enqueue(self, clip):
+        handle = PlaybackHandle()
+        self.handles.append(handle)
+        return handle
+
+
+def make_pipeline():
+    tts = types.SimpleNamespace(engine='espeak', player=FakePlayer())
+    pipeline = AssistantPipeline(types.SimpleNamespace(tts=tts), workers=2)
+    return pipeline, tts.player
+
+
+def test_ready_clips_are_queued_while_earlier_ones_play():
+    pipeline, player = make_pipeline()
+
+    async def scenario():
+        pipeline.loop = asyncio.get_running_loop()
+        pipeline.quiet = asyncio.Event()
+        pipeline.playback_queue = asyncio.Queue(4)
+        stage = asyncio.create_task(pipeline._playback_stage())
+        try:
+            for i in range(3):
+                pipeline.pending_speech += 1
+                await pipeline.playback_queue.put((f"sentence {i}", object()))
+            await asyncio.wait_for(pipeline.playback_queue.join(), 2)
+            # Nothing has finished playing, yet every clip is already with the player
+            assert len(player.handles) == 3
+
+            for handle in player.handles:
+                handle._finish()
+            await asyncio.wait_for(pipeline.quiet.wait(), 2)
+            assert pipeline.pending_speech == 0
+        finally:
+            for handle in player.handles:
+                handle._finish(cancelled=True)
+            stage.cancel()
+            pipeline.executor.shutdown(wait=False)
+
+    asyncio.run(scenario())
+
+
+def test_clip_arriving_after_a_pause_is_queued_at_once():
+    pipeline, player = make_pipeline()
+
+    async def scenario():
+        pipeline.loop = asyncio.get_running_loop()
+        pipeline.quiet = asyncio.Event()
+        pipeline.playback_queue = asyncio.Queue(4)
+        stage = asyncio.create_task(pipeline._playback_stage())
+        try:
+            pipeline.pending_speech = 2
+            await pipeline.playback_queue.put(("first", object()))
+            await asyncio.sleep(0.05)  # The stage is now waiting on the playing clip
+            await pipeline.playback_queue.put(("second", object()))
+            await asyncio.wait_for(pipeline.playback_queue.join(), 2)
+            assert len(player.handles) == 2
+            assert not player.handles[0].done.is_set()
+        finally:
+            for handle in player.handles:
+                handle._finish(cancelled=True)
+            stage.cancel()
+            pipeline.executor.shutdown(wait=False)
+
+    asyncio.run(scenario())
@@ -0,0 +1,91 @@
+import pytest
+
+import config
+from response_cache import ResponseCache, normalize_prompt
+
+
+@pytest.fixture
+def llama_client(tmp_path, monkeypatch):
+    import main
+    monkeypatch.setattr(config, 'RESPONSE_CACHE_CONFIG', {'db_path': str(tmp_path / 'cache.db')})
+    return main.LlamaClient(model_name='test-model')
+
+
+def test_normalize_prompt_ignores_case_punctuation_and_filler():
+    assert normalize_prompt("Hey, what's the capital of France?") == "what's the capital of france"
+    assert normalize_prompt("what's the capital of france please") == "what's the capital of france"
+
+
+@pytest.mark.parametrize("prompt, reason", [
+    ("", 'empty'),
+    ("what is the weather like", 'time_sensitive'),
+    ("what time is it", 'time_sensitive'),
+    ("tell me more about that", 'follow_up'),
+    ("what is the capital of france", None),
+])
+def test_bypass_reason(prompt, reason):
+    assert ResponseCache.bypass_reason(normalize_prompt(prompt)) == reason
+
+
+def test_get_returns_stored_response_until_expired(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    cache.put('key', 'prompt', 'answer', 'model')
+    assert cache.get('key') == 'answer'
+    cache.put('old', 'prompt', 'stale', 'model', ttl=-1)
+    assert cache.get('old') is None
+
+
+def test_entries_persist_across_instances(tmp_path):
+    ResponseCache(str(tmp_path / 'cache.db')).put('key', 'prompt', 'answer', 'model')
+    assert ResponseCache(str(tmp_path / 'cache.db')).get('key') == 'answer'
+
+
+def test_phrasing_variants_share_a_key(llama_client):
+    first = llama_client._cache_key("What is the capital of France?",
+                                    llama_client._build_messages("What is the capital of France?"), None)
+    second = llama_client._cache_key("what is the capital of france",
+                                     llama_client._build_messages("what is the capital of france"), None)
+    assert first is not None and first == second
+
+
+class FakeOllama:
+    """Counts chat calls and answers every question the same way"""
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, **kwargs):
+        self.calls += 1
+        return {'message': {'content': "Paris is the capital of France."}}
+
+
+def test_repeated_question_across_turns_skips_the_model(llama_client):
+    import main
+    llama_client.client = FakeOllama()
+    llama_client.is_ready = True
+    memory = main.ConversationMemory(system_prompt=llama_client.system_prompt)
+    prompt = "What is the capital of France?"
+
+    for _ in range(3):
+        answer = llama_client.generate_response(prompt, memory.messages(prompt))
+        memory.add_message("User", prompt)
+        memory.add_message("Assistant", answer)
+
+    assert llama_client.client.calls == 1
+    assert llama_client.cache.stats['hits'] == 2
+
+
+def test_recalled_memories_change_the_key(llama_client):
+    import main
+    prompt = "What is my favourite colour?"
+    memory = main.ConversationMemory(system_prompt=llama_client.system_prompt)
+    plain = llama_client._cache_key(prompt, memory.messages(prompt), None)
+    recalled = llama_client._cache_key(prompt, memory.messages(prompt, ["User: I like green"]), None)
+    assert plain != recalled
+
+
+def test_headless_cache_leaves_the_database_alone(tmp_path):
+    from response_cache import create_response_cache
+    cache = create_response_cache({'db_path': str(tmp_path / 'cache.db')}, headless=True)
+    cache.put('key', 'prompt', 'answer', 'model')
+    assert cache.get('key') == 'answer'
+    assert not (tmp_path / 'cache.db').exists()
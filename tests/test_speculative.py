@@ -0,0 +1,85 @@
+import threading
+import time
+
+from speculative import SpeculativeGenerator
+
+
+def fake_stream(prompt):
+    for word in f"answer to {prompt}".split():
+        time.sleep(0.005)
+        yield word + " "
+
+
+def wait_for(speculation_count, generator, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while generator.stats['started'] < speculation_count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def make_generator(**settings):
+    return SpeculativeGenerator(fake_stream, lambda prompt: True, dict({'stable_ms': 20}, **settings))
+
+
+def test_matching_final_transcript_uses_the_speculation():
+    generator = make_generator()
+    generator.on_partial("what is the capital of france")
+    wait_for(1, generator)
+    tokens = generator.claim("What is the capital of France?")
+    assert "".join(tokens).strip() == "answer to what is the capital of france"
+    assert generator.summary()['hits'] == 1
+
+
+def test_different_final_transcript_is_a_miss():
+    generator = make_generator()
+    generator.on_partial("tell me a joke please")
+    wait_for(1, generator)
+    assert generator.claim("tell me a story please") is None
+    assert generator.summary()['misses'] == 1
+
+
+def test_short_partials_are_not_speculated():
+    generator = make_generator(min_words=3)
+    generator.on_partial("what is")
+    time.sleep(0.1)
+    assert generator.stats['started'] == 0
+
+
+def test_discard_frees_the_per_utterance_cap():
+    generator = make_generator(max_per_utterance=1)
+    generator.on_partial("open the pod bay doors")
+    wait_for(1, generator)
+    generator.discard()
+    generator.on_partial("what is the capital of france")
+    wait_for(2, generator)
+    assert generator.stats['started'] == 2
+
+
+def test_speculation_reads_memory_while_it_changes():
+    import main
+
+    class LongTerm:
+        def add(self, text):
+            pass
+
+        def search(self, prompt, k, min_score):
+            return []
+
+    memory = main.ConversationMemory(token_budget=100000, max_size=100000, long_term=LongTerm())
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            try:
+                memory.messages("question")
+                memory.recall("question")
+            except RuntimeError as e:
+                errors.append(e)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for i in range(20000):
+        memory.add_message("User", f"message {i}")
+    stop.set()
+    reader.join()
+    assert not errors
@@ -0,0 +1,36 @@
+from text_utils import SentenceChunker, estimate_tokens, normalize_text, split_sentences
+
+
+def test_sentences_come_out_as_soon_as_they_end():
+    chunker = SentenceChunker()
+    assert chunker.feed("Hello there") == []
+    assert chunker.feed(". How are") == ["Hello there."]
+    assert chunker.feed(" you? I am fine") == ["How are you?"]
+    assert chunker.flush() == ["I am fine"]
+    assert chunker.flush() == []
+
+
+def test_streamed_tokens_match_splitting_the_whole_text():
+    text = "Dr. Smith arrived at 5 p.m. today! He said \"hello.\" Then he left.\nNew line here"
+    chunker = SentenceChunker()
+    streamed = []
+    for character in text:
+        streamed.extend(chunker.feed(character))
+    streamed.extend(chunker.flush())
+    assert streamed == split_sentences(text)
+
+
+def test_abbreviations_do_not_end_a_sentence():
+    assert split_sentences("Ask Dr. Smith about it, e.g. tomorrow. Then rest.") == [
+        "Ask Dr. Smith about it, e.g. tomorrow.", "Then rest."
+    ]
+
+
+def test_closing_quotes_and_newlines():
+    assert split_sentences('He said "stop." Then left.\nNext') == ['He said "stop."', "Then left.", "Next"]
+
+
+def test_normalize_text_and_token_estimate():
+    assert normalize_text("  ﬁne  day ") == "fine day"
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 40) == 11
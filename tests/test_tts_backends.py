@@ -0,0 +1,61 @@
+import threading
+
+from tts_backends import Pyttsx3Worker
+
+
+class FakeEngine:
+    """pyttsx3 stand-in whose runAndWait blocks until stop() is called"""
+    def __init__(self):
+        self.spoken = []
+        self.speaking = threading.Event()
+        self.stopped = threading.Event()
+
+    def say(self, text):
+        self.spoken.append(text)
+
+    def runAndWait(self):
+        self.speaking.set()
+        self.stopped.wait(5)
+        self.stopped.clear()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def make_worker(engine):
+    worker = Pyttsx3Worker.__new__(Pyttsx3Worker)
+    worker._create_engine = lambda: engine
+    Pyttsx3Worker.__init__(worker)
+    return worker
+
+
+def test_stopped_sentence_is_spoken_once_and_cancelled():
+    engine = FakeEngine()
+    worker = make_worker(engine)
+    text = "This sentence is long enough to look like a dead driver when cut short."
+
+    handle = worker.speak(text)
+    assert engine.speaking.wait(5)
+    worker.stop()
+
+    assert handle.wait(5)
+    assert handle.cancelled
+    assert handle.error is None
+    assert engine.spoken == [text]
+    assert worker.restarts == 0
+
+
+def test_next_sentence_after_stop_is_spoken():
+    engine = FakeEngine()
+    worker = make_worker(engine)
+    worker.speak("First sentence that gets interrupted right away by the user.")
+    assert engine.speaking.wait(5)
+    worker.stop()
+
+    engine.speaking.clear()
+    handle = worker.speak("Hi.")
+    assert engine.speaking.wait(5)
+    engine.stop()
+    assert handle.wait(5)
+    assert not handle.cancelled
+    assert engine.spoken[-1] == "Hi."
@@ -0,0 +1,56 @@
+import pytest
+
+from tts_cache import TTSAudioCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTSAudioCache(tmp_path / 'tts_cache', max_size_mb=1)
+
+
+def test_hit_returns_stored_audio(cache):
+    key = TTSAudioCache.make_key('espeak', 'en', 140, "Hello there")
+    cache.put(key, b'RIFF audio', 'wav')
+    assert cache.read(key) == (b'RIFF audio', 'wav')
+    assert cache.get(key).read_bytes() == b'RIFF audio'
+    assert cache.hits == 2
+
+
+def test_miss_returns_none(cache):
+    assert cache.read('missing') is None
+    assert cache.get('missing') is None
+    assert cache.misses == 2
+
+
+def test_key_depends_on_voice_and_rate_but_not_spacing():
+    key = TTSAudioCache.make_key('espeak', 'en', 140, "Hello there")
+    assert key == TTSAudioCache.make_key('espeak', 'en', 140, "  Hello   there ")
+    assert key != TTSAudioCache.make_key('espeak', 'en-gb', 140, "Hello there")
+    assert key != TTSAudioCache.make_key('espeak', 'en', 180, "Hello there")
+    assert key != TTSAudioCache.make_key('google', 'en', 140, "Hello there")
+
+
+def test_least_recently_used_entries_are_evicted_at_the_size_cap(tmp_path):
+    cache = TTSAudioCache(tmp_path, max_size_mb=2 / 1024)  # 2 KiB
+    cache.put('a', b'x' * 800, 'wav')
+    cache.put('b', b'x' * 800, 'wav')
+    assert cache.read('a') is not None  # 'a' is now more recent than 'b'
+    cache.put('c', b'x' * 800, 'wav')
+
+    assert cache.read('b') is None
+    assert not (tmp_path / 'b.wav').exists()
+    assert cache.read('a') is not None and cache.read('c') is not None
+    assert cache.total_bytes == 1600
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    TTSAudioCache(tmp_path).put('key', b'audio', 'mp3')
+    assert TTSAudioCache(tmp_path).read('key') == (b'audio', 'mp3')
+
+
+def test_file_deleted_behind_the_cache_is_a_miss(cache):
+    path = cache.put('key', b'audio', 'wav')
+    path.unlink()
+    assert cache.read('key') is None
+    assert 'key' not in cache.entries
+    assert cache.total_bytes == 0
@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('speech_recognition')
+
+from vad import SpeechEndpointer, VoiceActivityDetector
+
+RATE = 16000
+
+
+def pcm(seconds, amplitude):
+    """A 220 Hz tone (or silence) as 16-bit PCM"""
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (np.sin(2 * np.pi * 220 * t) * amplitude).astype('<i2').tobytes()
+
+
+def make_endpointer(**kwargs):
+    vad = VoiceActivityDetector(sample_rate=RATE, frame_ms=30, energy_threshold=1000, dynamic_threshold=False)
+    return SpeechEndpointer(vad, **kwargs)
+
+
+def feed_in_chunks(endpointer, data, chunk=1024):
+    states = []
+    for start in range(0, len(data), chunk * 2):
+        states.append(endpointer.feed(data[start:start + chunk * 2]))
+    return states
+
+
+def test_silence_keeps_waiting():
+    endpointer = make_endpointer()
+    assert set(feed_in_chunks(endpointer, pcm(1.0, 0))) == {SpeechEndpointer.WAITING}
+
+
+def test_utterance_ends_after_the_hangover():
+    endpointer = make_endpointer(hangover_ms=300)
+    states = feed_in_chunks(endpointer, pcm(0.5, 0) + pcm(1.0, 8000) + pcm(1.0, 0))
+    assert SpeechEndpointer.SPEECH in states
+    assert states[-1] == SpeechEndpointer.ENDED
+    # About a second of voice plus preroll, without the trailing silence
+    seconds = len(endpointer.audio()) / 2 / RATE
+    assert 1.0 <= seconds <= 1.5
+
+
+def test_short_click_is_not_speech():
+    endpointer = make_endpointer(min_speech_ms=90)
+    states = feed_in_chunks(endpointer, pcm(0.5, 0) + pcm(0.03, 8000) + pcm(0.5, 0))
+    assert set(states) == {SpeechEndpointer.WAITING}
+
+
+def test_webrtc_falls_back_on_unsupported_rates():
+    vad = VoiceActivityDetector(sample_rate=44100, backend='webrtc')
+    assert vad.webrtc is None
+    assert len(vad.classify(b'\0\0' * 44100)) == 33
+
+
+def test_webrtc_accepts_supported_rates():
+    pytest.importorskip('webrtcvad')
+    vad = VoiceActivityDetector(sample_rate=RATE, backend='webrtc')
+    assert vad.webrtc is not None
+    assert not vad.classify(pcm(0.3, 0)).any()
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip('speech_recognition')
+
+
+class ClosedStream:
+    def read(self, size, exception_on_overflow=False):
+        return b''
+
+
+class FakeMicrophone:
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = 1024
+    stream = ClosedStream()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class NeverHeard:
+    phrases = ['hey assistant']
+
+    def wait(self, source):
+        return None
+
+
+class Untouchable:
+    def __getattr__(self, name):
+        raise AssertionError(f"listened after the wake word was not heard ({name})")
+
+
+@pytest.fixture
+def assistant(monkeypatch):
+    import main
+    assistant = main.VoiceAssistant(headless=True)
+    assistant.microphone = FakeMicrophone()
+    assistant.wake_word = NeverHeard()
+    assistant.endpointer = Untouchable()
+    assistant.recognizer = Untouchable()
+    return assistant
+
+
+def test_capture_stops_when_the_wake_word_never_comes(assistant, capsys):
+    assert assistant.capture_audio() is None
+    output = capsys.readouterr().out
+    assert "Wake word detected" not in output and "Listen error" not in output
+
+
+def test_streaming_listen_stops_when_the_wake_word_never_comes(assistant, capsys):
+    assistant.stt = Untouchable()
+    assert assistant.listen_streaming() is None
+    assert "Listen error" not in capsys.readouterr().out
@@ -0,0 +1,79 @@
+"""
+Text helpers shared by the LLM, TTS and memory subsystems
+"""
+
+import re
+import unicodedata
+
+# Words that end with a period but do not end a sentence
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc',
+    'e.g', 'i.e', 'approx', 'dept', 'inc', 'ltd', 'no', 'fig'
+}
+
+_SENTENCE_END = re.compile(r'([.!?]+["\')\]]*)(\s+)|(\n+)')
+
+
+class SentenceChunker:
+    """Cut a stream of text tokens into complete sentences as they arrive"""
+    def __init__(self, min_chars=2):
+        self.buffer = ""
+        self.min_chars = min_chars
+
+    def feed(self, token):
+        """Add a token and return any sentences that are now complete"""
+        self.buffer += token
+        sentences = []
+        search_from = 0
+
+        while True:
+            match = _SENTENCE_END.search(self.buffer, search_from)
+            if not match:
+                break
+
+            candidate = self.buffer[:match.end()].strip()
+            if match.group(1) and self._ends_with_abbreviation(self.buffer[:match.start()]):
+                search_from = match.end()
+                continue
+            if len(candidate) < self.min_chars:
+                search_from = match.end()
+                continue
+
+            sentences.append(candidate)
+            self.buffer = self.buffer[match.end():]
+            search_from = 0
+
+        return sentences
+
+    def flush(self):
+        """Return whatever is left in the buffer as a final sentence"""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return [remainder] if remainder else []
+
+    def _ends_with_abbreviation(self, text):
+        """Check whether the text before a period is a known abbreviation"""
+        words = text.split()
+        if not words:
+            return False
+        last_word = words[-1].lower().rstrip('.')
+        return last_word in ABBREVIATIONS
+
+
+def split_sentences(text):
+    """Split a complete text into sentences"""
+    chunker = SentenceChunker()
+    sentences = chunker.feed(text)
+    sentences.extend(chunker.flush())
+    return sentences
+
+
+def estimate_tokens(text):
+    """Rough LLaMA token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def normalize_text(text):
+    """Normalize unicode and whitespace so equivalent strings compare equal"""
+    text = unicodedata.normalize('NFKC', text)
+    return " ".join(text.split())
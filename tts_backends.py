@@ -0,0 +1,283 @@
+"""
+Long-lived speech engine backends used by MultiTTS
+"""
+
+import ctypes
+import ctypes.util
+import io
+import queue
+import subprocess
+import threading
+import time
+import wave
+
+from audio_output import PlaybackHandle
+
+
+class Pyttsx3Worker:
+    """Own one initialized pyttsx3 engine on a dedicated thread and speak queued text"""
+    def __init__(self, rate=140, volume=1.0, voice_preference='male'):
+        self.rate = rate
+        self.volume = volume
+        self.voice_preference = voice_preference
+        self.requests = queue.Queue()
+        self.engine = None
+        self.restarts = 0
+        self.lock = threading.Lock()
+        self.generation = 0  # bumped by stop() so an interrupted utterance is not retried
+        self.thread = None
+        self._ensure_running()
+
+    def speak(self, text):
+        """Queue text and return a handle that completes when it has been spoken"""
+        handle = PlaybackHandle()
+        self._ensure_running()
+        self.requests.put((text, handle))
+        return handle
+
+    def stop(self):
+        """Drop queued text and interrupt the current utterance"""
+        with self.lock:
+            self.generation += 1
+        while True:
+            try:
+                _, handle = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            handle._finish(cancelled=True)
+
+        engine = self.engine
+        if engine is not None:
+            try:
+                engine.stop()
+            except Exception:
+                pass
+
+    def _ensure_running(self):
+        """Start the worker thread, or restart it if it died"""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            if self.thread is not None:
+                print(" pyttsx3 worker died - restarting")
+                self.restarts += 1
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _create_engine(self):
+        """Initialize pyttsx3 once with rate, volume and voice resolved"""
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+
+        voice_id = self._resolve_voice(engine.getProperty('voices') or [])
+        if voice_id:
+            engine.setProperty('voice', voice_id)
+        return engine
+
+    def _resolve_voice(self, voices):
+        """Pick the voice matching the configured preference"""
+        for voice in voices:
+            name = voice.name.lower()
+            if self.voice_preference == 'male':
+                if 'david' in name or ('male' in name and 'female' not in name):
+                    return voice.id
+            elif self.voice_preference == 'female':
+                if 'female' in name or 'zira' in name:
+                    return voice.id
+        return None
+
+    def _looks_dead(self, text, elapsed):
+        """Detect a driver that returned from runAndWait without speaking"""
+        words = len(text.split())
+        if words < 3:
+            return False
+        expected = words / self.rate * 60
+        return elapsed < expected * 0.2
+
+    def _run(self):
+        """Speak queued text with one engine, recreating it when the driver fails"""
+        # Pay initialization and voice lookup before the first utterance arrives
+        if self.engine is None:
+            try:
+                self.engine = self._create_engine()
+            except Exception as e:
+                print(f"pyttsx3 init error: {e}")
+
+        while True:
+            text, handle = self.requests.get()
+            with self.lock:
+                generation = self.generation
+            error = None
+
+            for attempt in range(2):
+                try:
+                    if self.engine is None:
+                        self.engine = self._create_engine()
+
+                    handle.started_at = time.perf_counter()
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+
+                    # stop() also makes runAndWait return early; that is not a dead driver
+                    if self.generation != generation:
+                        break
+                    if attempt == 0 and self._looks_dead(text, time.perf_counter() - handle.started_at):
+                        raise RuntimeError("driver returned without speaking")
+                    error = None
+                    break
+
+                except Exception as e:
+                    if self.generation != generation:
+                        break
+                    print(f"pyttsx3 error: {e} - reinitializing engine")
+                    error = e
+                    self.engine = None
+                    self.restarts += 1
+
+            if self.generation != generation:
+                handle._finish(cancelled=True)
+            else:
+                handle._finish(error=error)
+
+
+# int callback(short *wav, int numsamples, espeak_EVENT *events)
+ESPEAK_SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+
+
+class EspeakLibrary:
+    """In-process libespeak-ng synthesizer that stays initialized and returns raw PCM"""
+    AUDIO_OUTPUT_SYNCHRONOUS = 2
+    ESPEAK_RATE = 1
+    POS_CHARACTER = 1
+    CHARS_UTF8 = 1
+    END_PAUSE = 0x1000
+    EE_OK = 0
+
+    def __init__(self, voice='en', rate=140, library_path=None):
+        # The capability probe passes the path it found so startup skips the search
+        library_path = library_path or ctypes.util.find_library('espeak-ng') or ctypes.util.find_library('espeak')
+        if not library_path:
+            raise OSError("libespeak-ng not found")
+
+        lib = ctypes.CDLL(library_path)
+        lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+        lib.espeak_Initialize.restype = ctypes.c_int
+        lib.espeak_SetSynthCallback.argtypes = [ESPEAK_SYNTH_CALLBACK]
+        lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        lib.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        lib.espeak_Synth.argtypes = [
+            ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_uint), ctypes.c_void_p
+        ]
+        lib.espeak_Synth.restype = ctypes.c_int
+
+        self.sample_rate = lib.espeak_Initialize(self.AUDIO_OUTPUT_SYNCHRONOUS, 0, None, 0)
+        if self.sample_rate <= 0:
+            raise OSError("espeak_Initialize failed")
+
+        # Keep a reference so the callback is not garbage collected
+        self._callback = ESPEAK_SYNTH_CALLBACK(self._on_samples)
+        lib.espeak_SetSynthCallback(self._callback)
+        lib.espeak_SetVoiceByName(voice.encode('utf-8'))
+        lib.espeak_SetParameter(self.ESPEAK_RATE, int(rate), 0)
+
+        self.lib = lib
+        self.lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.chunks = []
+
+    def _on_samples(self, wav, num_samples, events):
+        """Collect PCM produced by espeak; returning 1 aborts synthesis"""
+        if num_samples > 0 and wav:
+            self.chunks.append(ctypes.string_at(wav, num_samples * 2))
+        return 1 if self.cancel_event.is_set() else 0
+
+    def synthesize(self, text):
+        """Render text to 16-bit mono PCM at self.sample_rate"""
+        with self.lock:
+            self.chunks = []
+            self.cancel_event.clear()
+            data = text.encode('utf-8') + b'\0'
+            result = self.lib.espeak_Synth(
+                data, len(data), 0, self.POS_CHARACTER, 0,
+                self.CHARS_UTF8 | self.END_PAUSE, None, None
+            )
+            if result != self.EE_OK:
+                raise RuntimeError(f"espeak_Synth failed with code {result}")
+            return b''.join(self.chunks)
+
+    def cancel(self):
+        """Abort the synthesis in progress"""
+        self.cancel_event.set()
+
+
+class EspeakCommand:
+    """Fallback that runs the espeak binary per utterance without a shell"""
+    def __init__(self, voice='en', rate=140):
+        self.voice = voice
+        self.rate = rate
+        self.sample_rate = 22050
+        self.process = None
+
+    def synthesize(self, text):
+        """Render text to 16-bit mono PCM at self.sample_rate"""
+        self.process = subprocess.Popen(
+            ['espeak', '-v', self.voice, '-s', str(self.rate), '--stdout', text],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        output, _ = self.process.communicate()
+        if self.process.returncode != 0:
+            raise RuntimeError(f"espeak exited with code {self.process.returncode}")
+
+        # espeak cannot seek stdout, so the header's frame count is bogus; read to EOF
+        with wave.open(io.BytesIO(output), 'rb') as wav_file:
+            self.sample_rate = wav_file.getframerate()
+            return wav_file.readframes(wav_file.getnframes())
+
+    def cancel(self):
+        """Kill the espeak process in progress"""
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+
+def create_espeak_synthesizer(voice='en', rate=140, library_path=None):
+    """Prefer the in-process library and fall back to the espeak binary"""
+    try:
+        synthesizer = EspeakLibrary(voice, rate, library_path)
+        print(" eSpeak running in-process via libespeak-ng")
+        return synthesizer
+    except (OSError, AttributeError) as e:
+        print(f" libespeak-ng unavailable ({e}) - using espeak command")
+        return EspeakCommand(voice, rate)
+
+
+class CoquiSynthesizer:
+    """Loaded Coqui TTS model that renders text to 16-bit mono PCM"""
+    def __init__(self, model_name, threads=None):
+        from TTS.api import TTS
+        if threads:
+            # One worker per core should not also fan out across every core
+            import torch
+            torch.set_num_threads(threads)
+        self.tts = TTS(model_name)
+        self.sample_rate = self.tts.synthesizer.output_sample_rate
+
+    def synthesize(self, text):
+        import numpy as np
+        samples = np.clip(np.asarray(self.tts.tts(text=text), dtype=np.float32), -1.0, 1.0)
+        return (samples * 32767).astype('<i2').tobytes()
+
+    def cancel(self):
+        """Coqui cannot be interrupted mid-sentence"""
+
+
+def create_synthesizer(engine, voice, rate=140, threads=None):
+    """Build a PCM synthesizer for an engine that runs locally ('coqui' or 'espeak')"""
+    if engine == 'coqui':
+        return CoquiSynthesizer(voice, threads)
+    if engine == 'espeak':
+        return create_espeak_synthesizer(voice, rate)
+    raise ValueError(f"{engine} has no local PCM synthesizer")
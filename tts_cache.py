@@ -0,0 +1,125 @@
+"""
+Content-addressed on-disk cache for synthesized speech
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from text_utils import normalize_text
+
+
+class TTSAudioCache:
+    """Store synthesized audio keyed on engine, voice, rate and text with LRU eviction"""
+    def __init__(self, directory="data/tts_cache", max_size_mb=200):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (path, size), oldest first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from file access times on disk"""
+        files = []
+        for path in self.directory.iterdir():
+            if not path.is_file():
+                continue
+            if path.name.endswith('.tmp'):
+                # Leftover from an interrupted synthesis
+                path.unlink()
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, path, stat.st_size))
+
+        for _, path, size in sorted(files):
+            self.entries[path.stem] = (path, size)
+            self.total_bytes += size
+
+    @staticmethod
+    def make_key(engine, voice, rate, text):
+        """Build the content address for an utterance"""
+        payload = json.dumps([engine, voice, rate, normalize_text(text)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached audio path for a key, or None"""
+        hit = self._lookup(key, read=False)
+        return hit[0] if hit is not None else None
+
+    def read(self, key):
+        """Return (audio bytes, extension) for a key, or None
+
+        The file is read while the lock is held, so a concurrent put() cannot
+        evict it between the lookup and the read.
+        """
+        hit = self._lookup(key, read=True)
+        return (hit[1], hit[0].suffix.lstrip('.')) if hit is not None else None
+
+    def _lookup(self, key, read):
+        """Return (path, bytes or None) for a key and mark it recently used, or None on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            data = None
+            if entry is not None:
+                try:
+                    if read:
+                        data = entry[0].read_bytes()
+                    elif not entry[0].exists():
+                        raise FileNotFoundError(entry[0])
+                except OSError:
+                    # Deleted behind the cache's back
+                    self._remove(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+        # Persist recency so LRU order survives restarts
+        try:
+            os.utime(entry[0])
+        except OSError:
+            pass
+        return entry[0], data
+
+    def put(self, key, data, extension):
+        """Store synthesized audio bytes and return their path"""
+        target = self.directory / f"{key}.{extension}"
+        temp_path = self.directory / f"{key}.{extension}.{threading.get_ident()}.tmp"
+        temp_path.write_bytes(data)
+        os.replace(temp_path, target)
+        size = len(data)
+
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries[key][1]
+            self.entries[key] = (target, size)
+            self.entries.move_to_end(key)
+            self.total_bytes += size
+            self._evict()
+
+        return target
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its cap"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest_key = next(iter(self.entries))
+            self._remove(oldest_key)
+
+    def _remove(self, key):
+        """Forget an entry and delete its file"""
+        path, size = self.entries.pop(key)
+        self.total_bytes -= size
+        try:
+            path.unlink()
+        except OSError:
+            pass
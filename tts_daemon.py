@@ -0,0 +1,263 @@
+"""
+Local TTS daemon: one warm model shared by every assistant process
+
+    python tts_daemon.py --engine coqui
+
+loads the engine once and serves synthesis requests on a Unix socket, so
+assistant restarts and concurrent assistant processes skip the model load and
+share its memory. MultiTTS uses it as the 'daemon' engine through DaemonClient.
+
+Protocol (all integers big-endian):
+    request:  b'TTSD', opcode u8, payload length u32, payload
+              opcode 1 = synthesize (payload: UTF-8 text), 2 = info (no payload)
+    response: status u8 (0 ok, 1 error), sample rate u32, payload length u32, payload
+              synthesize: 16-bit mono PCM; info: JSON; error: UTF-8 message
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+MAGIC = b'TTSD'
+REQUEST = struct.Struct('!4sBI')
+RESPONSE = struct.Struct('!BII')
+OP_SYNTHESIZE = 1
+OP_INFO = 2
+STATUS_OK = 0
+STATUS_ERROR = 1
+MAX_TEXT_BYTES = 64 * 1024
+
+
+def _recv_exact(sock, size):
+    """Read exactly size bytes, or raise ConnectionError if the peer closed"""
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("TTS daemon connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Serve requests on one client connection until it closes"""
+    def handle(self):
+        daemon = self.server.tts_daemon
+        while True:
+            try:
+                magic, opcode, length = REQUEST.unpack(_recv_exact(self.request, REQUEST.size))
+                if magic != MAGIC or length > MAX_TEXT_BYTES:
+                    return
+                payload = _recv_exact(self.request, length)
+            except (ConnectionError, OSError, struct.error):
+                return
+
+            try:
+                if opcode == OP_SYNTHESIZE:
+                    pcm = daemon.synthesize(payload.decode('utf-8'))
+                    response = RESPONSE.pack(STATUS_OK, daemon.sample_rate, len(pcm)) + pcm
+                elif opcode == OP_INFO:
+                    info = json.dumps(daemon.info()).encode('utf-8')
+                    response = RESPONSE.pack(STATUS_OK, daemon.sample_rate, len(info)) + info
+                else:
+                    raise ValueError(f"unknown opcode {opcode}")
+            except Exception as e:
+                message = str(e).encode('utf-8')
+                response = RESPONSE.pack(STATUS_ERROR, 0, len(message)) + message
+
+            try:
+                self.request.sendall(response)
+            except OSError:
+                return
+
+
+class TTSDaemon:
+    """Hold one loaded synthesizer and serve it on a Unix socket"""
+    def __init__(self, socket_path, engine='coqui', voice=None, rate=140):
+        from tts_backends import create_synthesizer
+
+        self.socket_path = Path(socket_path)
+        self.engine = engine
+        self.voice = voice
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.started_at = time.time()
+
+        start_time = time.perf_counter()
+        self.synthesizer = create_synthesizer(engine, voice, rate)
+        self.sample_rate = self.synthesizer.sample_rate
+        self.load_seconds = time.perf_counter() - start_time
+        print(f" {engine} loaded in {self.load_seconds:.1f}s")
+
+    def synthesize(self, text):
+        # One model instance: requests from several assistants take turns
+        with self.lock:
+            self.requests += 1
+            return self.synthesizer.synthesize(text)
+
+    def info(self):
+        return {'engine': self.engine, 'voice': self.voice, 'sample_rate': self.sample_rate,
+                'pid': os.getpid(), 'requests': self.requests,
+                'load_seconds': round(self.load_seconds, 3), 'uptime': round(time.time() - self.started_at)}
+
+    def serve_forever(self):
+        if self.socket_path.exists():
+            if DaemonClient(self.socket_path, timeout=1.0).ping():
+                raise RuntimeError(f"a TTS daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()  # Left behind by a daemon that died
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), _RequestHandler)
+        server.daemon_threads = True
+        server.tts_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        print(f" TTS daemon listening on {self.socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+
+class DaemonClient:
+    """Synthesizer that forwards requests to a running TTS daemon"""
+    def __init__(self, socket_path, timeout=30.0):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self.sample_rate = None
+        self.sock = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        if self.sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+        return self.sock
+
+    def _request(self, opcode, payload=b''):
+        with self.lock:
+            self.cancelled = False
+            # One retry covers a daemon restart since the last request
+            for attempt in range(2):
+                try:
+                    sock = self._connect()
+                    sock.sendall(REQUEST.pack(MAGIC, opcode, len(payload)) + payload)
+                    status, sample_rate, length = RESPONSE.unpack(_recv_exact(sock, RESPONSE.size))
+                    body = _recv_exact(sock, length)
+                    break
+                except (ConnectionError, BrokenPipeError):
+                    self._close_socket()
+                    if attempt or self.cancelled:
+                        raise
+                except OSError:
+                    self._close_socket()
+                    raise
+        if status != STATUS_OK:
+            raise RuntimeError(f"TTS daemon error: {body.decode('utf-8', 'replace')}")
+        self.sample_rate = sample_rate
+        return body
+
+    def synthesize(self, text):
+        """Render text to 16-bit mono PCM at self.sample_rate"""
+        return self._request(OP_SYNTHESIZE, text.encode('utf-8'))
+
+    def info(self):
+        return json.loads(self._request(OP_INFO))
+
+    def ping(self):
+        """True when a daemon answers on the socket"""
+        try:
+            self.info()
+            return True
+        except (OSError, RuntimeError, ValueError):
+            return False
+
+    def cancel(self):
+        """Abandon the request in progress; the next one reconnects"""
+        sock = self.sock
+        if sock is not None:
+            self.cancelled = True
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _close_socket(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def close(self):
+        with self.lock:
+            self._close_socket()
+
+
+def connect_daemon(settings, voices, wait=20.0):
+    """Return a DaemonClient for TTS_CONFIG's socket, starting the daemon if allowed; None if unreachable"""
+    client = DaemonClient(settings.get('daemon_socket', 'data/tts_daemon.sock'))
+    if client.ping():
+        return client
+    if not settings.get('daemon_autostart', False):
+        return None
+
+    engine = settings.get('daemon_engine', 'coqui')
+    print(f" Starting TTS daemon ({engine})...")
+    # A new session keeps the daemon alive after this assistant exits
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), '--socket', client.socket_path,
+         '--engine', engine, '--voice', voices.get(engine, ''), '--rate', str(settings.get('rate', 140))],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if client.ping():
+            return client
+        time.sleep(0.2)
+    print(" TTS daemon did not start in time")
+    return None
+
+
+def main(argv=None):
+    import config
+
+    settings = config.TTS_CONFIG
+    parser = argparse.ArgumentParser(description="Serve TTS from one warm model over a Unix socket")
+    parser.add_argument('--socket', default=settings.get('daemon_socket', 'data/tts_daemon.sock'))
+    parser.add_argument('--engine', default=settings.get('daemon_engine', 'coqui'), choices=('coqui', 'espeak'))
+    parser.add_argument('--voice', default=None, help="model name (coqui) or voice (espeak)")
+    parser.add_argument('--rate', type=int, default=settings.get('rate', 140))
+    parser.add_argument('--info', action='store_true', help="query a running daemon and exit")
+    args = parser.parse_args(argv)
+
+    if args.info:
+        client = DaemonClient(args.socket, timeout=5.0)
+        print(json.dumps(client.info(), indent=2) if client.ping() else f"No TTS daemon on {args.socket}")
+        return
+
+    default_voices = {'coqui': 'tts_models/en/ljspeech/tacotron2-DDC', 'espeak': 'en'}
+    daemon = TTSDaemon(args.socket, args.engine, args.voice or default_voices[args.engine], args.rate)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\n TTS daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
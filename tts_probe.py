@@ -0,0 +1,163 @@
+"""
+Cached TTS engine capability probe
+
+Finding out which TTS engines work means looking for Python packages, running
+`espeak --version` and searching for libespeak-ng. The results (availability,
+version, probe time and the engine load times MultiTTS measures) are saved
+to a JSON file. The next start reuses them while the interpreter, PATH and
+installed packages stay the same; a change to any of those invalidates the
+cache. Run this file directly to re-probe and print the table.
+"""
+
+import ctypes.util
+import hashlib
+import json
+import os
+import shutil
+import site
+import subprocess
+import sys
+import time
+from importlib import metadata
+from pathlib import Path
+
+from lazy_imports import module_available
+
+# Order in which 'auto' picks an engine
+ENGINE_ORDER = ('coqui', 'windows', 'espeak', 'google', 'pyttsx3')
+
+# Python distribution behind each engine, used for its version
+ENGINE_PACKAGES = {
+    'coqui': ('TTS', 'TTS'),
+    'elevenlabs': ('elevenlabs', 'elevenlabs'),
+    'google': ('gtts', 'gTTS'),
+    'pyttsx3': ('pyttsx3', 'pyttsx3')
+}
+
+
+def environment_fingerprint():
+    """Hash of everything that can change which engines are installed"""
+    parts = [sys.executable, sys.version, os.environ.get('PATH', '')]
+    # Installing or removing a package or binary changes its directory's mtime.
+    # The project directory is left out: the assistant writes files there.
+    directories = site.getsitepackages() + [site.getusersitepackages()]
+    directories += os.environ.get('PATH', '').split(os.pathsep)
+    for directory in directories:
+        try:
+            parts.append(f"{directory}:{os.stat(directory).st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+
+def _package_version(distribution):
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _probe_package(module, distribution):
+    if not module_available(module):
+        return {'available': False}
+    return {'available': True, 'version': _package_version(distribution)}
+
+
+def _probe_espeak():
+    library = ctypes.util.find_library('espeak-ng') or ctypes.util.find_library('espeak')
+    binary = shutil.which('espeak') or shutil.which('espeak-ng')
+    version = None
+    if binary:
+        try:
+            output = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=5).stdout
+            version = output.split('text-to-speech:', 1)[-1].split()[0] if output else None
+        except (OSError, subprocess.SubprocessError, IndexError):
+            binary = None
+    return {'available': bool(library or binary), 'version': version,
+            'library': library, 'binary': binary}
+
+
+def probe_engines():
+    """Check every engine now; returns {engine: capability dict}"""
+    engines = {}
+    for engine in ('coqui', 'elevenlabs', 'google', 'pyttsx3', 'espeak', 'windows'):
+        start_time = time.perf_counter()
+        if engine == 'espeak':
+            result = _probe_espeak()
+        elif engine == 'windows':
+            # System.Speech through PowerShell ships with Windows
+            result = {'available': sys.platform.startswith('win')}
+        else:
+            result = _probe_package(*ENGINE_PACKAGES[engine])
+        result['probe_ms'] = round((time.perf_counter() - start_time) * 1000, 2)
+        engines[engine] = result
+    return engines
+
+
+class EngineProbe:
+    """Engine capabilities, loaded from the cache file when it is still valid"""
+    def __init__(self, cache_path=None):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.fingerprint = environment_fingerprint()
+        self.from_cache = False
+        self.engines = self._load()
+        if self.engines is None:
+            self.engines = probe_engines()
+            self.save()
+
+    def _load(self):
+        if self.cache_path is None or not self.cache_path.exists():
+            return None
+        try:
+            data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if data.get('fingerprint') != self.fingerprint:
+            return None
+        self.from_cache = True
+        return data.get('engines')
+
+    def save(self):
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + '.tmp')
+            tmp_path.write_text(json.dumps({'fingerprint': self.fingerprint, 'probed_at': time.time(),
+                                            'engines': self.engines}, indent=2), encoding='utf-8')
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"TTS probe cache write error: {e}")
+
+    def available(self, engine):
+        return self.engines.get(engine, {}).get('available', False)
+
+    def get(self, engine, key, default=None):
+        return self.engines.get(engine, {}).get(key, default)
+
+    def choose(self, preference='auto'):
+        """The configured engine, or the first available one in ENGINE_ORDER"""
+        if preference != 'auto':
+            return preference
+        for engine in ENGINE_ORDER:
+            if engine == 'pyttsx3' or self.available(engine):
+                return engine
+        return 'pyttsx3'
+
+    def record_load_time(self, engine, seconds):
+        """Remember how long an engine took to initialize"""
+        entry = self.engines.setdefault(engine, {'available': True})
+        entry['load_ms'] = round(seconds * 1000, 1)
+        self.save()
+
+
+def load_probe(settings):
+    """Build the probe from TTS_CONFIG['probe_cache']"""
+    return EngineProbe(settings.get('probe_cache', 'data/tts_probe.json'))
+
+
+if __name__ == "__main__":
+    engines = probe_engines()
+    print(f"{'engine':<12} {'available':<10} {'version':<12} {'probe ms':>9}")
+    for name, info in engines.items():
+        print(f"{name:<12} {str(info['available']):<10} {str(info.get('version') or '-'):<12} {info['probe_ms']:>9.2f}")
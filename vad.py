@@ -0,0 +1,196 @@
+"""
+Frame-level voice activity detection and end-of-utterance endpointing
+"""
+
+import collections
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+
+# The only input formats the WebRTC VAD accepts
+WEBRTC_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+WEBRTC_FRAME_MS = (10, 20, 30)
+
+
+class VoiceActivityDetector:
+    """Classify fixed-size PCM frames as speech or silence"""
+    def __init__(self, sample_rate=16000, frame_ms=30, energy_threshold=4000,
+                 dynamic_threshold=True, backend='energy', aggressiveness=2):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.frame_bytes = self.frame_samples * 2
+        self.energy_threshold = float(energy_threshold)
+        self.dynamic_threshold = dynamic_threshold
+        self.noise_floor = None
+        self.threshold_ratio = 3.0
+        self.zcr_threshold = 0.25  # Unvoiced consonants cross zero often at low energy
+
+        self.webrtc = None
+        if backend == 'webrtc':
+            if sample_rate not in WEBRTC_SAMPLE_RATES or frame_ms not in WEBRTC_FRAME_MS:
+                print(f" webrtcvad needs 8/16/32/48 kHz and 10/20/30 ms frames, not {sample_rate} Hz "
+                      f"and {frame_ms} ms - using energy VAD")
+            else:
+                try:
+                    import webrtcvad
+                    self.webrtc = webrtcvad.Vad(aggressiveness)
+                except ImportError:
+                    print(" webrtcvad not installed - using energy VAD")
+
+    def calibrate(self, source, duration=0.5):
+        """Measure the ambient noise floor from an open microphone"""
+        chunks = []
+        needed = int(self.sample_rate * duration) * 2
+        while sum(len(chunk) for chunk in chunks) < needed:
+            chunks.append(source.stream.read(source.CHUNK))
+        rms, _ = self.frame_features(b''.join(chunks))
+        if len(rms):
+            self._set_noise_floor(float(np.median(rms)))
+
+    def _set_noise_floor(self, level):
+        self.noise_floor = max(level, 1.0)
+        if self.dynamic_threshold:
+            self.energy_threshold = max(self.noise_floor * self.threshold_ratio, 100.0)
+
+    def frame_features(self, pcm):
+        """Per-frame RMS energy and zero-crossing rate for whole frames in pcm"""
+        usable = len(pcm) // self.frame_bytes * self.frame_bytes
+        if usable == 0:
+            return np.empty(0), np.empty(0)
+        samples = np.frombuffer(pcm[:usable], dtype='<i2').reshape(-1, self.frame_samples)
+        samples = samples.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        signs = np.signbit(samples)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        return rms, zcr
+
+    def classify(self, pcm):
+        """Return a boolean speech flag for each whole frame in pcm"""
+        if self.webrtc is not None:
+            usable = len(pcm) // self.frame_bytes
+            return np.array([
+                self.webrtc.is_speech(pcm[i * self.frame_bytes:(i + 1) * self.frame_bytes], self.sample_rate)
+                for i in range(usable)
+            ], dtype=bool)
+
+        rms, zcr = self.frame_features(pcm)
+        threshold = self.energy_threshold
+        speech = (rms > threshold) | ((rms > threshold * 0.5) & (zcr > self.zcr_threshold))
+
+        # Track slow changes in background noise during silence
+        if self.dynamic_threshold and len(rms) and not speech.any():
+            level = float(np.mean(rms))
+            floor = level if self.noise_floor is None else self.noise_floor * 0.95 + level * 0.05
+            self._set_noise_floor(floor)
+        return speech
+
+
+class SpeechEndpointer:
+    """Find the start and end of one utterance in a stream of microphone chunks"""
+    WAITING = 'waiting'
+    SPEECH = 'speech'
+    ENDED = 'ended'
+
+    def __init__(self, vad, hangover_ms=300, min_speech_ms=90, preroll_ms=300):
+        self.vad = vad
+        self.hangover_frames = max(1, int(hangover_ms / vad.frame_ms))
+        self.min_speech_frames = max(1, int(min_speech_ms / vad.frame_ms))
+        self.preroll = collections.deque(maxlen=max(1, int(preroll_ms / vad.frame_ms)))
+        self.reset()
+
+    def reset(self):
+        """Forget the previous utterance"""
+        self.state = self.WAITING
+        self.pending = b''
+        self.preroll.clear()
+        self.frames = []
+        self.speech_run = 0
+        self.silence_run = 0
+        self.last_voiced = 0
+        self.speech_started_at = None
+
+    def feed(self, chunk):
+        """Consume a microphone chunk and return the endpointer state"""
+        self.pending += chunk
+        usable = len(self.pending) // self.vad.frame_bytes * self.vad.frame_bytes
+        data, self.pending = self.pending[:usable], self.pending[usable:]
+        if not data:
+            return self.state
+
+        flags = self.vad.classify(data)
+        for index, is_speech in enumerate(flags):
+            frame = data[index * self.vad.frame_bytes:(index + 1) * self.vad.frame_bytes]
+
+            if self.state == self.WAITING:
+                self.preroll.append(frame)
+                self.speech_run = self.speech_run + 1 if is_speech else 0
+                if self.speech_run >= self.min_speech_frames:
+                    self.state = self.SPEECH
+                    self.speech_started_at = time.perf_counter()
+                    self.frames = list(self.preroll)
+                    self.last_voiced = len(self.frames)
+                    self.silence_run = 0
+
+            elif self.state == self.SPEECH:
+                self.frames.append(frame)
+                if is_speech:
+                    self.silence_run = 0
+                    self.last_voiced = len(self.frames)
+                else:
+                    self.silence_run += 1
+                    if self.silence_run >= self.hangover_frames:
+                        self.state = self.ENDED
+                        break
+
+        return self.state
+
+    def audio(self):
+        """PCM for the utterance with trailing silence trimmed"""
+        keep = min(len(self.frames), self.last_voiced + 2)
+        return b''.join(self.frames[:keep])
+
+
+def capture_utterance(source, endpointer, timeout, phrase_time_limit):
+    """Record from an open microphone until the endpointer detects end of speech"""
+    endpointer.reset()
+    started_at = time.perf_counter()
+
+    while True:
+        chunk = source.stream.read(source.CHUNK)
+        if not chunk:
+            break
+        state = endpointer.feed(chunk)
+        now = time.perf_counter()
+
+        if state == SpeechEndpointer.ENDED:
+            break
+        if state == SpeechEndpointer.WAITING and now - started_at > timeout:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        if state == SpeechEndpointer.SPEECH and now - endpointer.speech_started_at > phrase_time_limit:
+            break
+
+    pcm = endpointer.audio()
+    if not pcm:
+        raise sr.WaitTimeoutError("no speech captured")
+    return sr.AudioData(pcm, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+
+def create_endpointer(settings, sample_rate):
+    """Build a VAD endpointer from SPEECH_CONFIG"""
+    vad = VoiceActivityDetector(
+        sample_rate=sample_rate,
+        frame_ms=settings.get('vad_frame_ms', 30),
+        energy_threshold=settings.get('energy_threshold', 4000),
+        dynamic_threshold=settings.get('dynamic_energy_threshold', True),
+        backend=settings.get('vad_backend', 'energy'),
+        aggressiveness=settings.get('vad_aggressiveness', 2)
+    )
+    return SpeechEndpointer(
+        vad,
+        hangover_ms=settings.get('vad_hangover_ms', 300),
+        min_speech_ms=settings.get('vad_min_speech_ms', 90),
+        preroll_ms=settings.get('vad_preroll_ms', 300)
+    )
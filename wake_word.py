@@ -0,0 +1,98 @@
+"""
+Always-on wake-word detection gated by voice activity
+"""
+
+import collections
+import json
+import os
+
+
+class WakeWordDetector:
+    """Spot a wake phrase with a grammar-restricted Vosk recognizer
+
+    The keyword recognizer only sees audio around frames the VAD marks as
+    speech, so a silent room costs one vectorized energy check per chunk.
+    """
+    def __init__(self, model, phrases, vad, hangover_chunks=8, preroll_chunks=4):
+        from vosk import KaldiRecognizer
+        self.KaldiRecognizer = KaldiRecognizer
+        self.model = model
+        self.phrases = [phrase.lower() for phrase in phrases]
+        self.grammar = json.dumps(self.phrases + ["[unk]"])
+        self.vad = vad
+        self.hangover_chunks = hangover_chunks
+        self.preroll_chunks = preroll_chunks
+
+    def wait(self, source):
+        """Block until a wake phrase is heard on the open microphone; return it"""
+        recognizer = self.KaldiRecognizer(self.model, source.SAMPLE_RATE, self.grammar)
+        preroll = collections.deque(maxlen=self.preroll_chunks)
+        active = False
+        silent_chunks = 0
+
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                return None
+
+            if self.vad.classify(chunk).any():
+                if not active:
+                    # Replay the quiet lead-in so the first syllable is not lost
+                    for buffered in preroll:
+                        recognizer.AcceptWaveform(buffered)
+                    preroll.clear()
+                    active = True
+                silent_chunks = 0
+            elif active:
+                silent_chunks += 1
+                if silent_chunks > self.hangover_chunks:
+                    recognizer.Reset()
+                    active = False
+                    preroll.append(chunk)
+                    continue
+            else:
+                preroll.append(chunk)
+                continue
+
+            phrase = self._match(recognizer, chunk)
+            if phrase:
+                return phrase
+
+    def _match(self, recognizer, chunk):
+        """Feed a chunk and return the wake phrase if the hypothesis contains one"""
+        if recognizer.AcceptWaveform(chunk):
+            text = json.loads(recognizer.Result()).get('text', '')
+        else:
+            text = json.loads(recognizer.PartialResult()).get('partial', '')
+
+        for phrase in self.phrases:
+            if phrase in text:
+                recognizer.Reset()
+                return phrase
+        return None
+
+
+def create_wake_word_detector(settings, speech_settings, stt, vad):
+    """Build the wake-word stage from WAKE_WORD_CONFIG, or None when it is off"""
+    if not settings.get('enabled', False):
+        return None
+
+    try:
+        # Share the model already loaded for offline STT
+        model = getattr(stt, 'model', None)
+        if model is None:
+            from vosk import Model, SetLogLevel
+            SetLogLevel(-1)
+            model_path = settings.get('model_path') or speech_settings.get('vosk_model_path')
+            if not model_path or not os.path.isdir(model_path):
+                print(f" Wake word disabled: Vosk model not found at {model_path}")
+                return None
+            model = Model(model_path)
+
+        detector = WakeWordDetector(model, settings.get('phrases', ['hey assistant']), vad)
+        print(f" Wake word enabled: {', '.join(detector.phrases)}")
+        return detector
+
+    except ImportError:
+        print(" Wake word disabled: install vosk")
+        return None